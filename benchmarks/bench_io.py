@@ -0,0 +1,348 @@
+"""
+Benchmarks of TIFF reading, writing, decoding and metadata parsing.
+
+Synthetic stacks are generated once into a work directory, then each
+benchmark case runs in a fresh interpreter so that its peak resident
+set size is measured separately. Results are stored as JSON files
+named after the current git commit so that they can be compared
+across commits.
+
+Usage:
+
+  python benchmarks/bench_io.py [--quick] [--cases=open,read,...]
+  python benchmarks/bench_io.py --compare=OLD.json,NEW.json
+
+Metrics:
+
+  open_ms        -- time of TIFFfile construction
+  open_us_page   -- open time per IFD
+  mb_s           -- throughput of uncompressed image bytes
+  strip_us       -- per-strip decode time
+  peak_rss_mb    -- peak resident set size of the case process
+"""
+# Created: October 2026
+
+import os
+import sys
+import json
+import time
+import resource
+import subprocess
+
+import numpy
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+# name -> dict(pages, shape, dtype, compression, samples, planar_config, files)
+stacks = dict(
+    many_pages=dict(pages=5000, shape=(32, 32), dtype='uint8',
+                    compression='none'),
+    large_planes=dict(pages=8, shape=(4096, 4096), dtype='uint16',
+                      compression='none'),
+    lzw=dict(pages=64, shape=(1024, 1024), dtype='uint16',
+             compression='lzw'),
+    planar2=dict(pages=64, shape=(512, 512), dtype='uint8', samples=3,
+                 planar_config=2),
+    multi_file=dict(pages=1, shape=(512, 512), dtype='uint16',
+                    compression='none', files=200),
+)
+
+# quick mode reduces the number of pages and files
+quick_factor = dict(many_pages=10, large_planes=4, lzw=8, planar2=8,
+                    multi_file=10)
+
+# case name -> (function name, stack names)
+cases = dict(
+    open=('bench_open', ['many_pages', 'large_planes', 'lzw']),
+    read=('bench_read', ['large_planes', 'lzw', 'planar2']),
+    lazy=('bench_lazy', ['large_planes', 'lzw']),
+    scan=('bench_scan', ['large_planes', 'lzw']),
+    decode=('bench_decode', ['lzw']),
+    write=('bench_write', ['large_planes', 'lzw']),
+    files=('bench_files', ['multi_file']),
+)
+
+
+def get_stack_filenames(workdir, name, quick=False):
+    params = stacks[name]
+    nfiles = params.get('files', 1)
+    if quick:
+        nfiles = max(1, nfiles // quick_factor[name])
+    prefix = os.path.join(workdir, name + ('_quick' if quick else ''))
+    if nfiles == 1:
+        return [prefix + '.tif']
+    return ['%s_%04d.tif' % (prefix, i) for i in range(nfiles)]
+
+
+def get_stack_data(name, quick=False):
+    params = stacks[name]
+    pages = params['pages']
+    if quick and 'files' not in params:
+        pages = max(1, pages // quick_factor[name])
+    shape = (pages,) + params['shape']
+    if params.get('samples'):
+        shape = (pages, params['samples']) + params['shape']
+    # smooth data so that LZW has something to compress
+    data = numpy.add.outer(numpy.arange(shape[-2]) // 7,
+                           numpy.arange(shape[-1]) // 5)
+    return numpy.ascontiguousarray(
+        numpy.broadcast_to(data, shape).astype(params['dtype']))
+
+
+def make_stack(workdir, name, quick=False):
+    """ Write stack files unless these exist, return filenames.
+    """
+    from libtiff import TIFFimage
+    params = stacks[name]
+    filenames = get_stack_filenames(workdir, name, quick=quick)
+    if all(os.path.isfile(filename) for filename in filenames):
+        return filenames
+    data = get_stack_data(name, quick=quick)
+    for filename in filenames:
+        if params.get('planar_config') == 2:
+            from libtiff import TIFF
+            tif = TIFF.open(filename, mode='w')
+            for page in data:
+                tif.write_image(page, write_rgb=True)
+            tif.close()
+        else:
+            TIFFimage(data, description=name).write_file(
+                filename, compression=params['compression'], verbose=False)
+    return filenames
+
+
+def bench_open(filenames):
+    from libtiff import TIFFfile
+    times = []
+    for i in range(3):
+        start = time.perf_counter()
+        tiff = TIFFfile(filenames[0])
+        times.append(time.perf_counter() - start)
+        pages = len(tiff.IFD)
+        tiff.close()
+    t = min(times)
+    return dict(open_ms=t * 1e3, open_us_page=t / pages * 1e6)
+
+
+def bench_read(filenames):
+    from libtiff import TIFFfile
+    start = time.perf_counter()
+    tiff = TIFFfile(filenames[0])
+    open_time = time.perf_counter() - start
+    start = time.perf_counter()
+    nbytes = 0
+    for sample_index in range(tiff.IFD[0].get_value('SamplesPerPixel')):
+        arr = tiff.get_tiff_array(sample_index=sample_index)
+        for plane in arr.planes:
+            # copy to touch the memory mapped data
+            nbytes += numpy.array(plane.get_image()).nbytes
+    read_time = time.perf_counter() - start
+    tiff.close()
+    return dict(open_ms=open_time * 1e3, mb_s=nbytes / read_time / 1e6)
+
+
+def bench_lazy(filenames):
+    from libtiff import TIFFfile, instrument
+    tiff = TIFFfile(filenames[0], use_memmap=False, lazy=True)
+    arr = tiff.get_tiff_array()
+    rows = arr.shape[1] // 8
+    with instrument.collect() as stats:
+        start = time.perf_counter()
+        roi = arr[:, rows:2 * rows]
+        roi_time = time.perf_counter() - start
+    start = time.perf_counter()
+    nbytes = arr[:].nbytes
+    read_time = time.perf_counter() - start
+    tiff.close()
+    return dict(roi_ms=roi_time * 1e3, roi_read_mb=stats.counts['bytes_read'] / 1e6,
+                roi_mb_s=roi.nbytes / roi_time / 1e6, mb_s=nbytes / read_time / 1e6)
+
+
+def bench_scan(filenames):
+    from libtiff import TIFFfile
+    tiff = TIFFfile(filenames[0])
+    arr = tiff.get_tiff_array()
+    result = {}
+    for direct in [True, False]:
+        start = time.perf_counter()
+        nbytes = sum(image.nbytes for image in arr.iter_images(direct=direct))
+        result['direct_mb_s' if direct else 'fadvise_mb_s'] = nbytes / (time.perf_counter() - start) / 1e6
+    tiff.close()
+    return result
+
+
+def bench_decode(filenames):
+    import tif_lzw
+    from libtiff import TIFFfile
+    tiff = TIFFfile(filenames[0])
+    strips = []
+    for ifd in tiff.IFD:
+        offsets = ifd.get_value('StripOffsets')
+        nbytes = ifd.get_value('StripByteCounts')
+        length = ifd.get_value('ImageLength')
+        width = ifd.get_value('ImageWidth')
+        rows_per_strip = min(length, ifd.get_value('RowsPerStrip'))
+        bytes_per_strip = rows_per_strip * width * sum(ifd.get_value('BitsPerSample')) // 8
+        for offset, count in zip(offsets, nbytes):
+            strips.append((numpy.array(tiff.data[offset:offset + count]), bytes_per_strip))
+    start = time.perf_counter()
+    decoded = 0
+    for strip, size in strips:
+        decoded += tif_lzw.decode(strip, size).nbytes
+    t = time.perf_counter() - start
+    tiff.close()
+    return dict(strips=len(strips), strip_us=t / len(strips) * 1e6,
+                mb_s=decoded / t / 1e6)
+
+
+def bench_write(filenames, name, quick):
+    from libtiff import TIFFimage
+    data = get_stack_data(name, quick=quick)
+    filename = filenames[0] + '.write.tif'
+    start = time.perf_counter()
+    TIFFimage(data).write_file(filename, compression=stacks[name]['compression'],
+                               verbose=False)
+    t = time.perf_counter() - start
+    os.remove(filename)
+    return dict(write_ms=t * 1e3, mb_s=data.nbytes / t / 1e6)
+
+
+def bench_files(filenames):
+    from libtiff import TiffFiles
+    start = time.perf_counter()
+    files = TiffFiles(filenames)
+    arr = files.get_tiff_array()
+    open_time = time.perf_counter() - start
+    start = time.perf_counter()
+    nbytes = 0
+    for i in range(len(arr)):
+        nbytes += numpy.array(arr[i]).nbytes
+    read_time = time.perf_counter() - start
+    files.close()
+    return dict(open_ms=open_time * 1e3, open_us_file=open_time / len(filenames) * 1e6,
+                mb_s=nbytes / read_time / 1e6)
+
+
+def run_case(case, name, workdir, quick):
+    """ Run a benchmark case in this process, return metrics.
+    """
+    func_name, names = cases[case]
+    func = globals()[func_name]
+    filenames = get_stack_filenames(workdir, name, quick=quick)
+    if func is bench_write:
+        result = func(filenames, name, quick)
+    else:
+        result = func(filenames)
+    result['peak_rss_mb'] = get_peak_rss() / 1e6
+    return result
+
+
+def get_peak_rss():
+    """ Return peak resident set size of this process in bytes.
+    """
+    # ru_maxrss is inherited across exec on Linux, VmHWM is not
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        peak *= 1024  # kilobytes
+    return peak
+
+
+def run_case_process(case, name, workdir, quick):
+    """ Run a benchmark case in a fresh interpreter, return metrics.
+    """
+    args = [sys.executable, os.path.abspath(__file__), '--run-case=%s:%s' % (case, name),
+            '--workdir=%s' % (workdir)]
+    if quick:
+        args.append('--quick')
+    output = subprocess.check_output(args)
+    return json.loads(output.decode().splitlines()[-1])
+
+
+def get_commit():
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                         cwd=here, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return output.decode().strip()
+
+
+def compare(old_filename, new_filename):
+    with open(old_filename) as f:
+        old = json.load(f)
+    with open(new_filename) as f:
+        new = json.load(f)
+    print('%-28s %-14s %12s %12s %8s' % ('case', 'metric', old['commit'],
+                                         new['commit'], 'ratio'))
+    for key in sorted(new['results']):
+        if key not in old['results']:
+            continue
+        for metric, value in sorted(new['results'][key].items()):
+            old_value = old['results'][key].get(metric)
+            if not old_value:
+                continue
+            print('%-28s %-14s %12.3f %12.3f %8.2f' % (key, metric, old_value,
+                                                       value, value / old_value))
+
+
+def main():
+    from optparse import OptionParser
+    parser = OptionParser(__doc__)
+    parser.add_option('--cases', default=','.join(sorted(cases)),
+                      help='Comma separated list of cases to run.')
+    parser.add_option('--quick', action='store_true', default=False,
+                      help='Use smaller stacks.')
+    parser.add_option('--workdir', default=os.path.join(here, 'data'),
+                      help='Directory of generated stacks.')
+    parser.add_option('--output', default=None,
+                      help='Results file, by default results/<commit>.json.')
+    parser.add_option('--compare', default=None,
+                      help='Compare two results files, OLD,NEW.')
+    parser.add_option('--run-case', default=None, help='Internal.')
+    options, args = parser.parse_args()
+
+    if options.compare:
+        compare(*options.compare.split(','))
+        return
+
+    if options.run_case:
+        case, name = options.run_case.split(':')
+        print(json.dumps(run_case(case, name, options.workdir, options.quick)))
+        return
+
+    if not os.path.isdir(options.workdir):
+        os.makedirs(options.workdir)
+    results = {}
+    for case in options.cases.split(','):
+        for name in cases[case][1]:
+            make_stack(options.workdir, name, quick=options.quick)
+            result = run_case_process(case, name, options.workdir, options.quick)
+            key = '%s.%s' % (case, name)
+            results[key] = result
+            print('%-28s %s' % (key, ', '.join('%s=%.3f' % item for item in sorted(result.items()))))
+
+    commit = get_commit()
+    output = options.output
+    if output is None:
+        output = os.path.join(here, 'results', '%s%s.json' % (commit, '-quick' if options.quick else ''))
+    dirname = os.path.dirname(output)
+    if dirname and not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    import platform
+    with open(output, 'w') as f:
+        json.dump(dict(commit=commit, date=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       python=platform.python_version(), numpy=numpy.__version__,
+                       machine=platform.machine(), quick=options.quick,
+                       results=results), f, indent=1, sort_keys=True)
+    print('Results written to %s' % (output))
+
+
+if __name__ == '__main__':
+    main()
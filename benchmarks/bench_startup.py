@@ -0,0 +1,77 @@
+"""
+Startup benchmark: import cost of tag tables and per-entry IFD costs.
+
+Usage:
+
+  python benchmarks/bench_startup.py [--pages=N]
+"""
+# Created: October 2026
+
+import os
+import sys
+import subprocess
+import timeit
+from tempfile import mktemp
+
+import numpy
+
+
+def time_import(statement, repeat=5):
+    """ Return the best time in seconds of running statement in a
+    fresh interpreter.
+    """
+    code = ('import time; t0 = time.perf_counter(); %s; '
+            'print(time.perf_counter() - t0)' % (statement))
+    times = []
+    for i in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', code])
+        times.append(float(output.split()[-1]))
+    return min(times)
+
+
+def main():
+    from optparse import OptionParser
+    parser = OptionParser(__doc__)
+    parser.add_option('--pages', type='int', default=1000,
+                      help='Number of pages in the synthetic file.')
+    options, args = parser.parse_args()
+
+    from libtiff import tiff_data, TIFFimage, TIFFfile
+
+    results = []
+
+    parse = timeit.Timer(lambda: tiff_data.parse_tag_info(tiff_data.tag_info))
+    n, t = parse.autorange()
+    results.append(('parse tag_info text', t / n * 1e3, 'ms'))
+    results.append(('import libtiff.tiff_data',
+                    time_import('import libtiff.tiff_data') * 1e3, 'ms'))
+    results.append(('import libtiff',
+                    time_import('import libtiff') * 1e3, 'ms'))
+
+    tags = list(tiff_data.tag_value2name) * 10
+    table = tiff_data.tag_value2name_table
+    names = tiff_data.tag_value2name
+    n, t = timeit.Timer(lambda: [names.get(tag) for tag in tags]).autorange()
+    results.append(('tag name dict lookup', t / n / len(tags) * 1e9, 'ns'))
+    n, t = timeit.Timer(lambda: [table[tag] for tag in tags]).autorange()
+    results.append(('tag name table lookup', t / n / len(tags) * 1e9, 'ns'))
+
+    filename = mktemp('.tif')
+    image = numpy.zeros((options.pages, 8, 8), numpy.uint8)
+    TIFFimage(image, description='bench_startup').write_file(filename, verbose=False)
+    try:
+        t = min(timeit.repeat(lambda: TIFFfile(filename).close(), number=1, repeat=3))
+        tiff = TIFFfile(filename)
+        nentries = sum(len(ifd.entries) for ifd in tiff.IFD)
+        tiff.close()
+    finally:
+        os.remove(filename)
+    results.append(('TIFFfile open, %s pages' % (options.pages), t * 1e3, 'ms'))
+    results.append(('TIFFfile open per IFD entry', t / nentries * 1e6, 'us'))
+
+    for name, value, unit in results:
+        print('%-40s %10.3f %s' % (name, value, unit))
+
+
+if __name__ == '__main__':
+    main()
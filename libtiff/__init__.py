@@ -5,21 +5,43 @@
 .. autosummary::
 
    TIFF
+   TIFFReaderPool
    TIFFfile
    TiffArray
    TiffFile
    TiffFiles
    TiffChannelsAndFiles
+   LocalCache
 
 """
 
-__autodoc__ = ['libtiff_ctypes', 'tiff', 'tiff_file', 'tiff_files', 'tiff_channels_and_files']
+__autodoc__ = ['libtiff_ctypes', 'tiff', 'tiff_file', 'tiff_files', 'tiff_channels_and_files', 'local_cache',
+               'pyramid', 'instrument', 'progress', 'direct_io', 'shared_stack']
 
-__all__ = ['TIFF', 'TIFF3D', 'TIFFfile', 'TiffArray', 'TiffFile', 'TiffFiles', 'TiffChannelsAndFiles', 'TiffBase']
+__all__ = ['TIFF', 'TIFF3D', 'TIFFfile', 'TiffArray', 'TiffFile', 'TiffFiles', 'TiffChannelsAndFiles', 'TiffBase',
+           'LocalCache', 'TIFFReaderPool']
 
-from .libtiff_ctypes import libtiff, TIFF, TIFF3D
 from .tiff import TIFFfile, TIFFimage, TiffArray
 from .tiff_file import TiffFile
 from .tiff_files import TiffFiles
 from .tiff_channels_and_files import TiffChannelsAndFiles
 from .tiff_base import TiffBase
+from .local_cache import LocalCache
+
+# libtiff_ctypes loads the libtiff shared library (and may generate
+# tiff_h_<version>.py), so it is imported only when its names are
+# accessed. TIFFfile and friends do not need libtiff.
+_libtiff_ctypes_names = ['libtiff', 'TIFF', 'TIFF3D', 'TIFFReaderPool']
+
+
+def __getattr__(name):
+    if name in _libtiff_ctypes_names:
+        from . import libtiff_ctypes
+        value = getattr(libtiff_ctypes, name)
+        globals()[name] = value
+        return value
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_libtiff_ctypes_names))
@@ -0,0 +1,470 @@
+"""
+Provides array-like byte sources for TIFFfile.
+
+A byte source behaves like the one-dimensional ubyte array that
+TIFFfile holds in its data attribute: slicing returns a numpy array
+with the content of the requested byte range. Data is read only when
+it is accessed. Small reads, such as IFD entries, are served from a
+cache of aligned blocks. Byte ranges that are known to be needed soon,
+such as the strips of an image, can be announced with the prefetch
+method: adjacent ranges are coalesced and read in one request into
+buffers that are reused after the ranges are evicted.
+"""
+
+__all__ = ['ByteSource', 'FileSource', 'HTTPSource', 'coalesce_ranges']
+
+import io
+import os
+import bisect
+import weakref
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+from . import instrument
+
+
+def coalesce_ranges(starts, stops, max_gap=0):
+    """ Merge byte ranges that overlap or are separated by small gaps.
+
+    Parameters
+    ----------
+    starts, stops : array
+      Specify start and stop offsets of byte ranges.
+    max_gap : int
+      Specify the largest gap between two ranges that are merged.
+
+    Returns
+    -------
+    starts, stops : array
+      Sorted start and stop offsets of merged ranges.
+    """
+    starts = numpy.asarray(starts, dtype=numpy.int64).ravel()
+    stops = numpy.asarray(stops, dtype=numpy.int64).ravel()
+    if not starts.size:
+        return starts, stops
+    order = numpy.argsort(starts, kind='stable')
+    starts = starts[order]
+    ends = numpy.maximum.accumulate(stops[order])
+    first = numpy.flatnonzero(starts[1:] > ends[:-1] + max_gap) + 1
+    last = numpy.append(first - 1, starts.size - 1)
+    first = numpy.insert(first, 0, 0)
+    return starts[first], ends[last]
+
+
+class ByteSource:
+    """ Base class of read-only byte sources.
+
+    Subclasses must set the size attribute and implement the
+    read_range method. The read_ranges method may be redefined to
+    read several ranges concurrently.
+
+    Attributes
+    ----------
+    size : int
+    block_size : int
+    max_gap : int
+    max_free_buffers : int
+      Maximal number of evicted prefetch buffers kept for reuse.
+    """
+
+    dtype = numpy.dtype(numpy.ubyte)
+    ndim = 1
+    max_free_buffers = 8
+
+    def __init__(self, size, block_size=2 ** 16, max_blocks=64, max_gap=0,
+                 max_prefetch_bytes=2 ** 28):
+        """
+        Parameters
+        ----------
+        size : int
+          Specify the size of data in bytes.
+        block_size : int
+          Specify the size of cached blocks.
+        max_blocks : int
+          Specify the maximal number of cached blocks.
+        max_gap : int
+          Specify the largest gap between prefetched byte ranges that
+          are read in one request.
+        max_prefetch_bytes : int
+          Specify the maximal number of bytes held by prefetched ranges.
+        """
+        self.size = size
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.max_gap = max_gap
+        self.max_prefetch_bytes = max_prefetch_bytes
+        self._blocks = OrderedDict()
+        self._ranges = OrderedDict()  # start -> array, oldest first
+        self._range_starts = []  # sorted keys of _ranges
+        self._range_nbytes = 0
+        self._free_buffers = []  # (buffer, weakref to its range array), oldest first
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self):
+        return self.size
+
+    @property
+    def shape(self):
+        return (self.size,)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            data = self.read(start, max(start, stop))
+            if step != 1:
+                data = data[::step]
+            return data
+        if index < 0:
+            index += self.size
+        if index < 0 or index >= self.size:
+            raise IndexError('index %r out of bounds [0,%r)' % (index, self.size))
+        return self.read(index, index + 1)[0]
+
+    def read(self, start, stop):
+        """ Return bytes in range [start, stop) as ubyte array.
+        """
+        data = self._lookup(start, stop)
+        if data is not None:
+            if instrument.enabled:
+                instrument.count('cache_hits')
+            return data
+        block_size = self.block_size
+        first, last = start // block_size, (stop - 1) // block_size
+        if stop - start >= block_size or first != last:
+            if instrument.enabled:
+                instrument.count('cache_misses')
+            return self._read_range(start, stop)
+        block = self._blocks.get(first)
+        if instrument.enabled:
+            instrument.count('cache_hits' if block is not None else 'cache_misses')
+        if block is None:
+            offset = first * block_size
+            block = self._read_range(offset, min(offset + block_size, self.size))
+            block.flags.writeable = False
+            with self._lock:
+                self._blocks[first] = block
+                if len(self._blocks) > self.max_blocks:
+                    self._blocks.popitem(last=False)
+        i = start - first * block_size
+        return block[i:i + stop - start]
+
+    def read_range(self, start, stop, out=None):
+        """ Read bytes in range [start, stop) from the source.
+        """
+        raise NotImplementedError(repr(self))
+
+    def _read_range(self, start, stop):
+        if not instrument.enabled:
+            return self.read_range(start, stop)
+        with instrument.timer('read'):
+            data = self.read_range(start, stop)
+        instrument.count('bytes_read', data.nbytes)
+        return data
+
+    def read_ranges(self, starts, stops, out=None):
+        """ Read several byte ranges, return a list of ubyte arrays.
+
+        out is an optional list of arrays that receive the ranges.
+        """
+        if out is None:
+            out = [None] * len(starts)
+        return [self.read_range(start, stop, buf) for start, stop, buf in zip(starts, stops, out)]
+
+    def prefetch(self, starts, stops):
+        """ Read byte ranges that will be accessed soon.
+
+        Ranges are coalesced with coalesce_ranges and kept in memory
+        until they are evicted by other prefetched ranges.
+        """
+        starts, stops = coalesce_ranges(starts, stops, self.max_gap)
+        with self._lock:
+            missing = [i for i in range(starts.size)
+                       if self._lookup(starts[i], stops[i]) is None]
+        if not missing:
+            return
+        starts, stops = starts[missing], stops[missing]
+        buffers = [self._get_buffer(int(n)) for n in stops - starts]
+        with instrument.timer('read'):
+            ranges = self.read_ranges(starts, stops, buffers)
+        if instrument.enabled:
+            instrument.count('bytes_read', int((stops - starts).sum()))
+        for start, data in zip(starts, ranges):
+            data.flags.writeable = False
+            self._add_range(int(start), data)
+
+    def _add_range(self, start, data):
+        with self._lock:
+            old = self._ranges.pop(start, None)
+            if old is None:
+                bisect.insort(self._range_starts, start)
+            else:
+                self._range_nbytes -= old.nbytes
+            self._ranges[start] = data
+            self._range_nbytes += data.nbytes
+            while self._range_nbytes > self.max_prefetch_bytes and len(self._ranges) > 1:
+                old_start, old = self._ranges.popitem(last=False)
+                del self._range_starts[bisect.bisect_left(self._range_starts, old_start)]
+                self._range_nbytes -= old.nbytes
+                self._release_buffer(old)
+
+    def _get_buffer(self, nbytes):
+        """ Return ubyte array of nbytes for a prefetched range.
+
+        The array is created from a memoryview of a new or an evicted
+        buffer, so that all views of the array have the array as base
+        and keep it alive. An evicted buffer is reused only when its
+        previous array has been garbage collected.
+        """
+        buf = None
+        with self._lock:
+            for i, (free_buf, ref) in enumerate(self._free_buffers):
+                if free_buf.size >= nbytes and ref() is None:
+                    buf = free_buf
+                    del self._free_buffers[i]
+                    break
+        if buf is None:
+            buf = numpy.empty((nbytes,), dtype=numpy.ubyte)
+        elif instrument.enabled:
+            instrument.count('buffers_reused')
+        return numpy.frombuffer(memoryview(buf)[:nbytes], dtype=numpy.ubyte, count=nbytes)
+
+    def _release_buffer(self, data):
+        if not isinstance(data.base, memoryview):
+            return  # not created by _get_buffer
+        self._free_buffers.append((data.base.obj, weakref.ref(data)))
+        if len(self._free_buffers) > self.max_free_buffers:
+            del self._free_buffers[0]
+
+    def _lookup(self, start, stop):
+        if not self._range_starts:
+            return None
+        with self._lock:
+            i = bisect.bisect_right(self._range_starts, start) - 1
+            if i < 0:
+                return None
+            range_start = self._range_starts[i]
+            data = self._ranges[range_start]
+        if stop - range_start > data.size:
+            return None
+        return data[start - range_start:stop - range_start]
+
+    def close(self):
+        with self._lock:
+            self._blocks.clear()
+            self._ranges.clear()
+            del self._range_starts[:]
+            del self._free_buffers[:]
+            self._range_nbytes = 0
+
+
+class FileSource(ByteSource):
+    """ Byte source backed by a seekable file-like object.
+
+    Ranges of regular files are read with positional reads (preadv)
+    that do not move the file position and do not serialize readers.
+
+    Attributes
+    ----------
+    fileobj : file-like object
+    """
+
+    def __init__(self, fileobj, max_gap=2 ** 12, **kws):
+        """
+        Parameters
+        ----------
+        fileobj : file-like object
+          Specify a seekable file-like object opened in binary mode.
+        max_gap : int
+          Specify the largest gap between prefetched byte ranges that
+          are read in one request.
+        kws : dict
+          Specify other ByteSource options.
+        """
+        self.fileobj = fileobj
+        self._close_fileobj = False
+        self._fd = None
+        if isinstance(getattr(fileobj, 'raw', fileobj), io.FileIO):
+            size = os.fstat(fileobj.fileno()).st_size
+            if hasattr(os, 'preadv'):
+                self._fd = fileobj.fileno()
+        else:
+            # the file position of the caller is restored
+            position = fileobj.tell()
+            size = fileobj.seek(0, 2)
+            if size is None:
+                size = fileobj.tell()
+            fileobj.seek(position)
+        ByteSource.__init__(self, size, max_gap=max_gap, **kws)
+
+    @classmethod
+    def open(cls, filename, **kws):
+        """ Open file for reading, the file is closed with the source.
+        """
+        source = cls(open(filename, 'rb', buffering=0), **kws)
+        source._close_fileobj = True
+        return source
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.fileobj)
+
+    def read_range(self, start, stop, out=None):
+        if out is None:
+            out = numpy.empty((stop - start,), dtype=numpy.ubyte)
+        if self._fd is not None:
+            view = memoryview(out)
+            n = 0
+            while n < out.nbytes:
+                k = os.preadv(self._fd, [view[n:]], start + n)
+                if not k:
+                    break
+                n += k
+            if n != stop - start:
+                raise IOError('expected %s bytes at offset %s but got %s'
+                              % (stop - start, start, n))
+            return out
+        with self._lock:
+            position = self.fileobj.tell()
+            try:
+                self.fileobj.seek(start)
+                if hasattr(self.fileobj, 'readinto'):
+                    n = self.fileobj.readinto(out)
+                else:
+                    data = self.fileobj.read(stop - start)
+                    n = len(data)
+                    out[:n] = numpy.frombuffer(data, dtype=numpy.ubyte)
+            finally:
+                self.fileobj.seek(position)
+        if n != stop - start:
+            raise IOError('expected %s bytes at offset %s but got %s'
+                          % (stop - start, start, n))
+        return out
+
+    def close(self):
+        ByteSource.close(self)
+        if self._close_fileobj:
+            self.fileobj.close()
+
+
+class HTTPSource(ByteSource):
+    """ Byte source backed by HTTP range requests.
+
+    Each reading thread keeps its own persistent connection to the
+    server. Prefetched ranges are fetched in parallel.
+
+    Attributes
+    ----------
+    url : str
+    nthreads : int
+    """
+
+    def __init__(self, url, nthreads=4, timeout=None, max_gap=2 ** 14, **kws):
+        """
+        Parameters
+        ----------
+        url : str
+          Specify http or https URL of TIFF file. The server must
+          support range requests.
+        nthreads : int
+          Specify the number of parallel requests.
+        timeout : {None, float}
+          Specify connection timeout in seconds.
+        max_gap : int
+          Specify the largest gap between prefetched byte ranges that
+          are fetched in one request.
+        kws : dict
+          Specify other ByteSource options.
+        """
+        from urllib.parse import urlsplit
+        self.url = url
+        self.nthreads = nthreads
+        self.timeout = timeout
+        parts = urlsplit(url)
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._path = parts.path or '/'
+        if parts.query:
+            self._path += '?' + parts.query
+        self._local = threading.local()
+        self._executor = None
+        response = self._request('HEAD', {})
+        response.read()
+        if response.status != 200:
+            raise IOError('%s: HTTP status %s' % (url, response.status))
+        length = response.getheader('Content-Length')
+        if length is None:
+            raise IOError('%s: server did not report Content-Length' % (url))
+        ByteSource.__init__(self, int(length), max_gap=max_gap, **kws)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.url)
+
+    def _get_connection(self, renew=False):
+        import http.client
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or renew:
+            if connection is not None:
+                connection.close()
+            if self._scheme == 'https':
+                connection = http.client.HTTPSConnection(self._netloc, timeout=self.timeout)
+            else:
+                connection = http.client.HTTPConnection(self._netloc, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method, headers):
+        import http.client
+        connection = self._get_connection()
+        try:
+            connection.request(method, self._path, headers=headers)
+            return connection.getresponse()
+        except (http.client.HTTPException, OSError):
+            # the server may have closed a persistent connection
+            connection = self._get_connection(renew=True)
+            connection.request(method, self._path, headers=headers)
+            return connection.getresponse()
+
+    def read_range(self, start, stop, out=None):
+        if out is None:
+            out = numpy.empty((stop - start,), dtype=numpy.ubyte)
+        if stop <= start:
+            return out
+        response = self._request('GET', {'Range': 'bytes=%s-%s' % (start, stop - 1)})
+        if response.status != 206:
+            response.read()
+            raise IOError('%s: expected partial content for range %s-%s but got HTTP status %s'
+                          % (self.url, start, stop, response.status))
+        view = memoryview(out)
+        n = 0
+        while n < out.nbytes:
+            k = response.readinto(view[n:])
+            if not k:
+                break
+            n += k
+        response.read()
+        if n != stop - start:
+            raise IOError('expected %s bytes at offset %s but got %s'
+                          % (stop - start, start, n))
+        return out
+
+    def read_ranges(self, starts, stops, out=None):
+        if len(starts) <= 1 or self.nthreads <= 1:
+            return ByteSource.read_ranges(self, starts, stops, out)
+        if out is None:
+            out = [None] * len(starts)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.nthreads)
+        return list(self._executor.map(self.read_range, starts, stops, out))
+
+    def close(self):
+        ByteSource.close(self)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,164 @@
+"""
+Provides reading of large files without filling the page cache.
+
+Scanning a large file through a memory map or buffered reads leaves
+its pages in the page cache, evicting the data of other processes.
+DirectReader reads a window of a file into a reusable page aligned
+buffer. It uses direct I/O (O_DIRECT) where the platform and file
+system support it, otherwise it reads through the page cache and
+releases the read pages with posix_fadvise(POSIX_FADV_DONTNEED).
+
+See TiffArray.iter_images for sequential scanning of TIFF stacks.
+"""
+# Created: October 2026
+
+__all__ = ['DirectReader']
+
+import os
+import mmap
+import errno
+
+import numpy
+
+from . import instrument
+
+
+class DirectReader:
+    """ Array-like view to a window of a file.
+
+    Slicing returns a ubyte array view to the window buffer. A slice
+    outside of the window loads a new window, so views are valid only
+    until the next load.
+
+    Attributes
+    ----------
+    filename : str
+    size : int
+    direct : bool
+      True when direct I/O is used.
+    alignment : int
+    start, stop : int
+      File offsets of the window.
+    """
+
+    dtype = numpy.dtype(numpy.ubyte)
+    ndim = 1
+
+    def __init__(self, filename, direct=True, alignment=None):
+        """
+        Parameters
+        ----------
+        filename : str
+        direct : bool
+          When True then try to use direct I/O.
+        alignment : {None, int}
+          Specify alignment of direct I/O offsets and sizes, by
+          default the page size.
+        """
+        self.filename = filename
+        self.size = os.path.getsize(filename)
+        self.alignment = alignment or mmap.PAGESIZE
+        self.direct = False
+        self._fd = None
+        if direct and hasattr(os, 'O_DIRECT'):
+            try:
+                self._fd = os.open(filename, os.O_RDONLY | os.O_DIRECT)
+                self.direct = True
+            except OSError:
+                pass  # file system does not support direct I/O
+        if self._fd is None:
+            self._fd = os.open(filename, os.O_RDONLY)
+        self._buffer = None  # anonymous mmap, page aligned
+        self._array = None
+        self.start = self.stop = 0
+
+    def __repr__(self):
+        return '%s(%r, direct=%r)' % (self.__class__.__name__, self.filename, self.direct)
+
+    @property
+    def nbytes(self):
+        return self.size
+
+    @property
+    def shape(self):
+        return (self.size,)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def buffer(self):
+        """ Window buffer as ubyte array, None before the first load.
+        """
+        return self._array
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise NotImplementedError(repr(index))
+        start, stop, step = index.indices(self.size)
+        stop = max(start, stop)
+        if start < self.start or stop > self.stop:
+            self.load(start, stop)
+        return self._array[start - self.start:stop - self.start:step]
+
+    def load(self, start, stop):
+        """ Load file bytes [start, stop) into the window buffer.
+
+        The window is extended to aligned offsets.
+        """
+        align = self.alignment
+        start -= start % align
+        nbytes = stop - start
+        nbytes += (-nbytes) % align
+        if self._buffer is None or len(self._buffer) < nbytes:
+            # previous buffer is released when its views are gone
+            self._buffer = mmap.mmap(-1, nbytes)
+            self._array = numpy.frombuffer(self._buffer, dtype=numpy.ubyte)
+        with instrument.timer('read'):
+            n = self._read(memoryview(self._buffer)[:nbytes], start)
+        if start + n < min(stop, self.size):
+            raise IOError('expected %s bytes at offset %s but got %s'
+                          % (min(stop, self.size) - start, start, n))
+        if instrument.enabled:
+            instrument.count('bytes_read', n)
+        self.start, self.stop = start, start + n
+
+    def _read(self, view, offset):
+        try:
+            n = self._pread(view, offset)
+        except OSError as msg:
+            if not self.direct or msg.errno != errno.EINVAL:
+                raise
+            # file system rejects direct I/O reads
+            os.close(self._fd)
+            self._fd = os.open(self.filename, os.O_RDONLY)
+            self.direct = False
+            n = self._pread(view, offset)
+        if not self.direct and n and hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(self._fd, offset, n, os.POSIX_FADV_DONTNEED)
+        return n
+
+    def _pread(self, view, offset):
+        n = 0
+        while n < len(view):
+            if hasattr(os, 'preadv'):
+                k = os.preadv(self._fd, [view[n:]], offset + n)
+            else:
+                os.lseek(self._fd, offset + n, os.SEEK_SET)
+                data = os.read(self._fd, len(view) - n)
+                k = len(data)
+                view[n:n + k] = data
+            if not k:
+                break
+            n += k
+            if self.direct and n % self.alignment:
+                break  # end of file
+        return n
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._array = None
+        self._buffer = None
+        self.start = self.stop = 0
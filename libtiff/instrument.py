@@ -0,0 +1,183 @@
+"""
+Provides opt-in instrumentation of TIFF reading and writing.
+
+Instrumentation is disabled by default and costs one attribute lookup
+per instrumented call. Within a collect context, TIFFfile,
+TiffSamplePlane, TiffArray, byte sources and TIFFimage.write_file
+update the counters and stage times of a Stats instance:
+
+  counters : ifds, ifd_entries, strips_read, strip_bytes,
+             strips_decoded, bytes_decoded, bytes_copied, bytes_read,
+             cache_hits, cache_misses, buffers_reused, advice_calls,
+             strips_encoded, bytes_encoded, bytes_written,
+             minor_page_faults, major_page_faults
+  stages   : open, read, decode, copy, encode, write
+
+strip_bytes counts the stored bytes of accessed strips, bytes_read
+counts the bytes read by byte sources or by TIFFfile with
+use_memmap=False. Memory mapped data is read by the kernel on page
+faults, these are counted for the whole process. Stage times may
+nest, for instance, copy includes the decode time of copied planes.
+Updates from all threads are collected.
+
+Example::
+
+  from libtiff import TIFFfile, instrument
+  with instrument.collect() as stats:
+      tiff = TIFFfile(filename)
+      arr = tiff.get_tiff_array()[:]
+  print(stats)
+"""
+# Created: October 2026
+
+__all__ = ['Stats', 'collect', 'count', 'timer']
+
+import time
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# True when at least one Stats instance is collecting
+enabled = False
+
+_active = []  # collecting Stats instances, innermost last
+_lock = threading.Lock()
+
+
+class Stats:
+    """ Holds counters and stage times.
+
+    Attributes
+    ----------
+    counts : dict
+      Counter values keyed by counter name.
+    times : dict
+      Accumulated seconds keyed by stage name.
+    callback : {None, callable}
+      Called as ``callback(kind, name, value)`` on each update, where
+      kind is 'count' or 'time'. Use it to forward updates to an
+      external metrics system.
+    """
+
+    def __init__(self, callback=None):
+        self.counts = defaultdict(int)
+        self.times = defaultdict(float)
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '%s(counts=%r, times=%r)' % (self.__class__.__name__,
+                                            dict(self.counts), dict(self.times))
+
+    def __str__(self):
+        lines = ['%-20s %14s' % (name, value) for name, value in sorted(self.counts.items())]
+        lines += ['%-20s %12.6fs' % (stage, seconds) for stage, seconds in sorted(self.times.items())]
+        return '\n'.join(lines)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counts[name] += value
+        if self.callback is not None:
+            self.callback('count', name, value)
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            self.times[stage] += seconds
+        if self.callback is not None:
+            self.callback('time', stage, seconds)
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+            self.times.clear()
+
+    def as_dict(self):
+        """ Return a copy of counters and stage times as a dict.
+        """
+        with self._lock:
+            return dict(counts=dict(self.counts), times=dict(self.times))
+
+
+@contextmanager
+def collect(stats=None, callback=None):
+    """ Collect instrumentation data within a with-block.
+
+    Parameters
+    ----------
+    stats : {None, Stats}
+      Specify Stats instance to be updated. By default, a new instance
+      is created.
+    callback : {None, callable}
+      See Stats.callback. Used when stats is None.
+
+    Returns
+    -------
+    stats : Stats
+    """
+    global enabled
+    if stats is None:
+        stats = Stats(callback=callback)
+    usage = resource.getrusage(resource.RUSAGE_SELF) if resource else None
+    with _lock:
+        _active.append(stats)
+        enabled = True
+    try:
+        yield stats
+    finally:
+        with _lock:
+            _active.remove(stats)
+            enabled = bool(_active)
+        if usage is not None:
+            end_usage = resource.getrusage(resource.RUSAGE_SELF)
+            stats.count('minor_page_faults', end_usage.ru_minflt - usage.ru_minflt)
+            stats.count('major_page_faults', end_usage.ru_majflt - usage.ru_majflt)
+
+
+def count(name, value=1):
+    """ Increase counter of all collecting Stats instances.
+    """
+    for stats in list(_active):
+        stats.count(name, value)
+
+
+class _Timer:
+
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        seconds = time.perf_counter() - self.start
+        for stats in list(_active):
+            stats.add_time(self.stage, seconds)
+
+
+class _NullTimer:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_null_timer = _NullTimer()
+
+
+def timer(stage):
+    """ Return context manager that adds the time of a with-block to a
+    stage time of all collecting Stats instances.
+    """
+    if enabled:
+        return _Timer(stage)
+    return _null_timer
@@ -15,12 +15,14 @@ import ctypes
 import ctypes.util
 import struct
 import collections
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 __author__ = 'Pearu Peterson'
 __date__ = 'April 2009'
 __license__ = 'BSD'
 __version__ = '0.3-svn'
-__all__ = ['libtiff', 'TIFF']
+__all__ = ['libtiff', 'TIFF', 'TIFFReaderPool']
 
 if os.name == 'nt':
     # assume that the directory of libtiff3.dll is in PATH.
@@ -304,7 +306,10 @@ class TIFFExtender(object):
 def add_tags(tag_list):
     tag_list_array = (TIFFFieldInfo * len(tag_list))(*tag_list)
     for field_info in tag_list_array:
-        _name = "TIFFTAG_" + str(field_info.field_name).upper()
+        field_name = field_info.field_name
+        if isinstance(field_name, bytes):
+            field_name = field_name.decode()
+        _name = "TIFFTAG_" + field_name.upper()
         globals()[_name] = field_info.field_tag
         if field_info.field_writecount > 1 and field_info.field_type != \
                 TIFFDataType.TIFF_ASCII:
@@ -315,6 +320,7 @@ def add_tags(tag_list):
         else:
             tifftags[field_info.field_tag] = (
                 ttype2ctype[field_info.field_type], lambda _d: _d.value)
+        register_tag(field_info.field_tag, field_name)
 
     return TIFFExtender(tag_list_array)
 
@@ -435,6 +441,13 @@ def debug(func):
     # return new_func
 
 
+TileGeometry = collections.namedtuple(
+    'TileGeometry',
+    ['width', 'length', 'depth', 'tile_width', 'tile_length', 'tile_depth',
+     'samples_pp', 'planar_config', 'dtype', 'tiles_across', 'tiles_down',
+     'tiles_deep', 'planes', 'plane_samples', 'tile_size', 'tiled'])
+
+
 class TIFF(ctypes.c_void_p):
     """ Holds a pointer to TIFF object.
 
@@ -513,13 +526,17 @@ class TIFF(ctypes.c_void_p):
         return typ
 
     @debug
-    def read_image(self, verbose=False):
-        """ Read image from TIFF and return it as an array. """
+    def read_image(self, verbose=False, out=None):
+        """ Read image from TIFF and return it as an array.
+
+        Parameters
+        ----------
+        out : {None, numpy.ndarray}
+          C-contiguous array where the image is decoded to. Its shape
+          and dtype must match with the image.
+        """
         if self.IsTiled():
-            bits = self.GetField('BitsPerSample')
-            sample_format = self.GetField('SampleFormat')
-            typ = self.get_numpy_type(bits, sample_format)
-            return self.read_tiles(typ)
+            return self.read_tiles(out=out)
         else:
             width = self.GetField('ImageWidth')
             height = self.GetField('ImageLength')
@@ -545,14 +562,15 @@ class TIFF(ctypes.c_void_p):
 
             if samples_pp == 1:
                 # only 2 dimensions array
-                arr = np.empty((height, width), typ)
+                shape = (height, width)
             else:
                 if planar_config == PLANARCONFIG_CONTIG:
-                    arr = np.empty((height, width, samples_pp), typ)
+                    shape = (height, width, samples_pp)
                 elif planar_config == PLANARCONFIG_SEPARATE:
-                    arr = np.empty((samples_pp, height, width), typ)
+                    shape = (samples_pp, height, width)
                 else:
                     raise IOError("Unexpected PlanarConfig = %d" % planar_config)
+            arr = self._get_out_array(out, shape, typ)
             size = arr.nbytes
 
             if compression == COMPRESSION_NONE:
@@ -566,6 +584,21 @@ class TIFF(ctypes.c_void_p):
                 pos += elem
             return arr
 
+    @staticmethod
+    def _get_out_array(out, shape, dtype):
+        """ Return out when it is a C-contiguous writable array with
+        given shape and dtype, or a new array when out is None.
+        """
+        if out is None:
+            return np.empty(shape, dtype)
+        shape, dtype = tuple(shape), np.dtype(dtype)
+        if out.shape != shape or out.dtype != dtype:
+            raise ValueError('expected out array with shape %s and dtype %s but got %s and %s'
+                             % (shape, dtype, out.shape, out.dtype))
+        if not (out.flags.c_contiguous and out.flags.writeable):
+            raise ValueError('out array must be C-contiguous and writable')
+        return out
+
     @staticmethod
     def _fix_compression(_value):
         if isinstance(_value, int):
@@ -628,17 +661,20 @@ class TIFF(ctypes.c_void_p):
         else:
             WriteStrip = self.WriteEncodedStrip
 
-        self.SetField(TIFFTAG_COMPRESSION, compression)
-        if compression == COMPRESSION_LZW and sample_format in \
-                [SAMPLEFORMAT_INT, SAMPLEFORMAT_UINT]:
-            # This field can only be set after compression and before
-            # writing data. Horizontal predictor often improves compression,
-            # but some rare readers might support LZW only without predictor.
-            self.SetField(TIFFTAG_PREDICTOR, PREDICTOR_HORIZONTAL)
+        def set_sample_fields():
+            self.SetField(TIFFTAG_COMPRESSION, compression)
+            if compression == COMPRESSION_LZW and sample_format in \
+                    [SAMPLEFORMAT_INT, SAMPLEFORMAT_UINT]:
+                # This field can only be set after compression and before
+                # writing data. Horizontal predictor often improves compression,
+                # but some rare readers might support LZW only without predictor.
+                self.SetField(TIFFTAG_PREDICTOR, PREDICTOR_HORIZONTAL)
 
-        self.SetField(TIFFTAG_BITSPERSAMPLE, bits)
-        self.SetField(TIFFTAG_SAMPLEFORMAT, sample_format)
-        self.SetField(TIFFTAG_ORIENTATION, ORIENTATION_TOPLEFT)
+            self.SetField(TIFFTAG_BITSPERSAMPLE, bits)
+            self.SetField(TIFFTAG_SAMPLEFORMAT, sample_format)
+            self.SetField(TIFFTAG_ORIENTATION, ORIENTATION_TOPLEFT)
+
+        set_sample_fields()
 
         if len(shape) == 1:
             shape = (shape[0], 1)  # Same as 2D with height == 1
@@ -690,6 +726,9 @@ class TIFF(ctypes.c_void_p):
                 depth, height, width = shape
                 size = width * height * arr.itemsize
                 for _n in range(depth):
+                    if _n:
+                        # WriteDirectory resets all fields
+                        set_sample_fields()
                     self.SetField(TIFFTAG_IMAGEWIDTH, width)
                     self.SetField(TIFFTAG_IMAGELENGTH, height)
                     self.SetField(TIFFTAG_PHOTOMETRIC, PHOTOMETRIC_MINISBLACK)
@@ -702,6 +741,27 @@ class TIFF(ctypes.c_void_p):
 
     def write_tiles(self, arr, tile_width=None, tile_height=None,
                     compression=None, write_rgb=False):
+        """ Write array as a tiled image to TIFF.
+
+        Parameters
+        ----------
+        arr : array
+          Specify image data of rank 1 to 4. Rank 3 data is written as
+          an RGB image when write_rgb is True, with shape (height,
+          width, samples) or (samples, height, width), otherwise as a
+          (depth, height, width) volume. Rank 4 data is a volume with
+          shape (depth, height, width, samples).
+        tile_width, tile_height : {None, int}
+          Specify tile size, must be multiples of 16. By default, the
+          values of TileWidth and TileLength fields are used.
+        compression : {None, str, int}
+          See write_image.
+        write_rgb : bool
+
+        Returns
+        -------
+        written_bytes : int
+        """
         compression = self._fix_compression(compression)
 
         if arr.dtype in np.sctypes['float']:
@@ -740,101 +800,378 @@ class TIFF(ctypes.c_void_p):
         self.SetField(TIFFTAG_TILEWIDTH, tile_width)
         self.SetField(TIFFTAG_TILELENGTH, tile_height)
 
-        total_written_bytes = 0
         if len(shape) == 1:
-            shape = (shape[0], 1)  # Same as 2D with height == 1
-
-        def write_plane(arr, tile_arr, width, height, plane_index=0, depth_index=0):
-            """ Write all tiles of one plane
-            """
-            written_bytes = 0
-            tile_arr = np.ascontiguousarray(tile_arr)
-            # Rows
-            for y in range(0, height, tile_height):
-                # Cols
-                for x in range(0, width, tile_width):
-                    # If we are over the edge of the image, use 0 as fill
-                    tile_arr[:] = 0
+            arr = arr.reshape((1, shape[0]))  # Same as 2D with height == 1
+            shape = arr.shape
 
-                    # if the tile is on the edge, it is smaller
-                    this_tile_width = min(tile_width, width - x)
-                    this_tile_height = min(tile_height, height - y)
-
-                    tile_arr[:this_tile_height, :this_tile_width] = \
-                        arr[y:y + this_tile_height, x:x + this_tile_width]
+        # planes has shape (planes, depth, height, width, samples)
+        if len(shape) == 2:
+            planes = arr[None, None, :, :, None]
+            photometric = PHOTOMETRIC_MINISBLACK
+        elif len(shape) == 3 and write_rgb:
+            # Guess the planar config, with preference for separate planes
+            if shape[2] == 3 or shape[2] == 4:
+                planes = arr[None, None]
+            else:
+                planes = arr[:, None, :, :, None]
+            photometric = PHOTOMETRIC_RGB
+        elif len(shape) == 3:
+            planes = arr[None, :, :, :, None]
+            photometric = PHOTOMETRIC_MINISBLACK
+        elif len(shape) == 4:
+            # (depth, height, width, samples)
+            planes = arr[None]
+            photometric = PHOTOMETRIC_RGB if shape[3] in [3, 4] else PHOTOMETRIC_MINISBLACK
+        else:
+            raise NotImplementedError(repr(shape))
+        num_planes, depth, height, width, plane_samples = planes.shape
+        samples_pp = max(num_planes, plane_samples)
+        if num_planes > 1:
+            planar_config = PLANARCONFIG_SEPARATE
+        else:
+            planar_config = PLANARCONFIG_CONTIG
 
-                    r = self.WriteTile(tile_arr.ctypes.data, x, y, depth_index, plane_index)
-                    written_bytes += r.value
+        self.SetField(TIFFTAG_IMAGEWIDTH, width)
+        self.SetField(TIFFTAG_IMAGELENGTH, height)
+        self.SetField(TIFFTAG_PHOTOMETRIC, photometric)
+        self.SetField(TIFFTAG_PLANARCONFIG, planar_config)
+        if depth > 1:
+            self.SetField(TIFFTAG_IMAGEDEPTH, depth)
+        if samples_pp > 1:
+            self.SetField(TIFFTAG_SAMPLESPERPIXEL, samples_pp)
+            if photometric == PHOTOMETRIC_RGB and samples_pp == 4:  # RGBA
+                self.SetField(TIFFTAG_EXTRASAMPLES,
+                              [EXTRASAMPLE_UNASSALPHA],
+                              count=1)
+            elif samples_pp > 3 or photometric != PHOTOMETRIC_RGB:
+                extra_samples = samples_pp - (3 if photometric == PHOTOMETRIC_RGB else 1)
+                self.SetField(TIFFTAG_EXTRASAMPLES,
+                              [EXTRASAMPLE_UNSPECIFIED] * extra_samples,
+                              count=extra_samples)
+
+        total_written_bytes = self._write_tile_planes(planes, tile_width, tile_height)
+        self.WriteDirectory()
+        return total_written_bytes
 
-            return written_bytes
+    def _write_tile_planes(self, planes, tile_width, tile_height):
+        """ Encode and write all tiles of image.
 
-        if len(shape) == 2:
-            height, width = shape
+        planes is an array with shape (planes, depth, height, width,
+        samples). The tiles of one tile row are gathered into a
+        reusable tile-major buffer with a single array assignment;
+        only the tiles on the right and bottom edges of the image are
+        padded with zeros. Each tile is then passed to
+        TIFFWriteEncodedTile by tile index.
+        """
+        num_planes, depth, height, width, plane_samples = planes.shape
+        tiles_across = -(-width // tile_width)
+        tiles_down = -(-height // tile_height)
+        full_across = width // tile_width
+        full_width = full_across * tile_width
+        band = np.empty((tiles_across, tile_height, tile_width, plane_samples),
+                        dtype=planes.dtype)
+        tile_size = band[0].nbytes
+        address = band.ctypes.data
+        written_bytes = 0
+        tile = 0
+        for plane in planes:
+            for layer in plane:
+                for ty in range(tiles_down):
+                    y = ty * tile_height
+                    rows = min(tile_height, height - y)
+                    if rows < tile_height:
+                        band[:, rows:] = 0
+                    band[:full_across, :rows] = layer[y:y + rows, :full_width].reshape(
+                        rows, full_across, tile_width, plane_samples).transpose(1, 0, 2, 3)
+                    if full_across < tiles_across:
+                        band[-1, :rows, width - full_width:] = 0
+                        band[-1, :rows, :width - full_width] = layer[y:y + rows, full_width:]
+                    for i in range(tiles_across):
+                        r = self.WriteEncodedTile(tile, address + i * tile_size, tile_size)
+                        if r < 0:
+                            raise IOError('Failed to write tile %d' % (tile))
+                        written_bytes += r
+                        tile += 1
+        return written_bytes
+
+    def write_pyramid(self, arr, tile_width=None, tile_height=None,
+                      compression=None, write_rgb=False, factor=2,
+                      method='mean', levels=None):
+        """ Write array and its reduced-resolution levels as tiled images.
+
+        The full-resolution image is written first, followed by
+        levels downsampled by factor, factor**2, ..., each in its own
+        directory with NewSubfileType set to FILETYPE_REDUCEDIMAGE.
+        Each level is computed from the previous one.
+
+        Levels are tiled, read them with get_pyramid or other libtiff
+        based readers. TIFFfile reads only striped images, it does not
+        read the written directories.
 
-            self.SetField(TIFFTAG_IMAGEWIDTH, width)
-            self.SetField(TIFFTAG_IMAGELENGTH, height)
-            self.SetField(TIFFTAG_PHOTOMETRIC, PHOTOMETRIC_MINISBLACK)
-            self.SetField(TIFFTAG_PLANARCONFIG, PLANARCONFIG_CONTIG)
+        Parameters
+        ----------
+        arr : array
+          See write_tiles.
+        tile_width, tile_height, compression, write_rgb :
+          See write_tiles.
+        factor : int
+          Specify the downsampling factor between levels.
+        method : {'mean', 'decimate'}
+          See libtiff.pyramid.downsample.
+        levels : {None, int}
+          Specify the number of levels including the full-resolution
+          image. By default, levels are written until a level fits in
+          one tile.
 
-            # if there's only one sample per pixel, there is only one plane
-            tile_arr = np.zeros((tile_height, tile_width), dtype=arr.dtype)
-            total_written_bytes = write_plane(arr, tile_arr, width, height)
-            self.WriteDirectory()
-        elif len(shape) == 3:
-            if write_rgb:
-                # Guess the planar config, with preference for separate planes
-                if shape[2] == 3 or shape[2] == 4:
-                    planar_config = PLANARCONFIG_CONTIG
-                    height, width, depth = shape
-                else:
-                    planar_config = PLANARCONFIG_SEPARATE
-                    depth, height, width = shape
+        Returns
+        -------
+        shapes : list
+          Shapes of written levels.
+        """
+        from .pyramid import iter_pyramid, get_spatial_axes
+        if not tile_width:
+            tile_width = self.GetField("TileWidth")
+        if not tile_height:
+            tile_height = self.GetField("TileLength")
+        if tile_width is None or tile_height is None:
+            raise ValueError("TileWidth and TileLength must be specified")
+        if arr.ndim == 1:
+            arr = arr.reshape((1, arr.shape[0]))
+        axes = get_spatial_axes(arr.shape, write_rgb=write_rgb)
+        shapes = []
+        for level, level_arr in enumerate(
+                iter_pyramid(arr, factor=factor, axes=axes, method=method,
+                             min_size=max(tile_width, tile_height),
+                             levels=levels)):
+            if level:
+                self.SetField(TIFFTAG_SUBFILETYPE, FILETYPE_REDUCEDIMAGE)
+            self.write_tiles(level_arr, tile_width, tile_height,
+                             compression=compression, write_rgb=write_rgb)
+            shapes.append(level_arr.shape)
+        return shapes
+
+    def get_pyramid(self, dirnum=0):
+        """ Return TiffPyramid of full-resolution directory dirnum and
+        its reduced-resolution directories.
+        """
+        from .pyramid import TiffPyramid
+        return TiffPyramid(self, dirnum)
 
-                self.SetField(TIFFTAG_PHOTOMETRIC, PHOTOMETRIC_RGB)
-                self.SetField(TIFFTAG_IMAGEWIDTH, width)
-                self.SetField(TIFFTAG_IMAGELENGTH, height)
-                self.SetField(TIFFTAG_SAMPLESPERPIXEL, depth)
-                self.SetField(TIFFTAG_PLANARCONFIG, planar_config)
-                if depth == 4:  # RGBA
-                    self.SetField(TIFFTAG_EXTRASAMPLES,
-                                  [EXTRASAMPLE_UNASSALPHA],
-                                  count=1)
-                elif depth > 4:  # No idea...
-                    self.SetField(TIFFTAG_EXTRASAMPLES,
-                                  [EXTRASAMPLE_UNSPECIFIED] * (depth - 3),
-                                  count=(depth - 3))
+    def get_tile_geometry(self):
+        """ Return TileGeometry of the current directory.
 
-                if planar_config == PLANARCONFIG_CONTIG:
-                    # if there is more than one sample per pixel and it's contiguous in memory,
-                    # there is only one plane
-                    tile_arr = np.zeros((tile_height, tile_width, depth), dtype=arr.dtype)
-                    total_written_bytes = write_plane(arr, tile_arr, width, height)
-                else:
-                    # multiple samples per pixel, each sample in one plane
-                    tile_arr = np.zeros((tile_height, tile_width), dtype=arr.dtype)
-                    for plane_index in xrange(depth):
-                        total_written_bytes += \
-                            write_plane(arr[plane_index], tile_arr, width, height, plane_index)
+        The geometry is computed once per directory, it is reset when
+        the current directory or its fields change. Strips of a
+        striped image are described as tiles that span the image
+        width.
+        """
+        geometry = self._tile_geometry
+        if geometry is not None:
+            return geometry
+        width = self.GetField("ImageWidth")
+        if width is None:
+            raise ValueError("TIFFTAG_IMAGEWIDTH must be set to read tiles")
+        length = self.GetField("ImageLength")
+        if length is None:
+            length = 1
+        depth = self.GetField("ImageDepth")
+        if depth is None:
+            depth = 1
+        tiled = bool(self.IsTiled())
+        if tiled:
+            tile_width = self.GetField("TileWidth")
+            if tile_width is None:
+                raise ValueError("TIFFTAG_TILEWIDTH must be set to read tiles")
+            tile_length = self.GetField("TileLength")
+            if tile_length is None:
+                raise ValueError("TIFFTAG_TILELENGTH must be set to read tiles")
+            tile_depth = self.GetField("TileDepth") or 1
+            tile_size = self.TileSize()
+        else:
+            if depth != 1:
+                raise NotImplementedError("ImageDepth > 1 for striped images")
+            tile_width, tile_depth = width, 1
+            tile_length = min(self.GetField("RowsPerStrip") or length, length)
+            tile_size = self.StripSize()
+        # this number includes extra samples
+        samples_pp = self.GetField('SamplesPerPixel')
+        if samples_pp is None:  # default is 1
+            samples_pp = 1
+        planar_config = self.GetField('PlanarConfig')
+        if planar_config is None:  # default is contig
+            planar_config = PLANARCONFIG_CONTIG
+        if planar_config == PLANARCONFIG_CONTIG:
+            planes, plane_samples = 1, samples_pp
+        elif planar_config == PLANARCONFIG_SEPARATE:
+            planes, plane_samples = samples_pp, 1
+        else:
+            raise IOError("Unexpected PlanarConfig = %d" % planar_config)
+        bits = self.GetField('BitsPerSample')
+        sample_format = self.GetField('SampleFormat')
+        # TODO: might need special support if bits < 8
+        dtype = np.dtype(self.get_numpy_type(bits, sample_format))
+        geometry = TileGeometry(
+            width, length, depth, tile_width, tile_length, tile_depth,
+            samples_pp, planar_config, dtype,
+            -(-width // tile_width), -(-length // tile_length),
+            -(-depth // tile_depth), planes, plane_samples, tile_size, tiled)
+        self._tile_geometry = geometry
+        return geometry
+
+    def _get_tile_bands(self, geometry, box, planes):
+        """ Return bands of tiles that intersect with box.
+
+        A band is a tuple (plane_index, plane, tz, ty, tx0, tx1) that
+        holds tiles with columns tx0 <= tx < tx1 of tile row ty in
+        tile layer tz of sample plane.
+        """
+        z0, z1, y0, y1, x0, x1 = box
+        tx0 = x0 // geometry.tile_width
+        tx1 = -(-x1 // geometry.tile_width)
+        return [(plane_index, plane, tz, ty, tx0, tx1)
+                for plane_index, plane in enumerate(planes)
+                for tz in range(z0 // geometry.tile_depth,
+                                -(-z1 // geometry.tile_depth))
+                for ty in range(y0 // geometry.tile_length,
+                                -(-y1 // geometry.tile_length))]
+
+    def _read_tile_bands(self, geometry, bands, out, box):
+        """ Decode bands of tiles and copy their content to out.
+
+        out is an array with shape (len(planes), z1 - z0, y1 - y0,
+        x1 - x0, plane_samples) that holds the box (z0, z1, y0, y1,
+        x0, x1) of the image. Each tile is decoded by
+        TIFFReadEncodedTile (or TIFFReadEncodedStrip) directly into a
+        scratch buffer of one tile row so that a band is copied to out
+        with one array assignment. Strips that start inside the box
+        of a full-width contiguous out are decoded directly into out.
+        Returns the number of decoded bytes.
+        """
+        z0, z1, y0, y1, x0, x1 = box
+        td, tl, tw = geometry.tile_depth, geometry.tile_length, geometry.tile_width
+        tile_shape = (td, tl, tw, geometry.plane_samples)
+        tile_size = geometry.tile_size
+        if tile_size != np.prod(tile_shape) * out.dtype.itemsize:
+            raise ValueError('TIFFTileSize=%s does not match tile shape %s of %s'
+                             % (tile_size, tile_shape, out.dtype))
+        ncols = max(tx1 - tx0 for _, _, _, _, tx0, tx1 in bands) if bands else 0
+        scratch = np.empty((ncols,) + tile_shape, dtype=out.dtype)
+        address = scratch.ctypes.data
+        if geometry.tiled:
+            read_encoded = self.ReadEncodedTile
+            direct = False
+        else:
+            read_encoded = self.ReadEncodedStrip
+            direct = x0 == 0 and x1 == geometry.width and out.flags.c_contiguous
+            row_size = out[0, 0, 0].nbytes if out.size else 0
+        decoded = 0
+        tiles_per_layer = geometry.tiles_across * geometry.tiles_down
+        tiles_per_plane = tiles_per_layer * geometry.tiles_deep
+        for plane_index, plane, tz, ty, tx0, tx1 in bands:
+            first_tile = plane * tiles_per_plane + tz * tiles_per_layer \
+                + ty * geometry.tiles_across
+            if direct and ty * tl >= y0:
+                # decode strip rows y0 <= y < y1 directly into out
+                row = ty * tl - y0
+                size = min(tile_size, (y1 - y0 - row) * row_size)
+                r = read_encoded(first_tile, out[plane_index, 0, row].ctypes.data, size)
+                if r < 0:
+                    raise ValueError(
+                        "Could not read strip %d from file" % (first_tile))
+                decoded += r
+                continue
+            for i, tx in enumerate(range(tx0, tx1)):
+                r = read_encoded(first_tile + tx, address + i * tile_size,
+                                 tile_size)
+                if r < 0:
+                    raise ValueError(
+                        "Could not read tile x:%d,y:%d,z:%d,sample:%d from file" %
+                        (tx * tw, ty * tl, tz * td, plane))
+                decoded += r
+            n = tx1 - tx0
+            band = scratch[:n].transpose(1, 2, 0, 3, 4).reshape(td, tl, n * tw, -1)
+            bz0, bz1 = max(z0, tz * td), min(z1, tz * td + td)
+            by0, by1 = max(y0, ty * tl), min(y1, ty * tl + tl)
+            out[plane_index, bz0 - z0:bz1 - z0, by0 - y0:by1 - y0] = \
+                band[bz0 - tz * td:bz1 - tz * td, by0 - ty * tl:by1 - ty * tl,
+                     x0 - tx0 * tw:x1 - tx0 * tw]
+        return decoded
+
+    def _read_tile_box(self, geometry, box, planes, dtype=None, pool=None,
+                       out=None):
+        """ Read box (z0, z1, y0, y1, x0, x1) of sample planes.
+
+        Returns an array with shape (len(planes), z1 - z0, y1 - y0,
+        x1 - x0, plane_samples) and the number of decoded bytes. When
+        out is specified, it must have this shape. When pool is a
+        TIFFReaderPool of the same file, bands of tiles are decoded in
+        parallel.
+        """
+        z0, z1, y0, y1, x0, x1 = box
+        if dtype is None:
+            dtype = geometry.dtype
+        shape = (len(planes), z1 - z0, y1 - y0, x1 - x0, geometry.plane_samples)
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        elif out.shape != shape or out.dtype != dtype:
+            raise ValueError('expected out array with shape %s and dtype %s but got %s and %s'
+                             % (shape, dtype, out.shape, out.dtype))
+        bands = self._get_tile_bands(geometry, box, planes)
+        if pool is None or len(bands) < 2:
+            decoded = self._read_tile_bands(geometry, bands, out, box)
+        else:
+            dirnum = self.CurrentDirectory()
+            chunks = [bands[i::pool.nthreads] for i in range(pool.nthreads)]
+            futures = [pool.submit_tile_bands(dirnum, geometry, chunk, out, box)
+                       for chunk in chunks if chunk]
+            decoded = sum(future.result() for future in futures)
+        return out, decoded
 
-                self.WriteDirectory()
-            else:
-                depth, height, width = shape
-                self.SetField(TIFFTAG_IMAGEWIDTH, width)
-                self.SetField(TIFFTAG_IMAGELENGTH, height)
-                self.SetField(TIFFTAG_PHOTOMETRIC, PHOTOMETRIC_MINISBLACK)
-                self.SetField(TIFFTAG_PLANARCONFIG, PLANARCONFIG_CONTIG)
-                self.SetField(TIFFTAG_IMAGEDEPTH, depth)
-                for depth_index in range(depth):
-                    # if there's only one sample per pixel, there is only one plane
-                    tile_arr = np.zeros((tile_height, tile_width), dtype=arr.dtype)
-                    total_written_bytes += write_plane(arr[depth_index], tile_arr, width, height,
-                                                       0, depth_index)
-                self.WriteDirectory()
+    @staticmethod
+    def _squeeze_tile_box(geometry, arr):
+        """ Return array from _read_tile_box in the shape used by
+        read_tiles.
+        """
+        if geometry.planar_config == PLANARCONFIG_CONTIG:
+            arr = arr[0]  # (depth, length, width, samples)
+            if geometry.samples_pp == 1:
+                arr = arr[..., 0]
+            if geometry.depth == 1:
+                arr = arr[0]
         else:
-            raise NotImplementedError(repr(shape))
+            arr = arr[..., 0]  # (samples, depth, length, width)
+            if geometry.depth == 1:
+                arr = arr[:, 0]
+        return arr
 
-        return total_written_bytes
+    @staticmethod
+    def _get_image_shape(geometry):
+        """ Return the shape of array returned by read_image.
+        """
+        shape = (geometry.length, geometry.width)
+        if geometry.depth != 1:
+            shape = (geometry.depth,) + shape
+        if geometry.planar_config == PLANARCONFIG_CONTIG:
+            if geometry.samples_pp != 1:
+                shape = shape + (geometry.samples_pp,)
+        else:
+            shape = (geometry.samples_pp,) + shape
+        return shape
 
+    def _read_directory_into(self, out, reference):
+        """ Read current directory into out array with shape (planes,
+        depth, length, width, plane_samples) of the reference geometry.
+        """
+        geometry = self.get_tile_geometry()
+        for name in ['width', 'length', 'depth', 'samples_pp',
+                     'planar_config', 'dtype']:
+            if getattr(geometry, name) != getattr(reference, name):
+                raise ValueError('directory %d has %s=%r, expected %r'
+                                 % (self.CurrentDirectory(), name,
+                                    getattr(geometry, name),
+                                    getattr(reference, name)))
+        box = (0, geometry.depth, 0, geometry.length, 0, geometry.width)
+        return self._read_tile_box(geometry, box, range(geometry.planes), out=out)[1]
 
     def read_one_tile(self, x, y):
         """
@@ -857,187 +1194,159 @@ class TIFF(ctypes.c_void_p):
             If PlanarConfig == PLANARCONFIG_SEPARATE, 
             the returned dimensions will be (sample_index, x, y).
         """
-
-        num_tcols = self.GetField("TileWidth")
-        if num_tcols is None:
+        geometry = self.get_tile_geometry()
+        if not geometry.tiled:
             raise ValueError("TIFFTAG_TILEWIDTH must be set to read tiles")
-        num_trows = self.GetField("TileLength")
-        if num_trows is None:
-            num_trows = 1
-        num_irows = self.GetField("ImageLength")
-        if num_irows is None:
-            num_irows = 1
-        num_icols = self.GetField("ImageWidth")
-        if num_icols is None:
-            raise ValueError("TIFFTAG_IMAGEWIDTH must be set to read tiles")
-        # this number includes extra samples
-        samples_pp = self.GetField('SamplesPerPixel')
-        if samples_pp is None:  # default is 1
-            samples_pp = 1
-        planar_config = self.GetField('PlanarConfig')
-        if planar_config is None:  # default is contig
-            planar_config = PLANARCONFIG_CONTIG
-        num_idepth = self.GetField("ImageDepth")
-        if num_idepth is None:
-            num_idepth = 1
-        bits = self.GetField('BitsPerSample')
-        sample_format = self.GetField('SampleFormat')
-
-        # TODO: might need special support if bits < 8
-        dtype = self.get_numpy_type(bits, sample_format)
-
-        if y < 0 or y >= num_irows:
+        if y < 0 or y >= geometry.length:
             raise ValueError("Invalid y value")
-        if x < 0 or x >= num_icols:
+        if x < 0 or x >= geometry.width:
             raise ValueError("Invalid x value")
 
         # make x and y be a multiple of TileWidth and TileLength,
-        # and be compatible with ReadTile
-        x -= x % num_tcols
-        y -= y % num_trows
-
         # if the tile is in the border, its size should be smaller
-        this_tile_height = min(num_trows, num_irows - y)
-        this_tile_width = min(num_tcols, num_icols - x)
-
-        def read_plane(tile_plane, plane_index=0, depth_index=0):
-            """ Read one plane from TIFF. The TIFF has more than one plane only if
-            it has more than one sample per pixel, and planar_config == PLANARCONFIG_SEPARATE
-            """
-            # the numpy array should be contigous in memory before calling ReadTile
-            tile_plane = np.ascontiguousarray(tile_plane)
-            # even if the tile is on the edge, and the final size will be smaller,
-            # the size of the array passed to the ReadTile function
-            # must be (num_tcols, num_trows)
-            #
-            # The image has only one depth (ImageDepth == 1), so
-            # the z parameter is not read
-            r = self.ReadTile(tile_plane.ctypes.data, x, y, depth_index, plane_index)
-            if not r:
-                raise ValueError(
-                    "Could not read tile x:%d,y:%d,z:%d,sample:%d from file" %
-                    (x, y, depth_index, plane_index))
-
-            # check if the tile is on the edge of the image
-            if this_tile_height < num_trows or this_tile_width < num_tcols:
-                # if the tile is on the edge of the image, generate a smaller tile
-                tile_plane = tile_plane[:this_tile_height, :this_tile_width]
-
-            return tile_plane
-
-        if num_idepth == 1:
-            if samples_pp == 1:
-                # the tile plane has always the size of a full tile
-                tile_plane = np.zeros((num_trows, num_tcols), dtype=dtype)
-                # this tile may be smaller than tile_plane
-                tile = read_plane(tile_plane)
-            else:
-                if planar_config == PLANARCONFIG_CONTIG:
-                    # the tile plane has always the size of a full tile
-                    tile_plane = np.empty((num_trows, num_tcols, samples_pp), dtype=dtype)
-                    # this tile may be smaller than tile_plane,
-                    # if the tile is on the edge of the image
-                    tile = read_plane(tile_plane)
-                else:
-                    # the tile plane has always the size of a full tile
-                    tile_plane = np.empty((samples_pp, num_trows, num_tcols), dtype=dtype)
-                    # this tile may be smaller than tile_plane,
-                    # if the tile is on the edge of the image
-                    tile = np.empty((samples_pp, this_tile_height, this_tile_width), dtype=dtype)
-                    for plane_index in xrange(samples_pp):
-                        tile[plane_index] = read_plane(tile_plane[plane_index], plane_index)
+        x -= x % geometry.tile_width
+        y -= y % geometry.tile_length
+        box = (0, geometry.depth,
+               y, min(y + geometry.tile_length, geometry.length),
+               x, min(x + geometry.tile_width, geometry.width))
+        tile, decoded = self._read_tile_box(geometry, box, range(geometry.planes))
+        return self._squeeze_tile_box(geometry, tile)
 
-        else:
-            if samples_pp > 1:
-                raise NotImplementedError("ImageDepth > 1 and SamplesPerPixel > 1 not implemented")
-
-            # the tile plane has always the size of a full tile
-            tile_plane = np.zeros((num_idepth, num_trows, num_tcols), dtype=dtype)
-            # this tile may be smaller than tile_plane,
-            # if the tile is on the edge of the image
-            tile = np.empty((num_idepth, this_tile_height, this_tile_width), dtype=dtype)
-            for depth_index in xrange(num_idepth):
-                # As samples_pp == 1, there's only one plane, so the z parameter is not read
-                tile[depth_index] = read_plane(tile_plane[depth_index], 0, depth_index)
-
-        return tile
-
-    def read_tiles(self, dtype=np.uint8):
-        num_tcols = self.GetField("TileWidth")
-        if num_tcols is None:
-            raise ValueError("TIFFTAG_TILEWIDTH must be set to read tiles")
-        num_trows = self.GetField("TileLength")
-        if num_trows is None:
-            raise ValueError("TIFFTAG_TILELENGTH must be set to read tiles")
-        num_icols = self.GetField("ImageWidth")
-        if num_icols is None:
-            raise ValueError("TIFFTAG_IMAGEWIDTH must be set to read tiles")
-        num_irows = self.GetField("ImageLength")
-        if num_irows is None:
-            num_irows = 1
-        num_depths = self.GetField("ImageDepth")
-        if num_depths is None:
-            num_depths = 1
-        # this number includes extra samples
-        samples_pp = self.GetField('SamplesPerPixel')
-        if samples_pp is None:  # default is 1
-            samples_pp = 1
-        planar_config = self.GetField('PlanarConfig')
-        if planar_config is None:  # default is contig
-            planar_config = PLANARCONFIG_CONTIG
+    def read_tiles(self, dtype=None, pool=None, out=None):
+        """ Read tiled image from TIFF and return it as an array.
 
-        def read_plane(plane, tmp_tile, plane_index=0, depth_index=0):
-            for y in xrange(0, num_irows, num_trows):
-                for x in xrange(0, num_icols, num_tcols):
-                    r = self.ReadTile(tmp_tile.ctypes.data, x, y, depth_index, plane_index)
-                    if not r:
-                        raise ValueError(
-                            "Could not read tile x:%d,y:%d,z:%d,sample:%d from file" %
-                            (x, y, plane_index, depth_index))
-
-                    # if the tile is on the edge, it is smaller
-                    tile_width = min(num_tcols, num_icols - x)
-                    tile_height = min(num_trows, num_irows - y)
-
-                    plane[y:y + tile_height, x:x + tile_width] = \
-                        tmp_tile[:tile_height, :tile_width]
-
-        if samples_pp == 1:
-            if num_depths == 1:
-                # if there's only one sample per pixel there is only one plane
-                full_image = np.empty((num_irows, num_icols), dtype=dtype, order='C')
-                tmp_tile = np.empty((num_trows, num_tcols), dtype=dtype, order='C')
-                read_plane(full_image, tmp_tile)
-            else:
-                full_image = np.empty((num_depths, num_irows, num_icols), dtype=dtype, order='C')
-                tmp_tile = np.empty((num_trows, num_tcols), dtype=dtype, order='C')
-                for depth_index in xrange(num_depths):
-                    read_plane(full_image[depth_index], tmp_tile, 0, depth_index)
-        else:
-            if planar_config == PLANARCONFIG_CONTIG:
-                # if there is more than one sample per pixel and it's contiguous in memory,
-                # there is only one plane
-                full_image = np.empty((num_irows, num_icols, samples_pp), dtype=dtype, order='C')
-                tmp_tile = np.empty((num_trows, num_tcols, samples_pp), dtype=dtype, order='C')
-                read_plane(full_image, tmp_tile)
-            elif planar_config == PLANARCONFIG_SEPARATE:
-                # multiple samples per pixel, each sample in one plane
-                full_image = np.empty((samples_pp, num_irows, num_icols), dtype=dtype, order='C')
-                tmp_tile = np.empty((num_trows, num_tcols), dtype=dtype, order='C')
-                for plane_index in xrange(samples_pp):
-                    read_plane(full_image[plane_index], tmp_tile, plane_index)
-            else:
-                raise IOError("Unexpected PlanarConfig = %d" % planar_config)
+        Parameters
+        ----------
+        dtype : {None, numpy.dtype}
+            Data type of the image. By default, it is determined from
+            BitsPerSample and SampleFormat.
+        pool : {None, TIFFReaderPool}
+            When specified, tiles are decoded in parallel using the
+            handles of a pool that reads the same file.
+        out : {None, numpy.ndarray}
+            C-contiguous array where the image is decoded to, see
+            read_image.
+        """
+        geometry = self.get_tile_geometry()
+        if not geometry.tiled:
+            raise ValueError("TIFFTAG_TILEWIDTH must be set to read tiles")
+        if dtype is None:
+            dtype = geometry.dtype
+        box = (0, geometry.depth, 0, geometry.length, 0, geometry.width)
+        shape = (geometry.planes,) + box[1::2] + (geometry.plane_samples,)
+        if out is not None:
+            out = self._get_out_array(out, self._get_image_shape(geometry), dtype)
+            self._read_tile_box(geometry, box, range(geometry.planes),
+                                dtype=dtype, pool=pool, out=out.reshape(shape))
+            return out
+        full_image, decoded = self._read_tile_box(
+            geometry, box, range(geometry.planes), dtype=dtype, pool=pool)
+        return self._squeeze_tile_box(geometry, full_image)
+
+    def read_region(self, y0, y1, x0, x1, z=None, samples=None,
+                    return_metrics=False, pool=None):
+        """ Read rectangular region of the current image.
+
+        Only the tiles or strips that intersect with the region are
+        decoded.
 
-        return full_image
+        Parameters
+        ----------
+        y0, y1, x0, x1 : int
+            Region rows y0 <= y < y1 and columns x0 <= x < x1.
+        z : {None, int}
+            Index of image layer when ImageDepth > 1. By default, all
+            layers are read.
+        samples : {None, int, sequence}
+            Indices of samples to read. By default, all samples are
+            read. For PLANARCONFIG_SEPARATE images only the planes of
+            the selected samples are decoded.
+        return_metrics : bool
+            When True, return also a dictionary with the number of
+            decoded and returned bytes.
+        pool : {None, TIFFReaderPool}
+            When specified, tiles are decoded in parallel.
 
-    def iter_images(self, verbose=False):
+        Returns
+        -------
+        region : numpy.array
+            Array in the layout of read_image: (y, x), (y, x, sample)
+            or (sample, y, x), with a leading layer axis when
+            ImageDepth > 1 and z is None. Sample axis is dropped when
+            samples is an integer.
+        metrics : dict
+            Returned when return_metrics is True.
+        """
+        geometry = self.get_tile_geometry()
+        if not 0 <= y0 < y1 <= geometry.length:
+            raise ValueError("Invalid y range: %r" % ((y0, y1),))
+        if not 0 <= x0 < x1 <= geometry.width:
+            raise ValueError("Invalid x range: %r" % ((x0, x1),))
+        if z is None:
+            z0, z1 = 0, geometry.depth
+        elif 0 <= z < geometry.depth:
+            z0, z1 = z, z + 1
+        else:
+            raise ValueError("Invalid z value")
+        if samples is None:
+            sample_list = list(range(geometry.samples_pp))
+        else:
+            sample_list = list(np.atleast_1d(samples))
+        for sample in sample_list:
+            if not 0 <= sample < geometry.samples_pp:
+                raise ValueError("Invalid sample value: %r" % (sample,))
+        if geometry.planar_config == PLANARCONFIG_SEPARATE:
+            planes = sample_list
+        else:
+            planes = [0]
+        box = (z0, z1, y0, y1, x0, x1)
+        region, decoded = self._read_tile_box(geometry, box, planes, pool=pool)
+        if geometry.planar_config == PLANARCONFIG_CONTIG:
+            if samples is not None:
+                region = region[..., sample_list]
+            region = region[0]  # (depth, length, width, samples)
+            if geometry.samples_pp == 1 or (samples is not None and np.ndim(samples) == 0):
+                region = region[..., 0]
+            if z is not None or geometry.depth == 1:
+                region = region[0]
+        else:
+            region = region[..., 0]  # (samples, depth, length, width)
+            if z is not None or geometry.depth == 1:
+                region = region[:, 0]
+            if samples is not None and np.ndim(samples) == 0:
+                region = region[0]
+        if return_metrics:
+            bands = self._get_tile_bands(geometry, box, planes)
+            metrics = dict(tiles=sum(band[5] - band[4] for band in bands),
+                           bytes_decoded=decoded,
+                           bytes_returned=region.nbytes)
+            return region, metrics
+        return region
+
+    def iter_images(self, verbose=False, out=None):
         """ Iterator of all images in a TIFF file.
+
+        Parameters
+        ----------
+        out : {None, numpy.ndarray}
+          Array where images are decoded to, see read_image. When out
+          has one dimension more than images, it is used as a ring
+          buffer: i-th image is decoded to out[i % len(out)].
+          Otherwise, every image is decoded to out, so the previous
+          image is overwritten.
         """
-        yield self.read_image(verbose=verbose)
-        while not self.LastDirectory():
+        ring = out is not None and \
+            out.ndim == len(self._get_image_shape(self.get_tile_geometry())) + 1
+        index = 0
+        while True:
+            if ring:
+                yield self.read_image(verbose=verbose, out=out[index % len(out)])
+            else:
+                yield self.read_image(verbose=verbose, out=out)
+            if self.LastDirectory():
+                break
             self.ReadDirectory()
-            yield self.read_image(verbose=verbose)
+            index += 1
         self.SetDirectory(0)
 
     def __del__(self):
@@ -1065,7 +1374,7 @@ class TIFF(ctypes.c_void_p):
 
     @debug
     def CurrentDirectory(self):
-        return libtiff.TIFFCurrentDirectory(self)
+        return libtiff.TIFFCurrentDirectory(self).value
     currentdirectory = CurrentDirectory
 
     @debug
@@ -1073,19 +1382,27 @@ class TIFF(ctypes.c_void_p):
         return libtiff.TIFFLastDirectory(self)
     lastdirectory = LastDirectory
 
+    @debug
+    def NumberOfDirectories(self):
+        return libtiff.TIFFNumberOfDirectories(self).value
+    numberofdirectories = NumberOfDirectories
+
     @debug
     def ReadDirectory(self):
+        self._tile_geometry = None
         return libtiff.TIFFReadDirectory(self)
     readdirectory = ReadDirectory
 
     @debug
     def WriteDirectory(self):
+        self._tile_geometry = None
         r = libtiff.TIFFWriteDirectory(self)
         assert r == 1, repr(r)
     writedirectory = WriteDirectory
 
     @debug
     def SetDirectory(self, dirnum):
+        self._tile_geometry = None
         return libtiff.TIFFSetDirectory(self, dirnum)
     setdirectory = SetDirectory
 
@@ -1117,6 +1434,7 @@ class TIFF(ctypes.c_void_p):
             or if an error was encountered
             while reading the directory's contents.
         """
+        self._tile_geometry = None
         return libtiff.TIFFSetSubDirectory(self, diroff)
 
     @debug
@@ -1247,7 +1565,42 @@ class TIFF(ctypes.c_void_p):
         assert r.value >= 0, repr(r.value)
         return r
 
+    @debug
+    def TileSize(self):
+        return libtiff.TIFFTileSize(self).value
+    tilesize = TileSize
+
+    @debug
+    def NumberOfTiles(self):
+        return libtiff.TIFFNumberOfTiles(self).value
+    numberoftiles = NumberOfTiles
+
+    @debug
+    def ComputeTile(self, x, y, z, sample):
+        """ Return the index of the tile containing pixel (x, y, z) of
+        sample plane.
+        """
+        return libtiff.TIFFComputeTile(self, x, y, z, sample).value
+    computetile = ComputeTile
+
+    def WriteEncodedTile(self, tile, buf, size):
+        """ Encode and write size bytes from buffer buf to tile.
+
+        Returns -1 on error, otherwise the number of written bytes.
+        """
+        return libtiff.TIFFWriteEncodedTile(self, tile, buf, size).value
+    writeencodedtile = WriteEncodedTile
+
+    def ReadEncodedTile(self, tile, buf, size):
+        """ Read and decode tile with index tile into buffer buf.
+
+        Returns -1 on error, otherwise the number of decoded bytes.
+        """
+        return libtiff.TIFFReadEncodedTile(self, tile, buf, size).value
+    readencodedtile = ReadEncodedTile
+
     closed = False
+    _tile_geometry = None
 
     def close(self, _libtiff=libtiff):
         if not self.closed and self.value is not None:
@@ -1274,71 +1627,20 @@ class TIFF(ctypes.c_void_p):
             _value = eval(descr[_i + len(tag):].lstrip().split()[0])
             return _value
         if isinstance(tag, str):
-            tag = eval('TIFFTAG_' + tag.upper())
-        t = tifftags.get(tag)
-        if t is None:
+            tag = get_tag_value(tag)
+        accessor = tag_accessors.get(tag)
+        if accessor is None:
             if not ignore_undefined_tag:
                 print('Warning: no tag %r defined' % tag)
             return
-        data_type, convert = t
-
-        if tag == TIFFTAG_COLORMAP:
-            bps = self.GetField("BitsPerSample")
-            if bps is None:
-                print(
-                    "Warning: BitsPerSample is required to get ColorMap, "
-                    "assuming 8 bps...")
-                bps = 8
-            num_cmap_elems = 1 << bps
-            data_type *= num_cmap_elems
-            pdt = ctypes.POINTER(data_type)
-            rdata = pdt()
-            gdata = pdt()
-            bdata = pdt()
-            rdata_ptr = ctypes.byref(rdata)
-            gdata_ptr = ctypes.byref(gdata)
-            bdata_ptr = ctypes.byref(bdata)
-
-            # ignore count, it's not used for colormap
-            libtiff.TIFFGetField.argtypes = libtiff.TIFFGetField.argtypes[
-                                            :2] + [ctypes.c_void_p] * 3
-            r = libtiff.TIFFGetField(self, tag, rdata_ptr, gdata_ptr,
-                                     bdata_ptr)
-            data = (rdata, gdata, bdata)
-        elif issubclass(data_type, ctypes.Array) and data_type._length_ == 0:
-            # Variable length array, with the length as first value
-            count = ctypes.c_uint16()  # TODO: some other tags with counts use uint32
-            pdt = ctypes.POINTER(data_type._type_)
-            vldata = pdt()
-            libtiff.TIFFGetField.argtypes = (libtiff.TIFFGetField.argtypes[:2] +
-                                             [ctypes.c_void_p] * 2)
-            r = libtiff.TIFFGetField(self, tag, ctypes.byref(count),
-                                     ctypes.byref(vldata))
-            data = (count, vldata)
-        else:
-            if issubclass(data_type, ctypes.Array):
-                pdt = ctypes.POINTER(data_type)
-                data = pdt()
-            else:
-                data = data_type()
-
-            if count is None:
-                libtiff.TIFFGetField.argtypes = libtiff.TIFFGetField.argtypes[
-                                                :2] + [ctypes.c_void_p]
-                r = libtiff.TIFFGetField(self, tag, ctypes.byref(data))
-            else:
-                # TODO: is this ever used? Is there any tag that is accessed like that?
-                libtiff.TIFFGetField.argtypes = libtiff.TIFFGetField.argtypes[
-                                                :2] + [ctypes.c_uint,
-                                                       ctypes.c_void_p]
-                r = libtiff.TIFFGetField(self, tag, count, ctypes.byref(data))
+        r, data = accessor.get(self, count)
         if not r:  # tag not defined for current directory
             if not ignore_undefined_tag:
                 print(
                     'Warning: tag %r not defined in currect directory' % tag)
             return None
 
-        return convert(data)
+        return accessor.convert(data)
 
     # @debug
     def SetField(self, tag, _value, count=None):
@@ -1349,72 +1651,13 @@ class TIFF(ctypes.c_void_p):
         """
 
         if isinstance(tag, str):
-            tag = eval('TIFFTAG_' + tag.upper())
-        t = tifftags.get(tag)
-        if t is None:
+            tag = get_tag_value(tag)
+        accessor = tag_accessors.get(tag)
+        if accessor is None:
             print('Warning: no tag %r defined' % tag)
             return
-        data_type, convert = t
-        if data_type == ctypes.c_float:
-            data_type = ctypes.c_double
-
-        if tag == TIFFTAG_COLORMAP:
-            # ColorMap passes 3 values each a c_uint16 pointer
-            try:
-                r_arr, g_arr, b_arr = _value
-            except (TypeError, ValueError):
-                print(
-                    "Error: TIFFTAG_COLORMAP expects 3 uint16* arrays as a "
-                    "list/tuple of lists")
-                r_arr, g_arr, b_arr = None, None, None
-            if r_arr is None:
-                return
-
-            bps = self.GetField("BitsPerSample")
-            if bps is None:
-                print(
-                    "Warning: BitsPerSample is required to get ColorMap, "
-                    "assuming 8 bps...")
-                bps = 8
-            num_cmap_elems = 1 << bps
-            data_type *= num_cmap_elems
-            r_ptr = data_type(*r_arr)
-            g_ptr = data_type(*g_arr)
-            b_ptr = data_type(*b_arr)
-            libtiff.TIFFSetField.argtypes = libtiff.TIFFSetField.argtypes[
-                                            :2] + [ctypes.POINTER(
-                                                   data_type)] * 3
-            r = libtiff.TIFFSetField(self, tag, r_ptr, g_ptr, b_ptr)
-        else:
-            if issubclass(data_type, (ctypes.Array, tuple, list)):
-                if issubclass(data_type, ctypes.Array) and data_type._length_ == 0:
-                    # Array of 0 means we need to create the right length
-                    data_type = data_type._type_ * len(_value)
-                data = data_type(*_value)
-            elif issubclass(data_type,
-                            ctypes._Pointer):  # does not include c_char_p
-                # convert to the base type, ctypes will take care of actually
-                # sending it by reference
-                base_type = data_type._type_
-                if isinstance(_value, collections.Iterable):
-                    data = base_type(*_value)
-                else:
-                    data = base_type(_value)
-            else:
-                data = data_type(_value)
-
-            # TODO: for most of the tags, count is len(_value),
-            # so it shouldn't be needed
-            if count is None:
-                libtiff.TIFFSetField.argtypes = libtiff.TIFFSetField.argtypes[
-                                                :2] + [data_type]
-                r = libtiff.TIFFSetField(self, tag, data)
-            else:
-                libtiff.TIFFSetField.argtypes = libtiff.TIFFSetField.argtypes[
-                                                :2] + [ctypes.c_uint,
-                                                       data_type]
-                r = libtiff.TIFFSetField(self, tag, count, data)
-        return r
+        self._tile_geometry = None
+        return accessor.set(self, _value, count)
 
     def info(self):
         """ Return a string containing <tag name: field value> map.
@@ -1554,7 +1797,7 @@ class TIFF3D(TIFF):
         libtiff.TIFFOpen.restype = TIFF3D
 
         # actually call the library function:
-        tiff = libtiff.TIFFOpen(filename, mode)
+        tiff = libtiff.TIFFOpen(filename.encode('ascii'), mode.encode('ascii'))
 
         # restore the old restype:
         libtiff.TIFFOpen.restype = old_restype
@@ -1563,82 +1806,207 @@ class TIFF3D(TIFF):
         return tiff
 
     @debug
-    def read_image(self, verbose=False, as3d=True):
+    def read_image(self, verbose=False, as3d=True, pool=None, out=None):
         """ Read image from TIFF and return it as a numpy array.
 
-        If as3d is passed True (default), will attempt to read multiple
-        directories, and restore as slices in a 3D array. ASSUMES that all
-        images in the tiff file have the same width, height, bits-per-sample,
-        compression, and so on. If you get a segfault, this is probably the
-        problem.
+        If as3d is passed True (default), will read all directories in
+        one pass and restore them as slices in a 3D array. Strips and
+        tiles are decoded directly into the slices of the result. All
+        images in the tiff file must have the same width, height,
+        samples and data type, otherwise ValueError is raised. When
+        pool is a TIFFReaderPool of the same file, directories are
+        read in parallel. When out is specified, the stack is decoded
+        to it, see TIFF.read_image.
         """
         if not as3d:
-            return TIFF.read_image(self, verbose)
+            return TIFF.read_image(self, verbose, out=out)
 
-        # Code is initially copy-paste from TIFF:
-        width = self.GetField('ImageWidth')
-        height = self.GetField('ImageLength')
-        bits = self.GetField('BitsPerSample')
-        sample_format = self.GetField('SampleFormat')
-        compression = self.GetField('Compression')
+        depth = self.NumberOfDirectories()
+        self.SetDirectory(0)
+        reference = self.get_tile_geometry()
+        layer_shape = (reference.planes, reference.depth, reference.length,
+                       reference.width, reference.plane_samples)
+        image_shape = (depth,) + self._get_image_shape(reference)
+        arr = self._get_out_array(out, image_shape, reference.dtype)
+        arr = arr.reshape((depth,) + layer_shape)
+
+        if pool is None:
+            for layer in range(depth):
+                if layer:
+                    if not self.ReadDirectory():
+                        raise IOError('Failed to read directory %d' % (layer))
+                self._read_directory_into(arr[layer], reference)
+        else:
+            futures = [pool.submit_directory_into(layer, arr[layer], reference)
+                       for layer in range(depth)]
+            for future in futures:
+                future.result()
+        self.SetDirectory(0)
+        return arr.reshape(image_shape)
 
-        typ = self.get_numpy_type(bits, sample_format)
 
-        if typ is None:
-            if bits == 1:
-                typ = np.uint8
-                itemsize = 1
-            elif bits == 4:
-                typ = np.uint32
-                itemsize = 4
-            else:
-                raise NotImplementedError(repr(bits))
-        else:
-            itemsize = bits / 8
+class TIFFReaderPool(object):
+    """ Reads images and tiles of a TIFF file in parallel threads.
 
-        # in order to allocate the numpy array, we must count the directories:
-        # code borrowed from TIFF.iter_images():
-        depth = 0
-        while True:
-            depth += 1
-            if self.LastDirectory():
-                break
-            self.ReadDirectory()
-        self.SetDirectory(0)
+    A TIFF handle has a current directory and cannot be shared between
+    threads. TIFFReaderPool opens one handle of the same file in each
+    worker thread so that images of arbitrary directories can be
+    decoded concurrently. libtiff is called with the GIL released, so
+    decoding compressed data (deflate, JPEG, ...) runs in parallel.
 
-        # we proceed assuming all directories have the same properties from
-        # above.
-        layer_size = width * height * itemsize
-        # total_size = layer_size * depth
-        arr = np.zeros((depth, height, width), typ)
+    To read all pages of a file, use
 
-        if compression == COMPRESSION_NONE:
-            ReadStrip = self.ReadRawStrip
-        else:
-            ReadStrip = self.ReadEncodedStrip
+      pool = TIFFReaderPool(filename, nthreads=4)
+      images = pool.read_images()
+      pool.close()
 
-        layer = 0
-        while True:
-            pos = 0
-            elem = None
-            for strip in range(self.NumberOfStrips()):
-                if elem is None:
-                    elem = ReadStrip(strip,
-                                     arr.ctypes.data + layer * layer_size +
-                                     pos,
-                                     layer_size)
-                elif elem:
-                    elem = ReadStrip(strip,
-                                     arr.ctypes.data + layer * layer_size +
-                                     pos,
-                                     min(layer_size - pos, elem))
-                pos += elem
-            if self.LastDirectory():
-                break
-            self.ReadDirectory()
-            layer += 1
-        self.SetDirectory(0)
-        return arr
+    Attributes
+    ----------
+    filename : str
+    nthreads : int
+    """
+
+    def __init__(self, filename, nthreads=4):
+        """
+        Parameters
+        ----------
+        filename : str
+          Specify path to TIFF file.
+        nthreads : int
+          Specify the number of worker threads.
+        """
+        self.filename = filename
+        self.nthreads = nthreads
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=nthreads)
+        self._number_of_directories = None
+
+    def __repr__(self):
+        return '%s(%r, nthreads=%r)' % (self.__class__.__name__,
+                                        self.filename, self.nthreads)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_tiff(self):
+        """ Return TIFF handle of the current thread.
+        """
+        tiff = getattr(self._local, 'tiff', None)
+        if tiff is None:
+            tiff = self._local.tiff = TIFF.open(self.filename, mode='r')
+            with self._lock:
+                self._handles.append(tiff)
+        return tiff
+
+    def _set_directory(self, dirnum):
+        tiff = self.get_tiff()
+        if tiff.CurrentDirectory() != dirnum:
+            if not tiff.SetDirectory(dirnum):
+                raise IndexError('Failed to set directory %r of %r'
+                                 % (dirnum, self.filename))
+        return tiff
+
+    def _read_image(self, dirnum):
+        return self._set_directory(dirnum).read_image()
+
+    def _read_one_tile(self, dirnum, x, y):
+        return self._set_directory(dirnum).read_one_tile(x, y)
+
+    def _read_tile_bands(self, dirnum, geometry, bands, out, box):
+        return self._set_directory(dirnum)._read_tile_bands(geometry, bands, out, box)
+
+    def submit_tile_bands(self, dirnum, geometry, bands, out, box):
+        """ Schedule decoding bands of tiles into out, see
+        TIFF._read_tile_bands. Used by TIFF.read_tiles.
+        """
+        return self._executor.submit(self._read_tile_bands, dirnum, geometry,
+                                     bands, out, box)
+
+    def _read_directory_into(self, dirnum, out, reference):
+        return self._set_directory(dirnum)._read_directory_into(out, reference)
+
+    def submit_directory_into(self, dirnum, out, reference):
+        """ Schedule reading directory into out, see TIFF3D.read_image.
+        """
+        return self._executor.submit(self._read_directory_into, dirnum, out,
+                                     reference)
+
+    def get_number_of_directories(self):
+        """ Return the number of directories in TIFF file.
+        """
+        if self._number_of_directories is None:
+            self._number_of_directories = self.get_tiff().NumberOfDirectories()
+        return self._number_of_directories
+
+    def submit_image(self, dirnum):
+        """ Schedule reading image of directory, return a future.
+        """
+        return self._executor.submit(self._read_image, dirnum)
+
+    def submit_one_tile(self, dirnum, x, y):
+        """ Schedule reading tile of directory containing pixel (x, y),
+        return a future.
+        """
+        return self._executor.submit(self._read_one_tile, dirnum, x, y)
+
+    def read_image(self, dirnum=0):
+        """ Read image of directory and return it as an array.
+        """
+        return self.submit_image(dirnum).result()
+
+    def read_one_tile(self, dirnum, x, y):
+        """ Read tile of directory containing pixel (x, y), see
+        TIFF.read_one_tile.
+        """
+        return self.submit_one_tile(dirnum, x, y).result()
+
+    def read_images(self, dirnums=None):
+        """ Read images of directories in parallel.
+
+        Parameters
+        ----------
+        dirnums : {None, sequence}
+          Specify directory indices. By default, all directories are
+          read.
+
+        Returns
+        -------
+        images : list
+          Arrays in the order of dirnums.
+        """
+        if dirnums is None:
+            dirnums = range(self.get_number_of_directories())
+        futures = [self.submit_image(dirnum) for dirnum in dirnums]
+        return [future.result() for future in futures]
+
+    def read_tiles(self, requests):
+        """ Read tiles in parallel.
+
+        Parameters
+        ----------
+        requests : sequence
+          Specify (dirnum, x, y) triples, see read_one_tile.
+
+        Returns
+        -------
+        tiles : list
+          Arrays in the order of requests.
+        """
+        futures = [self.submit_one_tile(dirnum, x, y)
+                   for dirnum, x, y in requests]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for tiff in self._handles:
+                tiff.close()
+            del self._handles[:]
 
 
 class CZ_LSMInfo:
@@ -1702,6 +2070,9 @@ libtiff.TIFFLastDirectory.argtypes = [TIFF]
 libtiff.TIFFReadDirectory.restype = ctypes.c_int
 libtiff.TIFFReadDirectory.argtypes = [TIFF]
 
+libtiff.TIFFNumberOfDirectories.restype = c_tdir_t
+libtiff.TIFFNumberOfDirectories.argtypes = [TIFF]
+
 libtiff.TIFFWriteDirectory.restype = ctypes.c_int
 libtiff.TIFFWriteDirectory.argtypes = [TIFF]
 
@@ -1731,8 +2102,8 @@ libtiff.TIFFGetField.argtypes = [TIFF, c_ttag_t, ctypes.c_void_p]
 
 libtiff.TIFFSetField.restype = ctypes.c_int
 libtiff.TIFFSetField.argtypes = [TIFF, c_ttag_t,
-                                 ctypes.c_void_p]  # last item is reset in
-#                                                    TIFF.SetField method
+                                 ctypes.c_void_p]  # TIFF.SetField uses
+#                                                    tag_accessors instead
 
 libtiff.TIFFNumberOfStrips.restype = c_tstrip_t
 libtiff.TIFFNumberOfStrips.argtypes = [TIFF]
@@ -1794,9 +2165,8 @@ libtiff.TIFFWriteTile.argtypes = [TIFF, c_tdata_t, ctypes.c_uint32,
                                   ctypes.c_uint32, ctypes.c_uint32,
                                   c_tsample_t]
 
-libtiff.TIFFReadEncodedTile.restype = ctypes.c_int
-libtiff.TIFFReadEncodedTile.argtypes = [TIFF, ctypes.c_ulong, ctypes.c_char_p,
-                                        ctypes.c_ulong]
+libtiff.TIFFReadEncodedTile.restype = c_tsize_t
+libtiff.TIFFReadEncodedTile.argtypes = [TIFF, c_ttile_t, c_tdata_t, c_tsize_t]
 
 libtiff.TIFFReadRawTile.restype = c_tsize_t
 libtiff.TIFFReadRawTile.argtypes = [TIFF, c_ttile_t, c_tdata_t, c_tsize_t]
@@ -1817,6 +2187,167 @@ libtiff.TIFFDefaultTileSize.argtypes = [TIFF, ctypes.c_uint32, ctypes.c_uint32]
 libtiff.TIFFClose.restype = None
 libtiff.TIFFClose.argtypes = [TIFF]
 
+# Prototyped TIFFGetField/TIFFSetField calls. TIFFGetField and
+# TIFFSetField are variadic, so each signature gets its own function
+# pointer instead of resetting argtypes of the shared ones on each call.
+_field_functions = {}
+
+
+def _get_field_function(name, argtypes):
+    key = (name,) + tuple(argtypes)
+    func = _field_functions.get(key)
+    if func is None:
+        prototype = ctypes.CFUNCTYPE(ctypes.c_int, TIFF, c_ttag_t, *argtypes)
+        func = _field_functions[key] = prototype((name, libtiff))
+    return func
+
+
+class TagAccessor(object):
+    """ Holds prototyped TIFFGetField and TIFFSetField calls of a tag.
+
+    Accessors are created once for each tag in tifftags, see
+    tag_accessors.
+    """
+
+    def __init__(self, tag, data_type, convert):
+        self.tag = tag
+        self.data_type = data_type
+        self.convert = convert
+        c_void_p = ctypes.c_void_p
+        if tag == TIFFTAG_COLORMAP:
+            # 3 uint16* for Set, 3 uint16** for Get
+            self.kind = 'colormap'
+            get_args = set_args = [c_void_p] * 3
+        elif issubclass(data_type, ctypes.Array) and data_type._length_ == 0:
+            # Variable length array, with the length as first value
+            self.kind = 'count_array'
+            get_args = [c_void_p] * 2
+            set_args = [ctypes.POINTER(data_type._type_)]
+        else:
+            self.kind = 'value'
+            get_args = [c_void_p]
+            if issubclass(data_type, ctypes.Array):
+                set_args = [ctypes.POINTER(data_type._type_)]
+            elif data_type == ctypes.c_float:
+                set_args = [ctypes.c_double]
+            else:
+                set_args = [data_type]
+        self._get = _get_field_function('TIFFGetField', get_args)
+        self._get_count = _get_field_function('TIFFGetField',
+                                              [ctypes.c_uint] + get_args)
+        self._set = _get_field_function('TIFFSetField', set_args)
+        self._set_count = _get_field_function('TIFFSetField',
+                                              [ctypes.c_uint] + set_args)
+
+    def get(self, tiff, count=None):
+        """ Call TIFFGetField, return its result and the raw data.
+        """
+        data_type = self.data_type
+        if self.kind == 'colormap':
+            bps = tiff.GetField("BitsPerSample")
+            if bps is None:
+                print(
+                    "Warning: BitsPerSample is required to get ColorMap, "
+                    "assuming 8 bps...")
+                bps = 8
+            num_cmap_elems = 1 << bps
+            pdt = ctypes.POINTER(data_type * num_cmap_elems)
+            data = (pdt(), pdt(), pdt())
+            # ignore count, it's not used for colormap
+            r = self._get(tiff, self.tag, *[ctypes.byref(d) for d in data])
+        elif self.kind == 'count_array':
+            # TODO: some other tags with counts use uint32
+            data = (ctypes.c_uint16(), ctypes.POINTER(data_type._type_)())
+            r = self._get(tiff, self.tag, ctypes.byref(data[0]),
+                          ctypes.byref(data[1]))
+        else:
+            if issubclass(data_type, ctypes.Array):
+                data = ctypes.POINTER(data_type)()
+            else:
+                data = data_type()
+            if count is None:
+                r = self._get(tiff, self.tag, ctypes.byref(data))
+            else:
+                # TODO: is this ever used? Is there any tag that is accessed like that?
+                r = self._get_count(tiff, self.tag, count, ctypes.byref(data))
+        return r, data
+
+    def set(self, tiff, _value, count=None):
+        """ Call TIFFSetField with value converted to tag data type.
+        """
+        data_type = self.data_type
+        if self.kind == 'colormap':
+            # ColorMap passes 3 values each a c_uint16 pointer
+            try:
+                r_arr, g_arr, b_arr = _value
+            except (TypeError, ValueError):
+                print(
+                    "Error: TIFFTAG_COLORMAP expects 3 uint16* arrays as a "
+                    "list/tuple of lists")
+                return
+            bps = tiff.GetField("BitsPerSample")
+            if bps is None:
+                print(
+                    "Warning: BitsPerSample is required to get ColorMap, "
+                    "assuming 8 bps...")
+                bps = 8
+            num_cmap_elems = 1 << bps
+            data_type = data_type * num_cmap_elems
+            return self._set(tiff, self.tag, data_type(*r_arr),
+                             data_type(*g_arr), data_type(*b_arr))
+        if issubclass(data_type, ctypes.Array):
+            if data_type._length_ == 0:
+                # Array of 0 means we need to create the right length
+                data_type = data_type._type_ * len(_value)
+            data = data_type(*_value)
+        elif issubclass(data_type, ctypes._Pointer):  # does not include c_char_p
+            # convert to the base type, ctypes will take care of actually
+            # sending it by reference
+            base_type = data_type._type_
+            if isinstance(_value, collections.Iterable):
+                data = base_type(*_value)
+            else:
+                data = base_type(_value)
+        elif data_type == ctypes.c_char_p and isinstance(_value, str):
+            data = _value.encode('ascii')
+        else:
+            data = _value
+
+        # TODO: for most of the tags, count is len(_value),
+        # so it shouldn't be needed
+        if count is None:
+            return self._set(tiff, self.tag, data)
+        return self._set_count(tiff, self.tag, count, data)
+
+
+tag_accessors = {}
+tag_values = {}
+
+
+def register_tag(tag, name=None):
+    """ Create accessor for tag defined in tifftags.
+    """
+    data_type, convert = tifftags[tag]
+    tag_accessors[tag] = TagAccessor(tag, data_type, convert)
+    if name is not None:
+        tag_values[name.upper()] = tag
+
+
+def get_tag_value(tagname):
+    """ Return TIFFTAG_<tagname> constant.
+    """
+    tag = tag_values.get(tagname.upper())
+    if tag is None:
+        raise NameError('name %r is not defined' % ('TIFFTAG_' + tagname.upper()))
+    return tag
+
+
+for _name, _tag in name_to_define_map['TiffTag'].items():
+    tag_values[_name[len('TIFFTAG_'):]] = _tag
+for _tag in tifftags:
+    register_tag(_tag)
+
+
 # Support for TIFF warning and error handlers:
 TIFFWarningHandler = ctypes.CFUNCTYPE(None,
                                       ctypes.c_char_p,  # Module
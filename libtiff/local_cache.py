@@ -0,0 +1,236 @@
+"""
+Provides LocalCache class.
+"""
+
+__all__ = ['LocalCache']
+
+import os
+import sys
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .utils import isindisk
+
+
+class LocalCache:
+    """ Local disk cache for TIFF files stored in external devices.
+
+    Copies of files are kept under the cache path with the same
+    layout as the ``local_cache`` option of TIFFfile uses, that is,
+    ``<path>/<filename>``. Files can be staged in background threads
+    using the prefetch method so that the copying overlaps with
+    processing of the already cached files. Each file is staged by
+    one thread at a time. Copies that are pinned, for instance, by
+    open TIFF files, are not deleted when the cache exceeds its
+    size budget.
+
+    Attributes
+    ----------
+    path : str
+    max_size : {None, int}
+    only_remote : bool
+    closed : bool
+      True after close. A closed cache has no background threads,
+      prefetch raises ValueError while get still copies files.
+
+    See also
+    --------
+    TIFFfile, TiffFiles
+    """
+
+    def __init__(self, path, max_size=None, nthreads=1, only_remote=True,
+                 verbose=False):
+        """
+        Parameters
+        ----------
+        path : str
+          Specify path to local cache directory.
+        max_size : {None, int}
+          Specify the size budget of the cache in bytes. When the budget
+          is exceeded, the least recently used copies are deleted.
+        nthreads : int
+          Specify the number of background copying threads.
+        only_remote : bool
+          When True then files that are already stored in a local disk
+          are not copied to the cache.
+        verbose : bool
+        """
+        self.path = path
+        self.max_size = max_size
+        self.only_remote = only_remote
+        self.verbose = verbose
+        self.size = 0
+        self.closed = False
+        self._entries = OrderedDict()  # cache filename -> nbytes, LRU first
+        self._pending = {}  # filename -> future of staging thread
+        self._pins = {}  # cache filename -> number of pins
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=nthreads)
+
+    def __repr__(self):
+        return '%s(%r, max_size=%r)' % (self.__class__.__name__, self.path,
+                                        self.max_size)
+
+    def get_cache_filename(self, filename):
+        return self.path + '/' + filename
+
+    def is_cached(self, filename):
+        """ Return True when filename has an up-to-date copy in cache.
+
+        The copy is up-to-date when its size and modification time
+        match with the original file.
+        """
+        cache_filename = self.get_cache_filename(filename)
+        try:
+            cache_stat = os.stat(cache_filename)
+        except OSError:
+            return False
+        stat = os.stat(filename)
+        return (cache_stat.st_size == stat.st_size and
+                int(cache_stat.st_mtime) == int(stat.st_mtime))
+
+    def get(self, filename, pin=False):
+        """ Return the name of a local copy of a file.
+
+        When the file is being prefetched, wait for the copying to
+        finish. When the file is not in cache, copy it now.
+
+        Parameters
+        ----------
+        filename : str
+        pin : bool
+          When True then the copy is not evicted until release is
+          called.
+        """
+        if self.only_remote and isindisk(filename):
+            return filename
+        cache_filename = self.get_cache_filename(filename)
+        with self._lock:
+            if pin:
+                self._pins[cache_filename] = self._pins.get(cache_filename, 0) + 1
+            future = self._pending.get(filename)
+            if future is None:
+                future = self._pending[filename] = Future()
+                owner = True
+            else:
+                owner = False
+        try:
+            if owner:
+                return self._run_stage(filename, future)
+            return future.result()
+        except BaseException:
+            if pin:
+                self.release(filename)
+            raise
+
+    def release(self, filename):
+        """ Unpin the copy of a file pinned by get.
+        """
+        cache_filename = self.get_cache_filename(filename)
+        with self._lock:
+            count = self._pins.get(cache_filename, 0) - 1
+            if count > 0:
+                self._pins[cache_filename] = count
+            else:
+                self._pins.pop(cache_filename, None)
+
+    def prefetch(self, filenames):
+        """ Start copying files to cache in background.
+        """
+        if self.closed:
+            raise ValueError('%r is closed' % (self,))
+        for filename in filenames:
+            if self.only_remote and isindisk(filename):
+                continue
+            with self._lock:
+                if filename in self._pending:
+                    continue
+                cache_filename = self.get_cache_filename(filename)
+                if cache_filename in self._entries and \
+                        self.is_cached(filename):
+                    continue
+                future = self._pending[filename] = Future()
+            self._executor.submit(self._run_stage, filename, future)
+
+    def _run_stage(self, filename, future):
+        """ Stage file and set the result of its pending future.
+        """
+        try:
+            cache_filename = self._stage(filename)
+        except BaseException as msg:
+            future.set_exception(msg)
+            raise
+        else:
+            future.set_result(cache_filename)
+            return cache_filename
+        finally:
+            with self._lock:
+                if self._pending.get(filename) is future:
+                    del self._pending[filename]
+
+    def _stage(self, filename):
+        cache_filename = self.get_cache_filename(filename)
+        if self.is_cached(filename):
+            with self._lock:
+                if cache_filename in self._entries:
+                    self._entries.move_to_end(cache_filename)
+                else:
+                    self._add(cache_filename,
+                              os.stat(cache_filename).st_size)
+            return cache_filename
+        if self.only_remote:
+            assert isindisk(self.path), repr(self.path)
+        nbytes = os.stat(filename).st_size
+        with self._lock:
+            self._discard(cache_filename)
+            self._evict(nbytes)
+        dirname = os.path.dirname(cache_filename)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname, exist_ok=True)
+        if self.verbose:
+            sys.stdout.write('Copying %r to local cache\n' % (filename))
+            sys.stdout.flush()
+        # copy to a temporary file first so that a partial copy
+        # is never taken for a cached file
+        tmp_filename = '%s.%s.tmp' % (cache_filename,
+                                      threading.get_ident())
+        shutil.copyfile(filename, tmp_filename)
+        shutil.copystat(filename, tmp_filename)
+        os.rename(tmp_filename, cache_filename)
+        with self._lock:
+            self._add(cache_filename, nbytes)
+        return cache_filename
+
+    def _add(self, cache_filename, nbytes):
+        self._entries[cache_filename] = nbytes
+        self.size += nbytes
+
+    def _discard(self, cache_filename):
+        nbytes = self._entries.pop(cache_filename, None)
+        if nbytes is not None:
+            self.size -= nbytes
+            if os.path.exists(cache_filename):
+                os.remove(cache_filename)
+
+    def _evict(self, nbytes):
+        """ Delete least recently used copies that are not pinned to
+        make room for nbytes.
+        """
+        if self.max_size is None:
+            return
+        for cache_filename in list(self._entries):
+            if self.size + nbytes <= self.max_size:
+                break
+            if self._pins.get(cache_filename):
+                continue
+            if self.verbose:
+                sys.stdout.write('Removing %r from local cache\n'
+                                 % (cache_filename))
+                sys.stdout.flush()
+            self._discard(cache_filename)
+
+    def close(self):
+        self.closed = True
+        self._executor.shutdown(wait=True)
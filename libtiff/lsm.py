@@ -70,14 +70,14 @@ def IFDEntry_lsm_finalize_hook(ifdentry):
                     else:
                         blockstart, blockend = min(blockstart,start), max(blockend,end)
                     if verbose_lsm_memory_usage:
-                        ifdentry.memory_usage.append((start, end,
-                                                      ifdentry.tag_name+' '+name[6:]))
+                        ifdentry.add_memory_usage(start, end,
+                                                  ifdentry.tag_name+' '+name[6:])
         if verbose_lsm_memory_usage:
             for offset in ifdentry.value['Reserved'][0]:
                 if offset:
-                    ifdentry.memory_usage.append((offset, offset, 'start of a unknown reserved field'))
+                    ifdentry.add_memory_usage(offset, offset, 'start of a unknown reserved field')
         else:
-            ifdentry.memory_usage.append((blockstart, blockend, 'lsmblock'))
+            ifdentry.add_memory_usage(blockstart, blockend, 'lsmblock')
         ifdentry.block_range = (blockstart, blockend)
         ifdentry.tiff.lsminfo = scaninfo(ifdentry, debug=False)
         ifdentry.tiff.lsmblock = lsmblock(ifdentry, debug=False)
@@ -0,0 +1,146 @@
+"""
+Provides progress reporting of long running operations.
+
+Functions that process many items, such as TIFFfile (IFDs),
+TIFFimage.write_file (images) and TiffFiles.get_tiff_array (files),
+accept a progress argument. It is a callable that is called with a
+Progress instance after each processed item and when the operation
+finishes. The same Progress instance is updated during the whole
+operation, so a callback may just store it and let a user interface or
+logger sample it at its own rate. When progress is not specified and
+verbose is True, a ProgressWriter is used that writes to stdout at
+most a few times per second.
+"""
+# Created: October 2026
+
+__all__ = ['Progress', 'ProgressWriter', 'get_progress']
+
+import sys
+import time
+
+from .utils import bytes2str
+
+
+class Progress:
+    """ State of a long running operation.
+
+    Attributes
+    ----------
+    task : str
+      Description of the operation.
+    done : int
+      Number of processed items.
+    total : {None, int}
+      Number of items when known.
+    nbytes : int
+      Number of processed bytes.
+    start_time : float
+    finished : bool
+    callback : {None, callable}
+    """
+
+    __slots__ = ('task', 'done', 'total', 'nbytes', 'start_time', 'finished',
+                 'callback')
+
+    def __init__(self, task, total=None, callback=None):
+        self.task = task
+        self.done = 0
+        self.total = total
+        self.nbytes = 0
+        self.start_time = time.time()
+        self.finished = False
+        self.callback = callback
+
+    def __repr__(self):
+        return '%s(%r, done=%r, total=%r, nbytes=%r, finished=%r)' % (
+            self.__class__.__name__, self.task, self.done, self.total,
+            self.nbytes, self.finished)
+
+    @property
+    def elapsed(self):
+        """ Seconds since the start of the operation.
+        """
+        return time.time() - self.start_time
+
+    @property
+    def fraction(self):
+        """ Fraction of processed items, None when total is unknown.
+        """
+        if not self.total:
+            return None
+        return self.done / self.total
+
+    @property
+    def throughput(self):
+        """ Processed bytes per second.
+        """
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0
+        return self.nbytes / elapsed
+
+    def update(self, items=1, nbytes=0):
+        self.done += items
+        self.nbytes += nbytes
+        if self.callback is not None:
+            self.callback(self)
+
+    def finish(self):
+        self.finished = True
+        if self.callback is not None:
+            self.callback(self)
+
+
+class ProgressWriter:
+    """ Progress callback that writes progress to a stream.
+
+    Progress is written at most once per interval seconds and when an
+    operation finishes.
+    """
+
+    def __init__(self, stream=None, interval=0.5):
+        self.stream = stream
+        self.interval = interval
+        self._last_time = 0
+
+    def __call__(self, progress):
+        now = time.time()
+        if not progress.finished and now - self._last_time < self.interval:
+            return
+        self._last_time = now
+        stream = self.stream or sys.stdout
+        if progress.total:
+            line = '\r%s: %s/%s (%s%%)' % (progress.task, progress.done, progress.total,
+                                           int(100.0 * progress.done / progress.total))
+        else:
+            line = '\r%s: %s' % (progress.task, progress.done)
+        if progress.nbytes:
+            line += ' %s/s' % (bytes2str(int(progress.throughput)))
+        if progress.finished:
+            line += ' done in %.2fs\n' % (progress.elapsed)
+        stream.write(line)
+        stream.flush()
+
+
+def get_progress(task, progress=None, verbose=False, total=None):
+    """ Return Progress instance for an operation or None.
+
+    Parameters
+    ----------
+    task : str
+    progress : {None, callable}
+      Specify progress callback.
+    verbose : bool
+      When True and progress is None, progress is written to stdout.
+    total : {None, int}
+
+    Returns
+    -------
+    progress : {None, Progress}
+      None when progress is not reported.
+    """
+    if progress is None:
+        if not verbose:
+            return None
+        progress = ProgressWriter()
+    return Progress(task, total=total, callback=progress)
@@ -0,0 +1,296 @@
+"""
+Provides functions for building multi-resolution image pyramids.
+
+A pyramid is a sequence of images where each level is the previous
+level downsampled by an integer factor along the spatial axes. Levels
+are computed one at a time from the previous level, so that only two
+levels are held in memory while a pyramid is written.
+
+TiffPyramid gives access to the levels of a pyramid stored in a TIFF
+file as reduced-resolution directories and serves regions at a
+requested resolution from the cheapest sufficient level. Pyramids are
+written as tiled directories that are read through libtiff, that is,
+with TIFF.get_pyramid, not with TIFFfile which reads striped images
+only.
+
+See also
+--------
+libtiff.TIFF.write_pyramid, libtiff.TIFF.get_pyramid
+"""
+
+__all__ = ['downsample', 'iter_pyramid', 'get_spatial_axes', 'resize_nearest',
+           'get_level_scale', 'TiffPyramid', 'PyramidLevel']
+
+import collections
+
+import numpy
+
+PyramidLevel = collections.namedtuple(
+    'PyramidLevel', ['dirnum', 'length', 'width', 'scale_y', 'scale_x'])
+
+
+def get_spatial_axes(shape, write_rgb=False):
+    """ Return the (y, x) axes of an image array in the layout used by
+    TIFF.write_tiles.
+    """
+    if len(shape) == 2:
+        return (0, 1)
+    if len(shape) == 3:
+        if write_rgb and shape[2] in [3, 4]:
+            return (0, 1)  # (height, width, samples)
+        return (1, 2)  # (samples, height, width) or (depth, height, width)
+    if len(shape) == 4:
+        return (1, 2)  # (depth, height, width, samples)
+    raise NotImplementedError(repr(shape))
+
+
+def downsample(arr, factor=2, axes=(0, 1), method='mean'):
+    """ Downsample array along axes by an integer factor.
+
+    Parameters
+    ----------
+    arr : numpy.ndarray
+    factor : int
+      Specify the downsampling factor.
+    axes : tuple
+      Specify the axes to be downsampled.
+    method : {'mean', 'decimate'}
+      Specify how a block of factor x factor elements is reduced to
+      one element: 'mean' takes the block average, 'decimate' takes
+      the first element of a block. Blocks on the edges may be
+      smaller than factor.
+
+    Returns
+    -------
+    arr : numpy.ndarray
+      Array with the same dtype, axes are reduced to
+      ceil(size / factor) elements.
+    """
+    if method == 'decimate':
+        index = [slice(None)] * arr.ndim
+        for axis in axes:
+            index[axis] = slice(None, None, factor)
+        return numpy.ascontiguousarray(arr[tuple(index)])
+    if method != 'mean':
+        raise ValueError('unknown downsample method: %r' % (method,))
+    if arr.dtype.kind == 'c':
+        result = arr.astype(numpy.complex128)
+    else:
+        result = arr.astype(numpy.float64)
+    count = 1
+    for axis in axes:
+        size = arr.shape[axis]
+        starts = numpy.arange(0, size, factor)
+        result = numpy.add.reduceat(result, starts, axis=axis)
+        shape = [1] * arr.ndim
+        shape[axis] = starts.size
+        count = count * numpy.diff(numpy.append(starts, size)).reshape(shape)
+    result /= count
+    if arr.dtype.kind in 'iub':
+        result = numpy.rint(result)
+    return result.astype(arr.dtype)
+
+
+def iter_pyramid(arr, factor=2, axes=(0, 1), method='mean', min_size=1,
+                 levels=None):
+    """ Iterator of pyramid levels of an array.
+
+    The first level is arr itself. Each following level is computed
+    from the previous one with downsample.
+
+    Parameters
+    ----------
+    arr : numpy.ndarray
+    factor, axes, method :
+      See downsample.
+    min_size : int
+      Stop when all spatial axes of a level are at most min_size.
+    levels : {None, int}
+      Specify the maximal number of levels including arr.
+    """
+    level = 0
+    while True:
+        yield arr
+        level += 1
+        if levels is not None and level >= levels:
+            break
+        if max(arr.shape[axis] for axis in axes) <= min_size:
+            break
+        arr = downsample(arr, factor=factor, axes=axes, method=method)
+
+
+def resize_nearest(arr, shape, axes=(0, 1)):
+    """ Resize array along axes to shape using nearest neighbours.
+    """
+    for axis, size in zip(axes, shape):
+        n = arr.shape[axis]
+        if n == size:
+            continue
+        index = ((numpy.arange(size) + 0.5) * (n / size)).astype(numpy.intp)
+        arr = arr.take(numpy.minimum(index, n - 1), axis=axis)
+    return arr
+
+
+def get_level_scale(size, level_size):
+    """ Return the downsampling factor of a level axis.
+
+    When the level was obtained by downsampling with an integer
+    factor, so that level_size == ceil(size / factor), the integer
+    factor is returned.
+    """
+    factor = int(round(size / level_size))
+    if factor >= 1 and -(-size // factor) == level_size:
+        return float(factor)
+    return size / level_size
+
+
+class TiffPyramid:
+    """ View of a multi-resolution image stored in a TIFF file.
+
+    Levels are the full-resolution directory and the following
+    directories with NewSubfileType set to FILETYPE_REDUCEDIMAGE, as
+    written by TIFF.write_pyramid. Regions are specified in
+    full-resolution pixel coordinates.
+
+    Attributes
+    ----------
+    tiff : libtiff.TIFF
+    levels : list
+      PyramidLevel items, full-resolution level first. scale_y and
+      scale_x are the downsampling factors relative to the
+      full-resolution level.
+
+    See also
+    --------
+    libtiff.TIFF.get_pyramid
+    """
+
+    def __init__(self, tiff, dirnum=0):
+        """
+        Parameters
+        ----------
+        tiff : libtiff.TIFF
+        dirnum : int
+          Specify the directory of the full-resolution image.
+        """
+        from . import libtiff_ctypes
+        self.tiff = tiff
+        self.levels = []
+        current = tiff.CurrentDirectory()
+        if not tiff.SetDirectory(dirnum):
+            raise IndexError('Failed to set directory %r' % (dirnum,))
+        length, width = tiff.GetField('ImageLength'), tiff.GetField('ImageWidth')
+        self.levels.append(PyramidLevel(dirnum, length, width, 1.0, 1.0))
+        while not tiff.LastDirectory():
+            tiff.ReadDirectory()
+            if not (tiff.GetField('SubFileType') or 0) & libtiff_ctypes.FILETYPE_REDUCEDIMAGE:
+                break
+            level_length = tiff.GetField('ImageLength')
+            level_width = tiff.GetField('ImageWidth')
+            self.levels.append(PyramidLevel(
+                tiff.CurrentDirectory(), level_length, level_width,
+                get_level_scale(length, level_length),
+                get_level_scale(width, level_width)))
+        tiff.SetDirectory(current)
+
+    def __repr__(self):
+        return '%s(%r, levels=%r)' % (self.__class__.__name__, self.tiff,
+                                      len(self.levels))
+
+    def __len__(self):
+        return len(self.levels)
+
+    @property
+    def shape(self):
+        """ (length, width) of the full-resolution level.
+        """
+        return self.levels[0].length, self.levels[0].width
+
+    def get_level_index(self, scale):
+        """ Return the index of the coarsest level with resolution not
+        lower than scale.
+
+        Parameters
+        ----------
+        scale : float
+          Specify the acceptable downsampling factor relative to the
+          full-resolution level.
+        """
+        index = 0
+        for i, level in enumerate(self.levels):
+            if max(level.scale_y, level.scale_x) <= scale * (1 + 1e-9):
+                index = i
+        return index
+
+    def read_level(self, index):
+        """ Read the image of a level.
+        """
+        level = self.levels[index]
+        current = self.tiff.CurrentDirectory()
+        self.tiff.SetDirectory(level.dirnum)
+        try:
+            return self.tiff.read_image()
+        finally:
+            self.tiff.SetDirectory(current)
+
+    def read(self, y0=0, y1=None, x0=0, x1=None, shape=None, scale=None,
+             return_level=False):
+        """ Read region of the image at requested resolution.
+
+        The region is read from the coarsest level that has at least
+        the requested resolution and then resized with nearest
+        neighbour sampling.
+
+        Parameters
+        ----------
+        y0, y1, x0, x1 : int
+          Specify region in full-resolution coordinates. By default,
+          the whole image is read.
+        shape : {None, tuple}
+          Specify (length, width) of the result.
+        scale : {None, float}
+          Specify the downsampling factor of the result relative to
+          the full-resolution level. Used when shape is not given.
+          By default, the full-resolution region is returned.
+        return_level : bool
+          When True, return also the index of the level that was read.
+
+        Returns
+        -------
+        region : numpy.ndarray
+          Array in the layout of TIFF.read_image.
+        """
+        length, width = self.shape
+        if y1 is None:
+            y1 = length
+        if x1 is None:
+            x1 = width
+        if shape is None:
+            scale = scale or 1.0
+            shape = (max(1, int(round((y1 - y0) / scale))),
+                     max(1, int(round((x1 - x0) / scale))))
+        else:
+            scale = min((y1 - y0) / shape[0], (x1 - x0) / shape[1])
+        index = self.get_level_index(scale)
+        level = self.levels[index]
+        ly0 = int(y0 / level.scale_y)
+        ly1 = min(level.length, max(ly0 + 1, int(numpy.ceil(y1 / level.scale_y))))
+        lx0 = int(x0 / level.scale_x)
+        lx1 = min(level.width, max(lx0 + 1, int(numpy.ceil(x1 / level.scale_x))))
+        current = self.tiff.CurrentDirectory()
+        self.tiff.SetDirectory(level.dirnum)
+        try:
+            region = self.tiff.read_region(ly0, ly1, lx0, lx1)
+            geometry = self.tiff.get_tile_geometry()
+        finally:
+            self.tiff.SetDirectory(current)
+        from . import libtiff_ctypes
+        if geometry.samples_pp > 1 and \
+                geometry.planar_config == libtiff_ctypes.PLANARCONFIG_CONTIG:
+            axes = (region.ndim - 3, region.ndim - 2)
+        else:
+            axes = (region.ndim - 2, region.ndim - 1)
+        region = resize_nearest(region, shape, axes=axes)
+        if return_level:
+            return region, index
+        return region
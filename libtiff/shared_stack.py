@@ -0,0 +1,161 @@
+"""
+Provides SharedStack class.
+
+A shared stack holds decoded images in a shared memory block so that
+several processes can access these without decoding or copying them
+again. The process that creates the stack owns the block: closing the
+owner frees the block, closing an attached stack only releases the
+mapping of that process. A stack passed to a multiprocessing worker is
+pickled by name and attached in the worker.
+
+Example::
+
+  from libtiff import TIFFfile
+  from multiprocessing import Pool
+
+  def work(stack):
+      with stack:
+          return stack.array.mean()
+
+  tiff = TIFFfile(filename)
+  with tiff.get_tiff_array().to_shared_memory() as stack:
+      with Pool() as pool:
+          means = pool.map(work, [stack] * 4)
+"""
+# Created: October 2026
+
+__all__ = ['SharedStack']
+
+import threading
+
+import numpy
+from multiprocessing import shared_memory, resource_tracker
+
+_attach_lock = threading.Lock()
+
+
+def _attach_shared_memory(name):
+    """ Open existing shared memory block without registering it with
+    the resource tracker of this process.
+
+    A registered block is unlinked by the resource tracker when the
+    process exits, which would free the block of the owner when the
+    process is not a multiprocessing child sharing the tracker of the
+    owner.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        pass
+    # Unregistering after attaching would also drop the registration
+    # of the owner when the tracker is shared, so skip registering.
+    with _attach_lock:
+        register = resource_tracker.register
+
+        def skip_register(resource_name, rtype):
+            if rtype != 'shared_memory' or resource_name.lstrip('/') != name.lstrip('/'):
+                register(resource_name, rtype)
+
+        resource_tracker.register = skip_register
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedStack:
+    """ Array in a shared memory block.
+
+    Attributes
+    ----------
+    name : str
+      Name of the shared memory block.
+    shape : tuple
+    dtype : numpy.dtype
+    array : numpy.ndarray
+      Array view to the shared memory block, None after close.
+    owner : bool
+      True when the stack was created by this process.
+    """
+
+    def __init__(self, shape, dtype, name=None):
+        """ Create shared memory block for an array.
+
+        Parameters
+        ----------
+        shape : tuple
+        dtype : numpy.dtype
+        name : {None, str}
+          Specify block name, by default a unique name is generated.
+        """
+        self._init(shape, dtype)
+        self._shm = shared_memory.SharedMemory(name=name, create=True,
+                                               size=max(1, self.nbytes))
+        self.owner = True
+        self._set_array()
+
+    @classmethod
+    def attach(cls, name, shape, dtype):
+        """ Attach to an existing shared memory block.
+        """
+        self = cls.__new__(cls)
+        self._init(shape, dtype)
+        self._shm = _attach_shared_memory(name)
+        if self._shm.size < self.nbytes:
+            self._shm.close()
+            raise ValueError('shared memory block %r has %s bytes but %s are required'
+                             % (name, self._shm.size, self.nbytes))
+        self.owner = False
+        self._set_array()
+        return self
+
+    def _init(self, shape, dtype):
+        self.shape = tuple(int(n) for n in shape)
+        self.dtype = numpy.dtype(dtype)
+        self.nbytes = int(numpy.prod(self.shape)) * self.dtype.itemsize
+
+    def _set_array(self):
+        self.name = self._shm.name
+        # frombuffer holds a buffer export, so the block stays mapped
+        # while views exist
+        count = self.nbytes // self.dtype.itemsize
+        self.array = numpy.frombuffer(self._shm.buf, dtype=self.dtype,
+                                      count=count).reshape(self.shape)
+
+    def __repr__(self):
+        return '%s(name=%r, shape=%r, dtype=%r, owner=%r)' % (
+            self.__class__.__name__, self.name, self.shape, self.dtype.str, self.owner)
+
+    def __reduce__(self):
+        return (self.attach, (self.name, self.shape, self.dtype.str))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        if getattr(self, '_shm', None) is not None:
+            self.close()
+
+    def close(self):
+        """ Release the mapping, free the block when owner.
+
+        Views to the array that still exist keep the mapping of this
+        process until these are deleted.
+        """
+        if self._shm is None:
+            return
+        self.array = None
+        shm, self._shm = self._shm, None
+        try:
+            shm.close()
+        except BufferError:
+            pass  # views still exist
+        finally:
+            if self.owner:
+                try:
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass  # unlinked by another process
@@ -0,0 +1,244 @@
+"""
+Provides StripTable class.
+
+A strip table holds the strip offsets and byte counts of all IFDs of
+a TIFF file in flat arrays, so that contiguity checks and read
+planning over many pages are vectorized operations.
+"""
+# Created: October 2026
+
+__all__ = ['StripTable', 'StackLayout']
+
+import collections
+
+import numpy
+
+from .byte_source import coalesce_ranges
+
+StackLayout = collections.namedtuple('StackLayout', ['kind', 'start', 'stride', 'nbytes'])
+
+
+class StripTable:
+    """ Columnar table of the strips of all IFDs in a TIFF file.
+
+    Rows are ordered by page and by strip within a page.
+
+    Attributes
+    ----------
+    page : numpy.ndarray
+      IFD index of each strip.
+    strip : numpy.ndarray
+      Strip index within its IFD.
+    offset : numpy.ndarray
+      Strip offset in file.
+    nbytes : numpy.ndarray
+      Strip byte count.
+    page_start : numpy.ndarray
+      Row of the first strip of each page, with the number of rows
+      appended, so that page i has rows page_start[i]:page_start[i+1].
+    page_contiguous : numpy.ndarray
+      True for pages whose strips follow each other without gaps.
+      Pages without strips, such as tiled pages, are not contiguous.
+
+    See also
+    --------
+    TIFFfile.get_strip_table
+    """
+
+    def __init__(self, offsets, nbytes):
+        """
+        Parameters
+        ----------
+        offsets, nbytes : list
+          Specify strip offsets and byte counts of pages as a list of
+          arrays. Pages without strips have empty arrays.
+        """
+        counts = numpy.array([len(o) for o in offsets], dtype=numpy.int64)
+        self.page_start = numpy.zeros(len(offsets) + 1, dtype=numpy.int64)
+        numpy.cumsum(counts, out=self.page_start[1:])
+        self.page = numpy.repeat(numpy.arange(len(offsets), dtype=numpy.int64), counts)
+        self.strip = numpy.arange(self.page.size, dtype=numpy.int64) - \
+            self.page_start[:-1].repeat(counts)
+        if offsets:
+            self.offset = numpy.concatenate(offsets).astype(numpy.int64)
+            self.nbytes = numpy.concatenate(nbytes).astype(numpy.int64)
+        else:
+            self.offset = numpy.zeros(0, dtype=numpy.int64)
+            self.nbytes = numpy.zeros(0, dtype=numpy.int64)
+        self.offset.flags.writeable = False
+        self.nbytes.flags.writeable = False
+        self._page_contiguous = None
+        self._layout = None
+
+    @classmethod
+    def from_ifds(cls, ifds):
+        """ Create strip table from a list of IFDs.
+        """
+        offsets, nbytes = [], []
+        for ifd in ifds:
+            offsets_entry = ifd.get('StripOffsets')
+            nbytes_entry = ifd.get('StripByteCounts')
+            if offsets_entry is None or nbytes_entry is None:
+                offsets.append(())
+                nbytes.append(())
+                continue
+            offsets.append(numpy.atleast_1d(offsets_entry.value))
+            nbytes.append(numpy.atleast_1d(nbytes_entry.value))
+        return cls(offsets, nbytes)
+
+    def __repr__(self):
+        return '%s(pages=%r, strips=%r)' % (self.__class__.__name__,
+                                            self.npages, len(self))
+
+    def __len__(self):
+        return self.offset.size
+
+    @property
+    def npages(self):
+        return self.page_start.size - 1
+
+    @property
+    def end(self):
+        """ End offsets of strips.
+        """
+        return self.offset + self.nbytes
+
+    def get_page(self, page):
+        """ Return strip offsets and byte counts of a page.
+        """
+        start, stop = self.page_start[page], self.page_start[page + 1]
+        return self.offset[start:stop], self.nbytes[start:stop]
+
+    def get_rows(self, pages, first=0, last=None):
+        """ Return table rows of the strips of pages.
+
+        Parameters
+        ----------
+        pages : sequence
+        first, last : int
+          Specify the range first:last of strips within each page, by
+          default all strips.
+        """
+        pages = numpy.asarray(pages, dtype=numpy.int64)
+        starts = self.page_start[pages]
+        stops = self.page_start[pages + 1]
+        if last is not None:
+            stops = numpy.minimum(stops, starts + last)
+        starts = numpy.minimum(starts + first, stops)
+        counts = stops - starts
+        total = counts.sum()
+        if not total:
+            return numpy.zeros(0, dtype=numpy.int64)
+        # concatenation of arange(start, start+count) for each page
+        shifts = numpy.repeat(starts - (numpy.cumsum(counts) - counts), counts)
+        return numpy.arange(total, dtype=numpy.int64) + shifts
+
+    @property
+    def page_contiguous(self):
+        """ Computed on first access.
+        """
+        if self._page_contiguous is None:
+            gaps = self.offset[1:] != self.end[:-1]
+            inner = self.page[1:] == self.page[:-1]
+            counts = numpy.bincount(self.page[1:][gaps & inner], minlength=self.npages)
+            has_strips = self.page_start[1:] > self.page_start[:-1]
+            self._page_contiguous = (counts == 0) & has_strips
+        return self._page_contiguous
+
+    def is_contiguous(self, pages=None):
+        """ Return True when the strips of pages follow each other
+        without gaps in the file, within and across pages. Returns
+        False when some of the pages have no strips.
+
+        Parameters
+        ----------
+        pages : {None, sequence}
+          Specify pages, by default all pages.
+        """
+        if pages is None:
+            if not self.page_contiguous.all():
+                return False
+            offset, end = self.offset, self.end
+        else:
+            pages = numpy.asarray(pages, dtype=numpy.int64)
+            if not self.page_contiguous[pages].all():
+                return False
+            rows = self.get_rows(pages)
+            offset, end = self.offset[rows], self.end[rows]
+        return not (offset[1:] != end[:-1]).any()
+
+    def get_ranges(self, pages=None, max_gap=0, first=0, last=None):
+        """ Return coalesced byte ranges that cover the strips of pages.
+
+        Parameters
+        ----------
+        pages : {None, sequence}
+          Specify pages, by default all pages.
+        max_gap : int
+          See byte_source.coalesce_ranges.
+        first, last : int
+          Specify the range of strips within pages, see get_rows.
+
+        Returns
+        -------
+        starts, stops : numpy.ndarray
+        """
+        if pages is None and not first and last is None:
+            offset, end = self.offset, self.end
+        else:
+            if pages is None:
+                pages = numpy.arange(self.npages)
+            rows = self.get_rows(pages, first, last)
+            offset, end = self.offset[rows], self.end[rows]
+        return coalesce_ranges(offset, end, max_gap)
+
+    def get_layout(self, pages=None):
+        """ Classify the storage layout of the strips of pages.
+
+        Parameters
+        ----------
+        pages : {None, sequence}
+          Specify pages, by default all pages. The result for all pages
+          is cached.
+
+        Returns
+        -------
+        layout : StackLayout
+          Namedtuple (kind, start, stride, nbytes) where kind is
+
+            'contiguous' -- pages have equal size and follow each other
+                            without gaps, stride equals nbytes
+            'strided'    -- pages have contiguous strips and equal size
+                            and are separated by a constant stride
+            'arbitrary'  -- otherwise, start, stride and nbytes are None
+
+          start is the offset of the first page, nbytes is the number
+          of bytes of a page.
+        """
+        if pages is None:
+            if self._layout is None:
+                self._layout = self._get_layout(numpy.arange(self.npages))
+            return self._layout
+        return self._get_layout(numpy.asarray(pages, dtype=numpy.int64))
+
+    def _get_layout(self, pages):
+        arbitrary = StackLayout('arbitrary', None, None, None)
+        if not pages.size:
+            return arbitrary
+        first = self.page_start[pages]
+        last = self.page_start[pages + 1] - 1
+        if (last < first).any() or not self.page_contiguous[pages].all():
+            return arbitrary
+        starts = self.offset[first]
+        sizes = self.offset[last] + self.nbytes[last] - starts
+        nbytes = sizes[0]
+        if (sizes != nbytes).any():
+            return arbitrary
+        if pages.size == 1:
+            return StackLayout('contiguous', int(starts[0]), int(nbytes), int(nbytes))
+        strides = numpy.diff(starts)
+        stride = strides[0]
+        if (strides != stride).any() or stride < nbytes:
+            return arbitrary
+        kind = 'contiguous' if stride == nbytes else 'strided'
+        return StackLayout(kind, int(starts[0]), int(stride), int(nbytes))
@@ -0,0 +1,136 @@
+import io
+import os
+import atexit
+import threading
+from tempfile import mktemp
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from numpy import *
+from libtiff import TIFFfile, TIFFimage, instrument
+from libtiff.byte_source import FileSource, HTTPSource, coalesce_ranges
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """ Serves files from the `files` dict supporting range requests.
+    """
+    protocol_version = 'HTTP/1.1'
+    files = {}
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        content = self.files[self.path]
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+
+    def do_GET(self):
+        content = self.files[self.path]
+        start, stop = self.headers['Range'].split('=')[1].split('-')
+        start, stop = int(start), int(stop) + 1
+        self.requests.append((start, stop))
+        self.send_response(206)
+        self.send_header('Content-Length', str(stop - start))
+        self.send_header('Content-Range', 'bytes %s-%s/%s' % (start, stop - 1, len(content)))
+        self.end_headers()
+        self.wfile.write(content[start:stop])
+
+
+def test_coalesce_ranges():
+    starts, stops = coalesce_ranges([30, 0, 10, 100, 12], [40, 10, 20, 110, 14])
+    assert starts.tolist() == [0, 30, 100], repr(starts)
+    assert stops.tolist() == [20, 40, 110], repr(stops)
+    starts, stops = coalesce_ranges([30, 0, 10, 100], [40, 10, 20, 110], max_gap=10)
+    assert starts.tolist() == [0, 100], repr(starts)
+    assert stops.tolist() == [40, 110], repr(stops)
+
+
+def test_file_source():
+    image = random.randint(0, 100, size=(6, 128, 200)).astype(uint16)
+    fn = mktemp('.tif')
+    tif = TIFFimage(image)
+    tif.write_file(fn, compression='lzw', strip_size=2000)
+    del tif
+    atexit.register(os.remove, fn)
+
+    tif = TIFFfile(fn, use_memmap=False, lazy=True)
+    assert isinstance(tif.data, FileSource)
+    arr = tif.get_tiff_array()
+    nbytes = tif.get_strip_table().nbytes.sum()
+    with instrument.collect() as stats:
+        roi = arr[1:5, 10:20, 3:40]
+    assert (roi == image[1:5, 10:20, 3:40]).all()
+    # only the strips of rows 10:20 of planes 1:5 are read
+    assert 0 < stats.counts['bytes_read'] < nbytes // 10, repr((stats.counts, nbytes))
+    assert (arr[2, -5:] == image[2, -5:]).all()
+    assert (arr[:, ::7, 1] == image[:, ::7, 1]).all()
+    assert (arr[:] == image).all()
+    fileobj = tif.data.fileobj
+    tif.close()
+    assert fileobj.closed
+
+    content = fromfile(fn, dtype=uint8)
+    # file positions of callers are not changed
+    for f in [open(fn, 'rb'), io.BytesIO(content.tobytes())]:
+        f.seek(10)
+        tif = TIFFfile(f)
+        assert (tif.get_tiff_array()[2] == image[2]).all()
+        assert f.tell() == 10, repr((f, f.tell()))
+        tif.close()
+        f.close()
+
+    source = FileSource(open(fn, 'rb'), max_prefetch_bytes=100)
+    with instrument.collect() as stats:
+        source.prefetch([0], [100])
+        data = source.read(10, 60)[5:20]
+        source.prefetch([200], [300])
+        source.prefetch([400], [500])
+        # the buffer of the first range is not reused while a view exists
+        assert not stats.counts['buffers_reused']
+        source.prefetch([600], [700])
+        source.prefetch([800], [900])
+        assert (data == content[15:30]).all()
+        assert (source.read(800, 900) == content[800:900]).all()
+        assert stats.counts['buffers_reused'] == 2, repr(stats.counts)
+        del data
+        source.prefetch([1000], [1100])
+        source.prefetch([1200], [1300])
+        assert stats.counts['buffers_reused'] == 4, repr(stats.counts)
+        assert (source.read(1200, 1300) == content[1200:1300]).all()
+    source.close()
+    source.fileobj.close()
+
+
+def test_http_source():
+    image = random.randint(0, 100, size=(3, 64, 50)).astype(uint16)
+    fn = mktemp('.tif')
+    tif = TIFFimage(image)
+    tif.write_file(fn, compression='lzw', strip_size=512)
+    del tif
+    atexit.register(os.remove, fn)
+    f = open(fn, 'rb')
+    RangeRequestHandler.files['/image.tif'] = f.read()
+    f.close()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        url = 'http://127.0.0.1:%s/image.tif' % (server.server_port)
+        tif = TIFFfile(url)
+        assert isinstance(tif.data, HTTPSource)
+        arr = tif.get_tiff_array()
+        del RangeRequestHandler.requests[:]
+        data = arr[1]
+        assert (data == image[1]).all()
+        nof_strips = len(arr.planes[1].strip_offsets)
+        assert nof_strips > 1, repr(nof_strips)
+        assert len(RangeRequestHandler.requests) == 1, repr(RangeRequestHandler.requests)
+        assert (arr[:] == image).all()
+        tif.close()
+    finally:
+        server.shutdown()
+        server.server_close()
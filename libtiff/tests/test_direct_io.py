@@ -0,0 +1,26 @@
+import os
+import atexit
+from tempfile import mktemp
+from numpy import *
+from libtiff.direct_io import DirectReader
+
+
+def test_direct_reader():
+    content = random.randint(0, 256, size=20000).astype(uint8)
+    fn = mktemp('.bin')
+    content.tofile(fn)
+    atexit.register(os.remove, fn)
+    for direct in [True, False]:
+        reader = DirectReader(fn, direct=direct)
+        assert reader.nbytes == content.nbytes
+        assert (reader[5:100] == content[5:100]).all()
+        assert reader.start % reader.alignment == 0, repr(reader.start)
+        # reads within the window do not load
+        start = reader.start
+        assert (reader[50:60] == content[50:60]).all()
+        assert reader.start == start
+        assert (reader[19990:] == content[19990:]).all()
+        assert reader.stop == content.nbytes
+        reader.load(0, 20000)
+        assert (reader[:] == content).all()
+        reader.close()
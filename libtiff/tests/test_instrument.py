@@ -0,0 +1,39 @@
+
+import os
+from tempfile import mktemp
+from numpy import *
+from libtiff import TIFFfile, TIFFimage, instrument
+
+
+def test_collect():
+    image = arange(4 * 64 * 64, dtype=uint16).reshape((4, 64, 64))
+    fn = mktemp('.tif')
+    events = []
+    with instrument.collect(callback=lambda *args: events.append(args)) as stats:
+        TIFFimage(image).write_file(fn, compression='lzw', strip_size=2048, verbose=False)
+        tif = TIFFfile(fn)
+        arr = tif.get_tiff_array()[:]
+    assert (arr == image).all()
+    assert not instrument.enabled
+    counts = stats.counts
+    assert counts['ifds'] == 4, repr(counts)
+    assert counts['strips_encoded'] == counts['strips_decoded'] == 4 * 4, repr(counts)
+    assert counts['bytes_encoded'] == counts['bytes_decoded'] == image.nbytes, repr(counts)
+    assert counts['bytes_copied'] >= image.nbytes, repr(counts)
+    assert set(['open', 'decode', 'copy', 'encode', 'write']) <= set(stats.times), repr(stats.times)
+    assert ('count', 'strips_decoded', 1) in events
+
+    # nothing is collected outside of a collect block
+    before = stats.as_dict()
+    tif.get_tiff_array()[:]
+    assert stats.as_dict() == before
+    tif.close()
+
+    with instrument.collect() as stats:
+        with open(fn, 'rb') as f:
+            tif = TIFFfile(f)
+            tif.get_tiff_array()[:]
+            tif.close()
+    assert stats.counts['bytes_read'] > 0, repr(stats.counts)
+    assert stats.counts['cache_hits'] + stats.counts['cache_misses'] > 0, repr(stats.counts)
+    os.remove(fn)
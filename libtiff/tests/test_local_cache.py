@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+from numpy import *
+from libtiff import TIFFfile, TIFFimage, TiffFiles, LocalCache
+
+
+def _make_files(n, shape=(2, 10, 10)):
+    d = tempfile.mkdtemp()
+    files = []
+    for i in range(n):
+        image = random.randint(0, 100, size=shape).astype(uint8)
+        fn = os.path.join(d, 'image%s.tif' % (i))
+        tif = TIFFimage(image)
+        tif.write_file(fn, compression='none')
+        del tif
+        files.append(fn)
+    return d, files
+
+
+def test_prefetch():
+    d, files = _make_files(4)
+    cache_dir = tempfile.mkdtemp()
+    cache = LocalCache(cache_dir, only_remote=False)
+    try:
+        tiff_files = TiffFiles(files, local_cache=cache, prefetch=2)
+        arr = tiff_files.get_tiff_array()
+        assert arr.shape == (8, 10, 10), repr(arr.shape)
+        cache.close()
+        for fn in files[:3]:
+            assert cache.is_cached(fn), repr(fn)
+        tiff = TIFFfile(files[1], local_cache=cache)
+        assert tiff.filename == cache.get_cache_filename(files[1])
+        assert (tiff.get_tiff_array()[:] == arr[2:4]).all()
+        tiff.close()
+        tiff_files.close()
+    finally:
+        shutil.rmtree(d)
+        shutil.rmtree(cache_dir)
+
+
+def test_lru_budget():
+    d, files = _make_files(3)
+    cache_dir = tempfile.mkdtemp()
+    nbytes = os.stat(files[0]).st_size
+    cache = LocalCache(cache_dir, max_size=2 * nbytes, only_remote=False)
+    try:
+        for fn in files:
+            cache.get(fn)
+        assert cache.size <= 2 * nbytes, repr((cache.size, nbytes))
+        assert not os.path.exists(cache.get_cache_filename(files[0]))
+        assert cache.is_cached(files[2])
+
+        # a modified original invalidates its copy
+        st = os.stat(files[2])
+        os.utime(files[2], (st.st_atime, st.st_mtime + 10))
+        assert not cache.is_cached(files[2])
+        cache.get(files[2])
+        assert cache.is_cached(files[2])
+        cache.close()
+    finally:
+        shutil.rmtree(d)
+        shutil.rmtree(cache_dir)
+
+
+def test_pinned_copies():
+    d, files = _make_files(3)
+    cache_dir = tempfile.mkdtemp()
+    nbytes = os.stat(files[0]).st_size
+    cache = LocalCache(cache_dir, max_size=nbytes, only_remote=False)
+    try:
+        # an open file pins its copy
+        tiff = TIFFfile(files[0], local_cache=cache)
+        cache.get(files[1])
+        assert cache.is_cached(files[0])
+        assert cache.is_cached(files[1])
+        tiff.close()
+        cache.get(files[2])
+        assert not cache.is_cached(files[0])
+
+        # prefetched and requested file is staged once
+        cache.prefetch([files[0]])
+        assert cache.get(files[0]) == cache.get_cache_filename(files[0])
+        cache.close()
+        assert cache.size == nbytes, repr((cache.size, nbytes))
+        assert cache.get_cache_filename(files[0]) in cache._entries
+    finally:
+        shutil.rmtree(d)
+        shutil.rmtree(cache_dir)
+
+
+def test_tiff_files_closes_own_cache():
+    d, files = _make_files(3)
+    cache_dir = tempfile.mkdtemp()
+    try:
+        tiff_files = TiffFiles(files, local_cache=cache_dir, prefetch=1)
+        assert tiff_files.own_local_cache
+        cache = tiff_files.local_cache
+        assert not cache.closed
+        tiff_files.close()
+        assert cache.closed
+        try:
+            cache.prefetch(files)
+        except ValueError:
+            pass
+        else:
+            assert 0, 'expected ValueError from closed cache'
+    finally:
+        shutil.rmtree(d)
+        shutil.rmtree(cache_dir)
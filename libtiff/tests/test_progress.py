@@ -0,0 +1,40 @@
+
+import os
+from io import StringIO
+from tempfile import mktemp
+from numpy import *
+from libtiff import TIFFfile, TIFFimage, TiffFiles
+from libtiff.progress import ProgressWriter
+
+
+def test_progress():
+    image = arange(5 * 16 * 16, dtype=uint8).reshape((5, 16, 16))
+    fn = mktemp('.tif')
+    events = []
+
+    def callback(progress):
+        events.append((progress.task, progress.done, progress.total,
+                       progress.nbytes, progress.finished))
+
+    TIFFimage(image).write_file(fn, verbose=False, progress=callback)
+    assert events[-1] == ('  filling records', 5, 5, image.nbytes, True), repr(events)
+    assert len(events) == 2 * (5 + 1), repr(events)
+
+    del events[:]
+    tif = TIFFfile(fn, progress=callback)
+    assert events[-1][1:3] == (5, None) and events[-1][-1], repr(events)
+    tif.close()
+
+    del events[:]
+    files = TiffFiles([fn])
+    arr = files.get_tiff_array(progress=callback)
+    assert arr.shape == image.shape
+    assert events[-1][1:3] == (1, 1), repr(events)
+    files.close()
+
+    stream = StringIO()
+    tif = TIFFfile(fn, progress=ProgressWriter(stream, interval=60))
+    tif.close()
+    output = stream.getvalue()
+    assert output.endswith('s\n') and ': 5 ' in output, repr(output)
+    os.remove(fn)
@@ -0,0 +1,75 @@
+import os
+from tempfile import mktemp
+from numpy import *
+from libtiff import TIFF
+from libtiff.pyramid import downsample
+
+
+def test_downsample():
+    a = arange(35, dtype=uint8).reshape(5, 7)
+    b = downsample(a, 2)
+    assert b.shape == (3, 4), repr(b.shape)
+    assert b.dtype == uint8
+    assert b[0, 0] == 4, repr(b)  # mean of 0, 1, 7, 8
+    assert b[2, 3] == 34, repr(b)  # edge block of one element
+    c = downsample(a, 2, method='decimate')
+    assert (c == a[::2, ::2]).all()
+    d = downsample(a.astype(float32), 3, axes=(1,))
+    assert d.shape == (5, 3), repr(d.shape)
+    assert d[0, 0] == 1 and d[0, 2] == 6, repr(d)
+
+
+def test_write_pyramid():
+    image = random.randint(255, size=(100, 70, 3)).astype(uint8)
+    fn = mktemp('.tif')
+    tif = TIFF.open(fn, 'w')
+    shapes = tif.write_pyramid(image, 32, 32, write_rgb=True)
+    tif.close()
+    assert shapes == [(100, 70, 3), (50, 35, 3), (25, 18, 3)], repr(shapes)
+
+    tif = TIFF.open(fn, 'r')
+    images = list(tif.iter_images())
+    subfile_types = []
+    while True:
+        subfile_types.append(tif.GetField('SubFileType') or 0)
+        if tif.LastDirectory():
+            break
+        tif.ReadDirectory()
+    tif.close()
+    os.remove(fn)
+    assert subfile_types == [0, 1, 1], repr(subfile_types)
+    assert [im.shape for im in images] == shapes
+    assert (images[0] == image).all()
+    assert (images[1] == downsample(image)).all()
+
+
+def test_read_pyramid():
+    image = random.randint(255, size=(200, 130)).astype(uint8)
+    fn = mktemp('.tif')
+    tif = TIFF.open(fn, 'w')
+    tif.write_pyramid(image, 32, 32)
+    tif.close()
+
+    tif = TIFF.open(fn, 'r')
+    pyramid = tif.get_pyramid()
+    assert len(pyramid) == 4, repr(pyramid.levels)
+    assert pyramid.shape == (200, 130)
+    assert [level.scale_y for level in pyramid.levels] == [1, 2, 4, 8]
+
+    region, index = pyramid.read(40, 120, 20, 100, return_level=True)
+    assert index == 0
+    assert (region == image[40:120, 20:100]).all()
+    region, index = pyramid.read(40, 120, 20, 100, scale=4, return_level=True)
+    assert index == 2
+    assert (region == pyramid.read_level(2)[10:30, 5:25]).all()
+    region, index = pyramid.read(shape=(50, 40), return_level=True)
+    assert index == 1, repr(index)  # scale 3.25 needs level of scale 2
+    assert region.shape == (50, 40)
+    # reading levels keeps the current directory
+    assert tif.CurrentDirectory() == 0
+    tif.SetDirectory(1)
+    pyramid.read_level(3)
+    pyramid.read(0, 100, 0, 100, scale=8)
+    assert tif.CurrentDirectory() == 1
+    tif.close()
+    os.remove(fn)
@@ -0,0 +1,74 @@
+import os
+import sys
+import pickle
+import subprocess
+import atexit
+from tempfile import mktemp
+from numpy import *
+from libtiff import TIFFfile, TIFFimage, TiffArray
+from libtiff.shared_stack import SharedStack
+
+
+def test_shared_stack():
+    stack = SharedStack((3, 4), float32)
+    assert stack.owner
+    stack.array[:] = arange(12).reshape((3, 4))
+    other = pickle.loads(pickle.dumps(stack))
+    assert not other.owner
+    assert other.name == stack.name
+    assert (other.array == stack.array).all()
+    other.array[0, 0] = -1
+    assert stack.array[0, 0] == -1
+    other.close()
+    assert other.array is None
+    # closing an attached stack does not free the block
+    assert SharedStack.attach(stack.name, stack.shape, stack.dtype).array[1, 1] == 5
+    stack.close()
+    try:
+        SharedStack.attach(stack.name, stack.shape, stack.dtype)
+    except FileNotFoundError:
+        pass
+    else:
+        assert 0, 'expected block to be freed'
+
+
+def test_attach_from_process():
+    stack = SharedStack((10,), int32)
+    stack.array[:] = arange(10)
+    code = '''
+import sys
+from libtiff.shared_stack import SharedStack
+other = SharedStack.attach(sys.argv[1], (10,), 'int32')
+assert other.array[7] == 7, repr(other.array)
+other.array[0] = 100
+other.close()
+'''
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    # reading stderr until EOF waits for the resource tracker of the
+    # process too, it unlinks registered blocks after the process exits
+    result = subprocess.run([sys.executable, '-c', code, stack.name], env=env,
+                            stderr=subprocess.PIPE)
+    assert result.returncode == 0, result.stderr.decode()
+    assert b'leaked' not in result.stderr, result.stderr.decode()
+    # the block survives the exit of the attached process
+    other = SharedStack.attach(stack.name, (10,), int32)
+    assert other.array[0] == 100
+    other.close()
+    stack.close()
+
+
+def test_tiff_array_shared_memory():
+    image = random.randint(0, 100, size=(5, 30, 20)).astype(uint16)
+    fn = mktemp('.tif')
+    tif = TIFFimage(image)
+    tif.write_file(fn, compression='lzw')
+    del tif
+    atexit.register(os.remove, fn)
+    tif = TIFFfile(fn)
+    arr = tif.get_tiff_array()
+    with arr.to_shared_memory(slice(1, 4)) as stack:
+        assert stack.shape == (3, 30, 20)
+        other = TiffArray.from_shared_memory(stack.name, stack.shape, stack.dtype)
+        assert (other.array == image[1:4]).all()
+        other.close()
+    tif.close()
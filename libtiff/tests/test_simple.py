@@ -43,3 +43,151 @@ def test_slicing():
             assert (image1 == image2).all(), repr((i, j))
 
             os.remove(fn)
+
+
+def test_reader_pool():
+    from libtiff import TIFFReaderPool
+    images = [random.randint(255, size=(40, 30)).astype(uint8)
+              for i in range(6)]
+    fn = mktemp('.tif')
+    tif = TIFF.open(fn, 'w')
+    for image in images:
+        tif.write_image(image, compression='deflate')
+    tif.close()
+
+    with TIFFReaderPool(fn, nthreads=3) as pool:
+        assert pool.get_number_of_directories() == len(images)
+        for image, image2 in zip(images, pool.read_images()):
+            assert (image == image2).all()
+        image2 = pool.read_image(4)
+        assert (images[4] == image2).all()
+        images2 = pool.read_images([5, 0, 5])
+        assert (images[5] == images2[0]).all()
+        assert (images[0] == images2[1]).all()
+    os.remove(fn)
+
+
+def test_read_tiles():
+    from libtiff import TIFFReaderPool
+    image = random.randint(255, size=(70, 50, 3)).astype(uint8)
+    fn = mktemp('.tif')
+    tif = TIFF.open(fn, 'w')
+    tif.write_tiles(image, 16, 32, compression='deflate', write_rgb=True)
+    tif.close()
+
+    tif = TIFF.open(fn, 'r')
+    assert (tif.read_image() == image).all()
+    tile = tif.read_one_tile(49, 69)
+    assert (tile == image[64:, 48:]).all()
+    with TIFFReaderPool(fn, nthreads=2) as pool:
+        assert (tif.read_tiles(pool=pool) == image).all()
+    tif.close()
+    os.remove(fn)
+
+
+def test_read_region():
+    image = random.randint(255, size=(70, 50, 3)).astype(uint8)
+    fn = mktemp('.tif')
+    tif = TIFF.open(fn, 'w')
+    tif.write_tiles(image, 16, 32, write_rgb=True)
+    tif.write_image(image[..., 0])
+    tif.close()
+
+    tif = TIFF.open(fn, 'r')
+    region, metrics = tif.read_region(33, 60, 10, 20, return_metrics=True)
+    assert (region == image[33:60, 10:20]).all()
+    # 2 tile rows x 1 tile column
+    assert metrics['tiles'] == 2, repr(metrics)
+    assert metrics['bytes_decoded'] == 2 * 16 * 32 * 3, repr(metrics)
+    assert metrics['bytes_returned'] == region.nbytes, repr(metrics)
+    region = tif.read_region(0, 70, 49, 50, samples=1)
+    assert (region == image[:, 49:, 1]).all()
+
+    tif.SetDirectory(1)
+    region = tif.read_region(5, 6, 0, 50)
+    assert (region == image[5:6, :, 0]).all()
+    tif.close()
+    os.remove(fn)
+
+
+def test_read_3d():
+    from libtiff import TIFF3D, TIFFReaderPool
+    image = random.randint(65535, size=(4, 20, 30)).astype(uint16)
+    fn = mktemp('.tif')
+    tif = TIFF.open(fn, 'w')
+    tif.write_image(image, compression='lzw')
+    tif.write_tiles(image[0], 16, 16)
+    tif.close()
+
+    tif = TIFF3D.open(fn, 'r')
+    image2 = tif.read_image()
+    assert image2.shape == (5, 20, 30), repr(image2.shape)
+    assert (image2[:4] == image).all()
+    assert (image2[4] == image[0]).all()
+    with TIFFReaderPool(fn, nthreads=2) as pool:
+        assert (tif.read_image(pool=pool) == image2).all()
+    tif.close()
+
+    tif = TIFF.open(fn, 'w')
+    tif.write_image(image[0])
+    tif.write_image(image[1, :10])
+    tif.close()
+    tif = TIFF3D.open(fn, 'r')
+    try:
+        tif.read_image()
+        raise AssertionError('expected ValueError from non-uniform directories')
+    except ValueError:
+        pass
+    tif.close()
+    os.remove(fn)
+
+
+def test_read_image_out():
+    images = random.randint(255, size=(5, 20, 30)).astype(uint8)
+    fn = mktemp('.tif')
+    tif = TIFF.open(fn, 'w')
+    tif.write_image(images)
+    tif.close()
+
+    tif = TIFF.open(fn, 'r')
+    out = zeros((20, 30), uint8)
+    assert tif.read_image(out=out) is out
+    assert (out == images[0]).all()
+    for i, image in enumerate(tif.iter_images(out=out)):
+        assert image is out
+        assert (image == images[i]).all()
+
+    ring = zeros((2, 20, 30), uint8)
+    for i, image in enumerate(tif.iter_images(out=ring)):
+        assert may_share_memory(image, ring)
+        assert (ring[i % 2] == images[i]).all()
+
+    for bad in [zeros((20, 31), uint8), zeros((20, 30), uint16),
+                zeros((30, 20), uint8).T]:
+        try:
+            tif.read_image(out=bad)
+            raise AssertionError('expected ValueError')
+        except ValueError:
+            pass
+    tif.close()
+    os.remove(fn)
+
+
+def test_write_tiles():
+    for shape, write_rgb in [((70, 50), False),
+                             ((70, 50, 3), True),
+                             ((3, 70, 50), True),
+                             ((2, 70, 50), False),
+                             ((2, 70, 50, 2), False)]:
+        image = random.randint(255, size=shape).astype(uint8)
+        fn = mktemp('.tif')
+        tif = TIFF.open(fn, 'w')
+        tif.write_tiles(image, 32, 16, compression='lzw', write_rgb=write_rgb)
+        tif.close()
+
+        tif = TIFF.open(fn, 'r')
+        image2 = tif.read_image()
+        tif.close()
+        os.remove(fn)
+        assert image2.shape == shape, repr((image2.shape, shape))
+        assert (image == image2).all(), repr(shape)
@@ -0,0 +1,112 @@
+
+import os
+from tempfile import mktemp
+from numpy import *
+from libtiff import TIFF, TIFFfile, TIFFimage
+from libtiff.strip_table import StripTable
+
+
+def test_strip_table():
+    table = StripTable([array([10, 20, 30]), array([], int64), array([40, 60])],
+                       [array([10, 10, 10]), array([], int64), array([20, 5])])
+    assert table.npages == 3 and len(table) == 5
+    assert (table.page == [0, 0, 0, 2, 2]).all()
+    assert (table.strip == [0, 1, 2, 0, 1]).all()
+    assert (table.get_rows([2, 0]) == [3, 4, 0, 1, 2]).all()
+    # pages without strips are not contiguous
+    assert (table.page_contiguous == [True, False, True]).all()
+    assert not table.is_contiguous() and not table.is_contiguous([1])
+    assert table.is_contiguous([0]) and table.is_contiguous([2])
+    assert table.is_contiguous([0, 2])
+    assert not table.is_contiguous([2, 0])
+    starts, stops = table.get_ranges()
+    assert (starts == [10]).all() and (stops == [65]).all()
+    offsets, nbytes = table.get_page(2)
+    assert (offsets == [40, 60]).all() and (nbytes == [20, 5]).all()
+
+    table = StripTable([array([10, 25]), array([30])], [array([10, 5]), array([5])])
+    assert (table.page_contiguous == [False, True]).all()
+    assert not table.is_contiguous()
+    starts, stops = table.get_ranges(max_gap=5)
+    assert (starts == [10]).all() and (stops == [35]).all()
+
+
+def test_read_planes():
+    image = arange(6 * 20 * 10, dtype=uint16).reshape((6, 20, 10))
+    for compression in ['none', 'lzw']:
+        fn = mktemp('.tif')
+        TIFFimage(image).write_file(fn, compression=compression, strip_size=100, verbose=False)
+        for use_file in [False, True]:
+            if use_file:
+                f = open(fn, 'rb')
+                tif = TIFFfile(f)
+            else:
+                tif = TIFFfile(fn)
+            table = tif.get_strip_table()
+            assert table.npages == 6 and len(table) == 6 * 4, repr(table)
+            assert tif.is_contiguous()
+            assert tif.IFD[2].is_contiguous()
+            arr = tif.get_tiff_array()
+            assert (arr[:] == image).all()
+            assert (arr[1:5:2] == image[1:5:2]).all()
+            assert (arr[::-1] == image[::-1]).all()
+            tif.close()
+            if use_file:
+                f.close()
+        os.remove(fn)
+
+
+def test_stack_layout():
+    table = StripTable([array([10, 20]), array([30, 40]), array([50, 60])],
+                       [array([10, 10])] * 3)
+    assert table.get_layout() == ('contiguous', 10, 20, 20)
+    assert table.get_layout([0, 2]) == ('strided', 10, 40, 20)
+    assert table.get_layout([2, 0]).kind == 'arbitrary'
+    table = StripTable([array([10, 20]), array([35, 45])], [array([10, 10])] * 2)
+    assert table.get_layout() == ('strided', 10, 25, 20)
+    table = StripTable([array([10, 25]), array([35, 45])], [array([10, 10])] * 2)
+    assert table.get_layout().kind == 'arbitrary'
+
+
+def test_strided_view():
+    from libtiff import TIFF
+    image = arange(5 * 20 * 10, dtype=uint16).reshape((5, 20, 10))
+    fn = mktemp('.tif')
+    # libtiff writes each IFD after its image data
+    tif = TIFF.open(fn, 'w')
+    tif.write_image(image)
+    tif.close()
+    tif = TIFFfile(fn)
+    layout = tif.get_stack_layout()
+    assert layout.kind == 'strided', repr(layout)
+    arr = tif.get_tiff_array()
+    view = arr.get_view()
+    assert view.shape == image.shape and (view == image).all()
+    assert (arr[1:4] == image[1:4]).all()
+    tif.close()
+    os.remove(fn)
+
+    fn = mktemp('.tif')
+    TIFFimage(image).write_file(fn, compression='lzw', verbose=False)
+    tif = TIFFfile(fn)
+    assert tif.get_tiff_array().get_view() is None
+    tif.close()
+    os.remove(fn)
+
+
+def test_tiled_pages():
+    fn = mktemp('.tif')
+    tif = TIFF.open(fn, 'w')
+    tif.write_tiles(arange(64 * 48, dtype=uint8).reshape(64, 48), 16, 16)
+    tif.close()
+    tif = TIFFfile(fn)
+    assert not tif.IFD[0].is_contiguous()
+    assert not tif.is_contiguous()
+    try:
+        tif.get_tiff_array()
+    except NotImplementedError as msg:
+        assert 'tiled' in str(msg), repr(msg)
+    else:
+        assert 0, 'expected NotImplementedError'
+    tif.close()
+    os.remove(fn)
@@ -46,3 +46,49 @@ def test_simple_slicing():
                             sl = (_i0, i1, i2)
                             assert (arr[sl] == image[sl]).all(),repr(sl)
                 atexit.register(os.remove, fn)
+
+
+def test_access_pattern():
+    image = random.randint(0, 100, size=(5, 300, 40)).astype(uint16)
+    fn = mktemp('.tif')
+    tif = TIFFimage(image)
+    tif.write_file(fn, compression='lzw', strip_size=4000)
+    del tif
+    atexit.register(os.remove, fn)
+    tif = TIFFfile(fn)
+    try:
+        import mmap
+        have_madvise = hasattr(mmap.mmap, 'madvise')
+    except ImportError:
+        have_madvise = False
+    assert tif.advise('random') == have_madvise
+    assert tif.advise('willneed', [10, 5000], [20, 9000]) == have_madvise
+    arr = tif.get_tiff_array()
+    arr.set_access_pattern('sequential', readahead=2)
+    for i, plane in enumerate(arr):
+        assert (plane.get_image() == image[i]).all()
+    assert (arr[1:4, 100:120] == image[1:4, 100:120]).all()
+    arr.set_access_pattern(None)
+    tif.close()
+
+    tif = TIFFfile(fn, use_memmap=False)
+    assert not tif.advise('sequential')
+    tif.close()
+
+
+def test_iter_images():
+    image = random.randint(0, 100, size=(6, 70, 50)).astype(uint16)
+    for compression in [None, 'lzw']:
+        fn = mktemp('.tif')
+        tif = TIFFimage(image)
+        tif.write_file(fn, compression=compression, strip_size=2000)
+        del tif
+        atexit.register(os.remove, fn)
+        tif = TIFFfile(fn)
+        arr = tif.get_tiff_array()
+        for direct in [True, False]:
+            images = list(arr.iter_images(direct=direct, window_size=10000))
+            assert len(images) == len(image)
+            for i in range(len(image)):
+                assert (images[i] == image[i]).all(), repr((compression, direct, i))
+        tif.close()
@@ -34,3 +34,73 @@ def test_write_read():
             
             #os.remove(fn)
             atexit.register(os.remove, fn)
+
+
+def test_read_buffers():
+    import io
+    import pathlib
+    image = random.randint(0, 100, size=(4, 30, 20)).astype(uint16)
+    for compression in ['none', 'lzw']:
+        fn = mktemp('.tif')
+        tif = TIFFimage(image)
+        tif.write_file(fn, compression=compression, strip_size=128)
+        del tif
+        atexit.register(os.remove, fn)
+        f = open(fn, 'rb')
+        content = f.read()
+        f.close()
+
+        for source in [content, bytearray(content), memoryview(content),
+                       io.BytesIO(content), open(fn, 'rb'), pathlib.Path(fn)]:
+            tif = TIFFfile(source)
+            arr = tif.get_tiff_array()
+            assert arr.shape == image.shape, repr(arr.shape)
+            assert (arr[:] == image).all(), repr(type(source))
+            assert (arr[1, 5] == image[1, 5]).all(), repr(type(source))
+            tif.close()
+
+def test_tag_tables():
+    from libtiff import tiff_data, tiff_tags
+    value2name, name2value, value2type = tiff_data.parse_tag_info(tiff_data.tag_info)
+    assert value2name == tiff_tags.tag_value2name
+    assert name2value == tiff_tags.tag_name2value
+    assert value2type == tiff_tags.tag_value2type
+    for value, name in value2name.items():
+        assert tiff_data.tag_value2name_table[value] == name
+
+def test_ifd_entry():
+    image = arange(3 * 20 * 10, dtype=uint16).reshape((3, 20, 10))
+    fn = mktemp('.tif')
+    TIFFimage(image, description='entry test').write_file(fn, strip_size=100, verbose=False)
+    tif = TIFFfile(fn)
+    ifd = tif.IFD[0]
+    assert not hasattr(ifd, '__dict__')
+    entry = ifd.get('StripOffsets')
+    assert not hasattr(entry, '__dict__')
+    assert entry.tag_name == 'StripOffsets' and entry.type_name == 'LONG', repr(entry.type_name)
+    assert entry.bytes == 4 and entry.tiff is tif
+    assert 'tag=StripOffsets' in str(entry)
+    assert 'entry test' in ifd.get('ImageDescription').human()
+    names = [name for start, end, name in entry.memory_usage]
+    assert names == ['StripOffsets'] + ['strip %s' % i for i in range(4)], repr(names)
+    assert tif.check_memory_usage(verbose=False)
+    starts, ends, names = tif.get_memory_usage(names=False)
+    assert names is None and starts.dtype == int64 and starts.shape == ends.shape
+    assert (ends >= starts).all()
+    assert len(tif.memory_usage) == starts.size
+    tif.close()
+    os.remove(fn)
+
+
+def test_get_contiguous():
+    image = random.randint(0, 100, size=(3, 8, 5)).astype(uint16)
+    fn = mktemp('.tif')
+    tif = TIFFimage(image)
+    tif.write_file(fn, compression='none')
+    del tif
+    atexit.register(os.remove, fn)
+    tif = TIFFfile(fn)
+    arr = tif.get_contiguous()
+    assert arr.shape == image.shape, repr(arr.shape)
+    assert (arr == image).all()
+    tif.close()
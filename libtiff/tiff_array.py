@@ -4,9 +4,12 @@
 # Created: Nov 2010
 
 
+import os
 import sys
 import numpy
 
+from . import instrument
+
 __all__ = ['TiffArray']
 
 class TiffArray:
@@ -20,14 +23,104 @@ class TiffArray:
         self.planes = []
         self.shape = ()
         self.dtype = None
+        self.access_pattern = None
+        self.readahead = 1
         list(map(self.append, planes))
 
     def __len__(self):
         return self.shape[0]
 
     def __iter__(self):
-        for plane in self.planes:
+        if self.access_pattern != 'sequential':
+            for plane in self.planes:
+                yield plane
+            return
+        nplanes = len(self.planes)
+        self._advise('willneed', list(range(min(nplanes, self.readahead))))
+        for i, plane in enumerate(self.planes):
+            if i + self.readahead < nplanes:
+                self._advise('willneed', [i + self.readahead])
             yield plane
+            self._advise('dontneed', [i])
+
+    def iter_images(self, direct=True, window_size=2 ** 26):
+        """ Iterate over the images of planes reading files sequentially
+        without filling the page cache.
+
+        File data is read in windows of window_size bytes into a
+        reusable aligned buffer with libtiff.direct_io.DirectReader.
+        Use it for long scans of stacks that are much larger than
+        memory. Planes of files that are not on disk are read as usual.
+
+        Parameters
+        ----------
+        direct : bool
+          When True then use direct I/O when supported, otherwise
+          read pages are released from the page cache after use.
+        window_size : int
+          Specify the number of bytes read at once.
+
+        Returns
+        -------
+        images : iterator
+          Yields a new array for each plane.
+        """
+        from .direct_io import DirectReader
+        readers = {}
+        try:
+            for i, plane in enumerate(self.planes):
+                r = self._get_file_pages([i])
+                reader = None
+                if r is not None:
+                    tiff, pages = r
+                    reader = readers.get(id(tiff))
+                    if reader is None and isinstance(tiff.filename, str) \
+                       and os.path.isfile(tiff.filename):
+                        reader = readers[id(tiff)] = DirectReader(tiff.filename, direct=direct)
+                if reader is None:
+                    yield numpy.array(plane.get_image())
+                    continue
+                table = tiff.get_strip_table()
+                rows = table.get_rows(pages)
+                if rows.size:
+                    start = int(table.offset[rows].min())
+                    stop = int(table.end[rows].max())
+                    if start < reader.start or stop > reader.stop:
+                        # read ahead the following planes
+                        reader.load(start, max(stop, min(start + window_size, reader.size)))
+                image = plane.get_image(data=reader)
+                if reader.buffer is not None and numpy.may_share_memory(image, reader.buffer):
+                    image = image.copy()
+                yield image
+        finally:
+            for reader in readers.values():
+                reader.close()
+
+    def set_access_pattern(self, pattern, readahead=1):
+        """ Give a hint about how the planes will be accessed.
+
+        Parameters
+        ----------
+        pattern : {None, 'normal', 'sequential', 'random'}
+          Specify access pattern of TIFF file data, see TIFFfile.advise.
+          When 'sequential', iterating over the tiff array hints the
+          upcoming planes as needed and the consumed planes as not
+          needed, so that long scans do not stall on page faults nor
+          fill the memory with pages that are not accessed again.
+        readahead : int
+          Specify the number of planes ahead of the current plane
+          that are hinted as needed.
+        """
+        self.access_pattern = pattern
+        self.readahead = readahead
+        tiffs = []
+        for plane in self.planes:
+            # lazy planes open their file on ifd access, skip these
+            ifd = plane.__dict__.get('ifd')
+            if ifd is not None and not any(ifd.tiff is tiff for tiff in tiffs):
+                tiffs.append(ifd.tiff)
+        for tiff in tiffs:
+            tiff.advise(pattern or 'normal')
 
     def __getitem__ (self, index):
         try:
@@ -38,8 +131,7 @@ class TiffArray:
             elif isinstance (index, slice):
                 indices = list(range(*index.indices(self.shape[0])))
                 r = numpy.empty((len(indices),)+self.shape[1:], dtype=self.dtype)
-                for i,j in enumerate(indices):
-                    r[i] = self.planes[j][()]
+                self._copy_planes(indices, r)
                 return r
             elif isinstance(index, tuple):
                 if len (index)==0:
@@ -51,11 +143,15 @@ class TiffArray:
                     return self.planes[index0][index[1:]]
                 elif isinstance (index0, slice):
                     indices = list(range(*index0.indices(self.shape[0])))
-                    for i,j in enumerate(indices):
-                        s = self.planes[j][index[1:]]
-                        if i==0:
-                            r = numpy.empty((len(indices),)+s.shape, dtype=self.dtype)
-                        r[i] = s
+                    self._prefetch(indices, index[1])
+                    with instrument.timer('copy'):
+                        for i,j in enumerate(indices):
+                            s = self.planes[j][index[1:]]
+                            if i==0:
+                                r = numpy.empty((len(indices),)+s.shape, dtype=self.dtype)
+                            r[i] = s
+                    if instrument.enabled:
+                        instrument.count('bytes_copied', r.nbytes)
                     return r
         except IOError as msg:
             sys.stderr.write('%s.__getitem__:\n%s\n' % (self.__class__.__name__, msg))
@@ -63,6 +159,220 @@ class TiffArray:
             return None
         raise NotImplementedError (repr(index))
 
+    def _copy_planes(self, indices, out):
+        """ Copy images of planes to out.
+        """
+        with instrument.timer('copy'):
+            if not self._read_planes(indices, out):
+                for i,j in enumerate(indices):
+                    out[i] = self.planes[j][()]
+        if instrument.enabled:
+            instrument.count('bytes_copied', out.nbytes)
+
+    def to_shared_memory(self, index=None, name=None):
+        """ Copy images of planes to shared memory.
+
+        Decoded planes are published once and attached without copying
+        by other processes, for instance, multiprocessing workers that
+        receive the returned stack as an argument.
+
+        Parameters
+        ----------
+        index : {None, slice}
+          Specify planes, by default all planes.
+        name : {None, str}
+          Specify shared memory block name, by default a unique name is
+          generated.
+
+        Returns
+        -------
+        stack : libtiff.shared_stack.SharedStack
+          Owner of the shared memory block. Call its close method, or
+          use it as a context manager, to free the block.
+
+        See also
+        --------
+        from_shared_memory
+        """
+        from .shared_stack import SharedStack
+        if index is None:
+            index = slice(None)
+        indices = list(range(*index.indices(self.shape[0])))
+        stack = SharedStack((len(indices),) + self.shape[1:], self.dtype, name=name)
+        try:
+            self._copy_planes(indices, stack.array)
+        except BaseException:
+            stack.close()
+            raise
+        return stack
+
+    @staticmethod
+    def from_shared_memory(name, shape, dtype):
+        """ Attach to a stack published with to_shared_memory.
+
+        Parameters
+        ----------
+        name : str
+          Specify name of shared memory block, see SharedStack.name.
+        shape : tuple
+        dtype : numpy.dtype
+
+        Returns
+        -------
+        stack : libtiff.shared_stack.SharedStack
+          Use its array attribute to access the images and close it
+          when done. Closing an attached stack does not free the block.
+        """
+        from .shared_stack import SharedStack
+        return SharedStack.attach(name, shape, dtype)
+
+    def _get_file_pages(self, indices):
+        """ Return TIFF file and IFD indices of planes when all planes
+        are from the same TIFF file, otherwise return None.
+        """
+        if not indices:
+            return None
+        tiff = None
+        pages = []
+        for j in indices:
+            # lazy planes open their file on ifd access, skip these
+            ifd = self.planes[j].__dict__.get('ifd')
+            if ifd is None or getattr(ifd, 'index', None) is None:
+                return None
+            if tiff is None:
+                tiff = ifd.tiff
+            elif ifd.tiff is not tiff:
+                return None
+            pages.append(ifd.index)
+        return tiff, pages
+
+    def _get_raw_layout(self, indices, plane_nbytes):
+        """ Return TIFF file, pages and layout of planes whose bytes
+        are stored as is, that is, uncompressed single sample images.
+        """
+        r = self._get_file_pages(indices)
+        if r is None:
+            return None
+        tiff, pages = r
+        for j in indices:
+            plane = self.planes[j]
+            if plane.compression != 1 or plane.samples_per_pixel != 1:
+                return None
+        layout = tiff.get_strip_table().get_layout(pages)
+        if layout.kind == 'arbitrary' or layout.nbytes != plane_nbytes:
+            return None
+        return tiff, pages, layout
+
+    def _read_planes(self, indices, out):
+        """ Read planes of the same TIFF file using its strip table.
+
+        When the planes are uncompressed and stored contiguously, they
+        are copied in one operation. When they are stored with a
+        constant stride in an in-memory or memory mapped file, they are
+        copied from a strided view. Otherwise the strips of all planes
+        are prefetched at once for lazy byte sources and False is
+        returned to let the caller read the planes one by one.
+
+        Returns
+        -------
+        done : bool
+          True when out has been filled.
+        """
+        r = self._get_raw_layout(indices, out.nbytes // max(1, len(indices)))
+        if r is not None:
+            tiff, pages, layout = r
+            data = tiff.data
+            target = out.reshape((len(pages), -1)).view(numpy.ubyte)
+            if layout.kind == 'contiguous':
+                target.reshape(-1)[:] = data[layout.start:layout.start + out.nbytes]
+                done = True
+            else:
+                view = self._get_strided_view(data, layout, len(pages))
+                done = view is not None
+                if done:
+                    target[:] = view
+            if done:
+                if instrument.enabled:
+                    instrument.count('strip_bytes', out.nbytes)
+                return True
+        self._prefetch(indices)
+        return False
+
+    def _prefetch(self, indices, row_index=None):
+        """ Let a lazy byte source read the strips of planes in few
+        coalesced requests, or hint these as needed to the kernel for
+        memory mapped files.
+
+        Parameters
+        ----------
+        indices : list
+          Specify plane indices.
+        row_index : {None, int, slice}
+          Specify image rows of planes, by default all rows. Only the
+          strips that contain the rows are read.
+        """
+        r = self._get_file_pages(indices)
+        if r is None:
+            return
+        tiff, pages = r
+        first, last = 0, None
+        if isinstance(row_index, (int, numpy.integer)):
+            row_index = slice(row_index, row_index + 1 or None)
+        if isinstance(row_index, slice):
+            start, stop, step = row_index.indices(self.shape[1])
+            plane = self.planes[indices[0]]
+            rows_per_strip = set(self.planes[j].rows_per_strip for j in indices)
+            if step > 0 and plane.samples_per_pixel == 1 and len(rows_per_strip) == 1:
+                if stop <= start:
+                    return
+                first, last = plane.get_strip_range(start, stop)
+        table = tiff.get_strip_table()
+        rows = table.get_rows(pages, first, last)
+        tiff.advise('willneed', table.offset[rows], table.end[rows])
+
+    def _advise(self, advice, indices):
+        r = self._get_file_pages(indices)
+        if r is None:
+            return
+        tiff, pages = r
+        table = tiff.get_strip_table()
+        rows = table.get_rows(pages)
+        if rows.size:
+            tiff.advise(advice, table.offset[rows], table.end[rows])
+
+    @staticmethod
+    def _get_strided_view(data, layout, count):
+        if not isinstance(data, numpy.ndarray):
+            return None
+        if layout.start + (count - 1) * layout.stride + layout.nbytes > data.size:
+            return None
+        return numpy.lib.stride_tricks.as_strided(
+            data[layout.start:], shape=(count, layout.nbytes),
+            strides=(layout.stride, 1), writeable=False)
+
+    def get_view(self):
+        """ Return array view of TIFF file data or None.
+
+        A view is available when all planes are uncompressed single
+        sample images of the same memory mapped or in-memory TIFF
+        file, stored contiguously or with a constant stride.
+
+        Returns
+        -------
+        view : {numpy.ndarray, None}
+          Read-only array with the shape and dtype of the tiff array.
+        """
+        indices = list(range(len(self.planes)))
+        plane_nbytes = int(numpy.prod(self.shape[1:])) * self.dtype.itemsize
+        r = self._get_raw_layout(indices, plane_nbytes)
+        if r is None:
+            return None
+        tiff, pages, layout = r
+        view = self._get_strided_view(tiff.data, layout, len(pages))
+        if view is None:
+            return None
+        return view.view(self.dtype).reshape(self.shape)
+
     def append(self, plane):
         """ Append tiff plane to tiff array.
         """
@@ -6,7 +6,7 @@ Defines data for TIFF manipulations.
 __all__ = ['type2name', 'name2type', 'type2bytes', 'type2dtype',
            'tag_value2name', 'tag_name2value', 'tag_value2type',
            'LittleEndianNumpyDTypes', 'BigEndianNumpyDTypes',
-           'default_tag_values', 'sample_format_map']
+           'default_tag_values', 'sample_format_map', 'tag_value2name_table']
 
 import numpy
 
@@ -211,19 +211,67 @@ type2dtype = {1:numpy.uint8, 2:numpy.uint8, 3:numpy.uint16, 4:numpy.uint32, 5:ra
               6:numpy.int8, 8:numpy.int16, 9:numpy.int32,10:srational,
               11:numpy.float32, 12:numpy.float64}
 
-tag_value2name = {}
-tag_name2value = {}
-tag_value2type = {}
-for line in tag_info.split('\n'):
-    if not line or line.startswith('#'): continue
-    if line[0]==' ':
-        pass
-    else:
-        n,h,t = line.split()[:3]
-        h = eval('0x'+h)
-        tag_value2name[h]=n
-        tag_value2type[h]=t
-        tag_name2value[n]=h
+def parse_tag_info(tag_info):
+    """ Parse tag_info text.
+
+    Returns
+    -------
+    tag_value2name, tag_name2value, tag_value2type : dict
+    """
+    tag_value2name = {}
+    tag_name2value = {}
+    tag_value2type = {}
+    for line in tag_info.split('\n'):
+        if not line or line.startswith('#'): continue
+        if line[0]==' ':
+            pass
+        else:
+            n,h,t = line.split()[:3]
+            h = int(h, 16)
+            tag_value2name[h]=n
+            tag_value2type[h]=t
+            tag_name2value[n]=h
+    return tag_value2name, tag_name2value, tag_value2type
+
+def write_tag_tables(filename=None):
+    """ Generate tiff_tags.py module from tag_info.
+
+    Run ``python -m libtiff.tiff_data`` after changing tag_info.
+    """
+    import os
+    if filename is None:
+        filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tiff_tags.py')
+    tables = parse_tag_info(tag_info)
+    l = ['"""',
+         'Tag tables generated from tiff_data.tag_info.',
+         '',
+         'Do not edit, run ``python -m libtiff.tiff_data`` to regenerate.',
+         '"""',
+         '',
+         "__all__ = ['tag_value2name', 'tag_name2value', 'tag_value2type']",
+         '']
+    for name, table in zip(['tag_value2name', 'tag_name2value', 'tag_value2type'], tables):
+        l.append('%s = {' % (name))
+        for key in sorted(table, key=lambda k: tables[1].get(k, k)):
+            l.append('    %r: %r,' % (key, table[key]))
+        l.append('}')
+        l.append('')
+    f = open(filename, 'w')
+    f.write('\n'.join(l))
+    f.close()
+    return filename
+
+try:
+    from .tiff_tags import tag_value2name, tag_name2value, tag_value2type
+except ImportError:
+    tag_value2name, tag_name2value, tag_value2type = parse_tag_info(tag_info)
+
+# tag_value2name as a list indexed by tag value, tag values are uint16.
+# Used in the IFD parsing hot path.
+tag_value2name_table = [None] * 65536
+for _value, _name in tag_value2name.items():
+    tag_value2name_table[_value] = _name
+del _value, _name
 
 sample_format_map = {1:'uint', 2:'int', 3:'float', None:'uint', 6:'complex'}
 
@@ -275,3 +323,6 @@ class BigEndianNumpyDTypes(NumpyDTypes):
         return dict((k,numpy.dtype(v).newbyteorder('>')) for k,v in list(type2dtype.items()))
 
 BigEndianNumpyDTypes = BigEndianNumpyDTypes()
+
+if __name__ == '__main__':
+    print('Wrote %s' % (write_tag_tables()))
@@ -14,20 +14,30 @@ import numpy
 import mmap
 from numpy.testing.utils import memusage
 from .tiff_data import type2name, name2type, type2bytes, type2dtype, \
-    tag_value2name, tag_name2value
+    tag_value2name, tag_name2value, tag_value2name_table
 from .tiff_data import LittleEndianNumpyDTypes, BigEndianNumpyDTypes, \
     default_tag_values, sample_format_map
 from .utils import bytes2str, isindisk
 from .tiff_base import TiffBase
 from .tiff_sample_plane import TiffSamplePlane
 from .tiff_array import TiffArray
+from .local_cache import LocalCache
+from .byte_source import ByteSource, FileSource, HTTPSource, coalesce_ranges
+from .strip_table import StripTable
 
 from . import lsm
+from . import instrument
+from .progress import get_progress
 import tif_lzw
 
 IFDEntry_init_hooks = []
 IFDEntry_finalize_hooks = []
 
+# advice -> name of mmap.madvise option, see TIFFfile.advise
+advice_names = dict(normal='MADV_NORMAL', sequential='MADV_SEQUENTIAL',
+                    random='MADV_RANDOM', willneed='MADV_WILLNEED',
+                    dontneed='MADV_DONTNEED')
+
 IOError_too_many_open_files_hint = '''%s
 ======================================================================
 Ubuntu Linux users:
@@ -55,7 +65,7 @@ class TIFFfile(TiffBase):
     Attributes
     ----------
     filename : str
-    data : memmap (or array when use_memmap is False)
+    data : memmap (or array when use_memmap is False, or FileSource when lazy)
     IFD : IFD-list
 
     See also
@@ -73,69 +83,120 @@ class TIFFfile(TiffBase):
             if self.use_memmap:
                 # self.data.base.close() # newer numpy does not have memmap.close anymore [May 2012]
                 pass
+            elif isinstance(self.data, ByteSource):
+                self.data.close()
             del self.data
+        cache_pin = self.__dict__.pop('_cache_pin', None)
+        if cache_pin is not None:
+            local_cache, filename = cache_pin
+            local_cache.release(filename)
 
     __del__ = close
 
     def __init__(self, filename, mode='r', first_byte=0, verbose=False,
-                 local_cache=None, use_memmap=True):
+                 local_cache=None, use_memmap=True, progress=None, lazy=False):
         """
-        local_cache : {None, str}
+        filename : {str, buffer, file-like object, ByteSource}
+          Specify TIFF file name or http(s) URL. Objects supporting
+          the buffer protocol (bytes, bytearray, memoryview, mmap) are
+          accessed without copying. Seekable file-like objects and
+          URLs are read lazily, only the accessed byte ranges are
+          read.
+        local_cache : {None, str, LocalCache}
           Specify path to local cache. Local cache will be used to
           temporarily store files from external devises such as NFS.
+        use_memmap : bool
+          When True then file is memory mapped, otherwise it is read
+          into memory.
+        lazy : bool
+          When True and use_memmap is False then file is read lazily
+          via FileSource: only the accessed byte ranges are read and
+          the strips of requested planes are read in few coalesced
+          requests. Use it for files on network filesystems or for
+          reading small parts of large files.
+        progress : {None, callable}
+          Specify callback of reading IFDs progress, see
+          libtiff.progress. When None and verbose is True, progress is
+          written to stdout.
         """
 
         self.verbose = verbose
         self.first_byte = first_byte
         self.use_memmap = use_memmap
-        try:
-            if local_cache is not None:
-                cache_filename = local_cache + '/' + filename
-                if os.path.exists(cache_filename):
-                    filename = cache_filename
-                elif not isindisk(filename):
-                    assert isindisk(local_cache), repr(local_cache)
-                    dirname = os.path.dirname(cache_filename)
-                    if not os.path.isdir(dirname):
-                        os.makedirs(dirname)
-                    shutil.copyfile(filename, cache_filename)
-                    filename = cache_filename
-            if verbose:
-                sys.stdout.write('Opening file %r\n' % (filename));
-                sys.stdout.flush()
+        if isinstance(filename, os.PathLike):
+            filename = os.fspath(filename)
+        if isinstance(filename, str) and filename.split('://', 1)[0] in ['http', 'https']:
+            filename = HTTPSource(filename)
+        if not isinstance(filename, str):
             if mode != 'r':
                 raise NotImplementedError(repr(mode))
-            if not os.path.isfile(filename):
-                raise ValueError('file does not exists')
-            if not os.stat(filename).st_size:
-                raise ValueError('file has zero size')
-            if use_memmap:
-                self.data = numpy.memmap(filename, dtype=numpy.ubyte,
-                                         mode=mode)
+            self.use_memmap = False
+            if isinstance(filename, ByteSource):
+                self.data = filename
+            elif hasattr(filename, 'read') and hasattr(filename, 'seek'):
+                self.data = FileSource(filename)
             else:
-                assert mode == 'r', repr(mode)
-                f = open(filename, 'rb')
-                self.data = numpy.frombuffer(f.read(), dtype=numpy.ubyte)
-                f.close()
-        except IOError as msg:
-            if 'Too many open files' in str(msg):
-                raise IOError(IOError_too_many_open_files_hint % msg)
-            if 'Operation not permitted' in str(msg):
-                raise IOError(OSError_operation_not_permitted_hint % msg)
-            raise
-        except OSError as msg:
-            if 'Operation not permitted' in str(msg):
-                raise OSError(OSError_operation_not_permitted_hint % msg)
-            raise
-        except mmap.error as msg:
-            if 'Too many open files' in str(msg):
-                raise mmap.error(IOError_too_many_open_files_hint % msg)
-            raise
+                self.data = numpy.frombuffer(filename, dtype=numpy.ubyte)
+            if not self.data.nbytes:
+                raise ValueError('file has zero size')
+            filename = getattr(filename, 'name', getattr(filename, 'url', '<%s>' % (
+                type(filename).__name__)))
+        else:
+            try:
+                if isinstance(local_cache, LocalCache):
+                    # the copy must not be evicted while the file is open
+                    cache_filename = local_cache.get(filename, pin=True)
+                    self._cache_pin = (local_cache, filename)
+                    filename = cache_filename
+                elif local_cache is not None:
+                    cache_filename = local_cache + '/' + filename
+                    if os.path.exists(cache_filename):
+                        filename = cache_filename
+                    elif not isindisk(filename):
+                        assert isindisk(local_cache), repr(local_cache)
+                        dirname = os.path.dirname(cache_filename)
+                        if not os.path.isdir(dirname):
+                            os.makedirs(dirname)
+                        shutil.copyfile(filename, cache_filename)
+                        filename = cache_filename
+                if verbose:
+                    sys.stdout.write('Opening file %r\n' % (filename));
+                    sys.stdout.flush()
+                if mode != 'r':
+                    raise NotImplementedError(repr(mode))
+                if not os.path.isfile(filename):
+                    raise ValueError('file does not exists')
+                if not os.stat(filename).st_size:
+                    raise ValueError('file has zero size')
+                if use_memmap:
+                    self.data = numpy.memmap(filename, dtype=numpy.ubyte,
+                                             mode=mode)
+                elif lazy:
+                    self.data = FileSource.open(filename)
+                else:
+                    assert mode == 'r', repr(mode)
+                    f = open(filename, 'rb')
+                    self.data = numpy.frombuffer(f.read(), dtype=numpy.ubyte)
+                    f.close()
+                    if instrument.enabled:
+                        instrument.count('bytes_read', self.data.nbytes)
+            except IOError as msg:
+                if 'Too many open files' in str(msg):
+                    raise IOError(IOError_too_many_open_files_hint % msg)
+                if 'Operation not permitted' in str(msg):
+                    raise IOError(OSError_operation_not_permitted_hint % msg)
+                raise
+            except OSError as msg:
+                if 'Operation not permitted' in str(msg):
+                    raise OSError(OSError_operation_not_permitted_hint % msg)
+                raise
+            except mmap.error as msg:
+                if 'Too many open files' in str(msg):
+                    raise mmap.error(IOError_too_many_open_files_hint % msg)
+                raise
 
         self.filename = filename
 
-        self.memory_usage = [(self.data.nbytes, self.data.nbytes, 'eof')]
-
         byteorder = \
         self.data[first_byte:first_byte + 2].view(dtype=numpy.uint16)[0]
 
@@ -152,38 +213,36 @@ class TIFFfile(TiffBase):
             raise ValueError('wrong magic number for TIFF file: %s' % (magic))
         self.IFD0 = IFD0 = first_byte + self.get_uint32(first_byte + 4)
 
-        self.memory_usage.append((first_byte, first_byte + 8, 'file header'))
-
-        n = self.get_uint16(IFD0)
-        IFD_list = []
-        IFD_offset = IFD0
-        while IFD_offset:
-            n = self.get_uint16(IFD_offset)
-            ifd = IFD(self)
-            exif_offset = 0
-            for i in range(n):
-                entry = IFDEntry(ifd, self, IFD_offset + 2 + i * 12)
-                ifd.append(entry)
-                if entry.tag == 0x8769:  # TIFFTAG_EXIFIFD
-                    exif_offset = entry.value
-            ifd.finalize()
-            IFD_list.append(ifd)
-            self.memory_usage.append((IFD_offset, IFD_offset + 2 + n * 12 + 4,
-                                      'IFD%s entries (%s)' % (
-                                      len(IFD_list), len(ifd))))
-            IFD_offset = self.get_uint32(IFD_offset + 2 + n * 12)
-            if IFD_offset == 0 and exif_offset != 0:
-                IFD_offset = exif_offset
+        progress = get_progress('Reading IFDs of %s' % (filename),
+                                progress=progress, verbose=verbose)
+        with instrument.timer('open'):
+            n = self.get_uint16(IFD0)
+            IFD_list = []
+            IFD_offset = IFD0
+            while IFD_offset:
+                n = self.get_uint16(IFD_offset)
+                ifd = IFD(self, offset=IFD_offset, index=len(IFD_list))
                 exif_offset = 0
-            if verbose:
-                sys.stdout.write(
-                    '\rIFD information read: %s..' % (len(IFD_list)));
-                sys.stdout.flush()
-
+                for i in range(n):
+                    entry = IFDEntry(ifd, self, IFD_offset + 2 + i * 12)
+                    ifd.append(entry)
+                    if entry.tag == 0x8769:  # TIFFTAG_EXIFIFD
+                        exif_offset = entry.value
+                ifd.finalize()
+                IFD_list.append(ifd)
+                IFD_offset = self.get_uint32(IFD_offset + 2 + n * 12)
+                if IFD_offset == 0 and exif_offset != 0:
+                    IFD_offset = exif_offset
+                    exif_offset = 0
+                if progress is not None:
+                    progress.update(nbytes=2 + n * 12 + 4)
+        if instrument.enabled:
+            instrument.count('ifds', len(IFD_list))
+            instrument.count('ifd_entries', sum(len(ifd) for ifd in IFD_list))
         self.IFD = IFD_list
-        if verbose:
-            sys.stdout.write(' done\n');
-            sys.stdout.flush()
+        self._strip_table = None
+        if progress is not None:
+            progress.finish()
 
         self.time = None
 
@@ -251,6 +310,50 @@ class TIFFfile(TiffBase):
         string = self.get_values(offset, 'BYTE', length).tostring()
         return string
 
+    def get_memory_usage(self, names=True):
+        """ Return byte ranges of TIFF fields and blocks.
+
+        The byte ranges are computed from IFDs on each call.
+
+        Parameters
+        ----------
+        names : bool
+          When False then range names are not computed.
+
+        Returns
+        -------
+        starts, ends : numpy.ndarray
+          Start and end offsets of byte ranges.
+        names : {numpy.ndarray, None}
+          Object array of range names.
+        """
+        first_byte = self.first_byte
+        size = self.data.nbytes
+        starts = [[size, first_byte]]
+        ends = [[size, first_byte + 8]]
+        name_lst = [['eof', 'file header']] if names else None
+        for index, ifd in enumerate(self.IFD):
+            if ifd.offset is not None:
+                starts.append([ifd.offset])
+                ends.append([ifd.offset + 2 + len(ifd) * 12 + 4])
+                if names:
+                    name_lst.append(['IFD%s entries (%s)' % (index + 1, len(ifd))])
+            for entry in ifd.entries:
+                entry._get_memory_usage(starts, ends, name_lst)
+        starts = numpy.concatenate(starts).astype(numpy.int64)
+        ends = numpy.concatenate(ends).astype(numpy.int64)
+        if names:
+            names = numpy.empty(starts.size, dtype=object)
+            names[:] = [name for l in name_lst for name in l]
+        else:
+            names = None
+        return starts, ends, names
+
+    @property
+    def memory_usage(self):
+        starts, ends, names = self.get_memory_usage()
+        return list(zip(starts.tolist(), ends.tolist(), names))
+
     def check_memory_usage(self, verbose=True):
         ''' Check memory usage of TIFF fields and blocks.
 
@@ -259,46 +362,103 @@ class TIFFfile(TiffBase):
         ok : bool
           Return False if unknown or overlapping memory areas have been detected.
         '''
-        l = []
-        l.extend(self.memory_usage)
-        for ifd in self.IFD:
-            l.extend(ifd.memory_usage)
-        l.sort()
-        last_end = None
-        ok = True
-        for start, end, resource in l:
-            if last_end:
-                if last_end != start:
-                    if verbose:
-                        print('--- unknown %s bytes' % (start - last_end))
-                    ok = False
-                    if start < last_end and verbose:
+        starts, ends, names = self.get_memory_usage(names=verbose)
+        order = numpy.lexsort((ends, starts))
+        starts, ends = starts[order], ends[order]
+        last_ends = ends[:-1]
+        unknown = (last_ends != 0) & (starts[1:] != last_ends)
+        if verbose:
+            names = names[order]
+            overlapping = unknown & (starts[1:] < last_ends)
+            for i in range(starts.size):
+                if i and unknown[i - 1]:
+                    print('--- unknown %s bytes' % (starts[i] - last_ends[i - 1]))
+                    if overlapping[i - 1]:
                         print('--- overlapping memory area')
-            if verbose:
                 print('%s..%s[%s] contains %s' % (
-                start, end, end - start, resource))
-            last_end = end
-        return ok
+                starts[i], ends[i], ends[i] - starts[i], names[i]))
+        return not unknown.any()
+
+    def get_strip_table(self):
+        """ Return strip table of all IFDs.
+
+        The table is created on the first call.
+
+        Returns
+        -------
+        table : libtiff.strip_table.StripTable
+        """
+        if self._strip_table is None:
+            self._strip_table = StripTable.from_ifds(self.IFD)
+        return self._strip_table
 
     def is_contiguous(self):
-        for i, ifd in enumerate(self.IFD):
-            strip_offsets = ifd.get('StripOffsets').value
-            strip_nbytes = ifd.get('StripByteCounts').value
-            if not ifd.is_contiguous():
+        """ Return True when the strips of all IFDs follow each other
+        without gaps.
+        """
+        return self.get_strip_table().is_contiguous()
+
+    def get_stack_layout(self):
+        """ Return the storage layout of the strips of all IFDs.
+
+        Returns
+        -------
+        layout : libtiff.strip_table.StackLayout
+          See StripTable.get_layout.
+        """
+        return self.get_strip_table().get_layout()
+
+    def advise(self, advice, starts=None, stops=None):
+        """ Give a hint about the access pattern of file data.
+
+        For memory mapped files the hint is passed to the kernel with
+        mmap.madvise. For lazy byte sources 'willneed' prefetches the
+        byte ranges. Otherwise hints are ignored.
+
+        Parameters
+        ----------
+        advice : {'normal', 'sequential', 'random', 'willneed', 'dontneed'}
+          Specify the expected access pattern. 'dontneed' drops the
+          pages of a memory mapped file from the process, data is
+          read again on the next access.
+        starts, stops : {None, array}
+          Specify byte ranges, by default the whole file. Ranges
+          are coalesced and aligned to page boundaries, 'dontneed'
+          applies only to pages that lie within the ranges.
+
+        Returns
+        -------
+        advised : bool
+          True when the hint was given.
+        """
+        if advice not in advice_names:
+            raise ValueError('unknown advice %r' % (advice,))
+        data = self.data
+        if starts is None:
+            starts, stops = [0], [data.nbytes]
+        if isinstance(data, ByteSource):
+            if advice != 'willneed':
                 return False
-            if i == 0:
-                pass
-            else:
-                if isinstance(strip_offsets, numpy.ndarray):
-                    start = strip_offsets[0]
-                else:
-                    start = strip_offsets
-                if end != start:
-                    return False
-            if isinstance(strip_offsets, numpy.ndarray):
-                end = strip_offsets[-1] + strip_nbytes[-1]
-            else:
-                end = strip_offsets + strip_nbytes
+            data.prefetch(starts, stops)
+            return True
+        mm = getattr(data, '_mmap', None)
+        option = getattr(mmap, advice_names[advice], None)
+        if not isinstance(mm, mmap.mmap) or option is None or not hasattr(mm, 'madvise'):
+            return False
+        pagesize = mmap.PAGESIZE
+        starts, stops = coalesce_ranges(starts, stops, pagesize)
+        if advice == 'dontneed':
+            # keep partial pages, these may hold data of neighbouring ranges
+            starts = starts + (-starts) % pagesize
+            stops = stops - stops % pagesize
+        else:
+            starts = starts - starts % pagesize
+        stops = numpy.minimum(stops, len(mm))
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            if stop > start:
+                mm.madvise(option, start, stop - start)
+        if instrument.enabled:
+            instrument.count('advice_calls', starts.size)
         return True
 
     def get_contiguous(self):
@@ -313,7 +473,7 @@ class TIFFfile(TiffBase):
         assert width == ifd1.get('ImageWidth').value
         assert length == ifd1.get('ImageLength').value
         depth = len(self.IFD)
-        compression = ifd.get('Compression').value
+        compression = ifd0.get('Compression').value
         if compression != 1:
             raise ValueError(
                 'Unable to get contiguous image stack from compressed data')
@@ -328,7 +488,7 @@ class TIFFfile(TiffBase):
         assert samples_per_pixel == 1, repr(samples_per_pixel)
 
         if isinstance(bits_per_sample, numpy.ndarray):
-            dtype = getattr(self.dtypes, 'uint%s' % (bits_per_sample[i]))
+            dtype = getattr(self.dtypes, 'uint%s' % (bits_per_sample[0]))
         else:
             dtype = getattr(self.dtypes, 'uint%s' % (bits_per_sample))
 
@@ -339,7 +499,7 @@ class TIFFfile(TiffBase):
             start = strip_offsets0
             end = strip_offsets1 + strip_nbytes1
         return self.data[start:end].view(dtype=dtype).reshape(
-            (depth, width, length))
+            (depth, length, width))
 
     def get_subfile_types(self):
         """ Return a list of subfile types.
@@ -707,10 +867,18 @@ class IFD:
     Attributes
     ----------
     entries : IFDEntry-list
+    offset : {None, int}
+      offset of IFD in tiff data array
+    index : {None, int}
+      index of IFD in tiff.IFD
     """
 
-    def __init__(self, tiff):
+    __slots__ = ('tiff', 'offset', 'index', 'entries', 'entries_dict')
+
+    def __init__(self, tiff, offset=None, index=None):
         self.tiff = tiff
+        self.offset = offset
+        self.index = index
         self.entries = []
         self.entries_dict = {}
 
@@ -719,7 +887,7 @@ class IFD:
 
     def append(self, entry):
         self.entries.append(entry)
-        self.entries_dict[getattr(entry, 'tag_name', id(entry))] = entry
+        self.entries_dict[entry.tag_name] = entry
 
     def close(self):
         for entry in self.entries:
@@ -860,12 +1028,15 @@ class IFD:
                 hook(entry)
 
     def is_contiguous(self):
+        """ Return True when the strips of IFD follow each other without
+        gaps.
+        """
+        if self.index is not None:
+            return bool(self.tiff.get_strip_table().page_contiguous[self.index])
         strip_offsets = self.get('StripOffsets').value
         strip_nbytes = self.get('StripByteCounts').value
         if isinstance(strip_offsets, numpy.ndarray):
-            for i in range(len(strip_offsets) - 1):
-                if strip_offsets[i] + strip_nbytes[i] != strip_offsets[i + 1]:
-                    return False
+            return not (strip_offsets[1:] != strip_offsets[:-1] + strip_nbytes[:-1]).any()
         return True
 
     def get_contiguous(self, channel_name=None):
@@ -1016,12 +1187,20 @@ class IFDEntry:
     bytes : int
       number of bytes in data array
     memory_usage : list of 3-tuples
-      (start byte, end byte, name of tag)
+      (start byte, end byte, name of tag), computed on access
+
+    Notes
+    -----
+    IFDEntry uses __slots__ to keep files with many IFDs small in
+    memory. tag_name, type_name, bytes and memory_usage are computed
+    on access.
     """
 
+    __slots__ = ('ifd', 'offset', 'tag', 'type', 'count', 'value',
+                 'str_hook', 'block_range', 'value_str', '_memory_usage')
+
     def __init__(self, ifd, tiff, offset):
         self.ifd = ifd
-        self.tiff = tiff
         self.offset = offset
 
         # initialization:
@@ -1032,7 +1211,7 @@ class IFDEntry:
         for hook in IFDEntry_init_hooks:
             hook(self)
 
-        self.bytes = bytes = type2bytes.get(self.type, 0)
+        bytes = type2bytes.get(self.type, 0)
         if self.count == 1 and 1 <= bytes <= 4:
             self.offset = None
             value = tiff.get_value(offset + 8, self.type)
@@ -1041,17 +1220,66 @@ class IFDEntry:
             value = tiff.get_values(self.offset, self.type, self.count)
         if value is not None:
             self.value = value
-        tag_name = self.tag_name = tag_value2name.get(self.tag, 'TAG%s' % (
-        hex(self.tag),))
 
-        self.type_name = type2name.get(self.type, 'TYPE%s' % (self.type,))
+    @property
+    def tiff(self):
+        return self.ifd.tiff
+
+    @property
+    def tag_name(self):
+        return tag_value2name_table[self.tag] or 'TAG%s' % (hex(self.tag),)
 
-        self.memory_usage = []
+    @property
+    def type_name(self):
+        return type2name.get(self.type, 'TYPE%s' % (self.type,))
 
+    @property
+    def bytes(self):
+        return type2bytes.get(self.type, 0)
+
+    @property
+    def memory_usage(self):
+        starts, ends, names = [], [], []
+        self._get_memory_usage(starts, ends, names)
+        if not starts:
+            return []
+        starts = numpy.concatenate(starts).astype(numpy.int64).tolist()
+        ends = numpy.concatenate(ends).astype(numpy.int64).tolist()
+        return list(zip(starts, ends, [name for l in names for name in l]))
+
+    def _get_memory_usage(self, starts, ends, names=None):
+        """ Append byte ranges of the entry data to lists.
+        """
         if self.offset is not None:
-            self.memory_usage.append((self.offset,
-                                      self.offset + self.bytes * self.count,
-                                      self.tag_name))
+            starts.append([self.offset])
+            ends.append([self.offset + self.bytes * self.count])
+            if names is not None:
+                names.append([self.tag_name])
+        if self.tag == 0x111:  # StripOffsets
+            counts = self.ifd.get('StripByteCounts')
+            if counts is not None:
+                offsets = numpy.atleast_1d(self.value).astype(numpy.int64)
+                starts.append(offsets)
+                ends.append(offsets + numpy.atleast_1d(counts.value))
+                if names is not None:
+                    if self.offset is not None:
+                        names.append(['strip %s' % (i) for i in range(offsets.size)])
+                    else:
+                        names.append(['strip'])
+        extra = getattr(self, '_memory_usage', None)
+        if extra:
+            starts.append([start for start, end, name in extra])
+            ends.append([end for start, end, name in extra])
+            if names is not None:
+                names.append([name for start, end, name in extra])
+
+    def add_memory_usage(self, start, end, name):
+        """ Record a byte range that is used by the entry data.
+        """
+        try:
+            self._memory_usage.append((start, end, name))
+        except AttributeError:
+            self._memory_usage = [(start, end, name)]
 
     def close(self):
         del self.value
@@ -1062,10 +1290,17 @@ class IFDEntry:
         value = self.value
         if value is not None:
             if tag_name in ['ImageDescription', 'Software']:
-                return ''.join(
-                    value.view('|S%s' % (value.nbytes // value.size)))
+                return b''.join(
+                    value.view('|S%s' % (value.nbytes // value.size))).decode('latin-1')
         return value
 
+    def _get_str_dict(self):
+        d = dict(tag_name=self.tag_name, type_name=self.type_name,
+                 count=self.count, offset=self.offset)
+        if hasattr(self, 'value'):
+            d['value'] = self.value
+        return d
+
     def __str__(self):
         if hasattr(self, 'str_hook'):
             r = self.str_hook(self)
@@ -1073,10 +1308,10 @@ class IFDEntry:
                 return r
         if hasattr(self, 'value'):
             return 'IFDEntry(tag=%(tag_name)s, value=%(value)r, count=%(count)s, offset=%(offset)s)' % (
-            self.__dict__)
+            self._get_str_dict())
         else:
             return 'IFDEntry(tag=%(tag_name)s, type=%(type_name)s, count=%(count)s, offset=%(offset)s)' % (
-            self.__dict__)
+            self._get_str_dict())
 
     def human(self):
         if hasattr(self, 'str_hook'):
@@ -1085,38 +1320,21 @@ class IFDEntry:
                 return r
         if hasattr(self, 'value'):
             self.value_str = self._value_str
+            d = self._get_str_dict()
+            d['value_str'] = self.value_str
             if self.tag_name == 'ImageDescription':
                 return 'IFDEntry(tag=%(tag_name)s, value="%(value_str)s", count=%(count)s, offset=%(offset)s)' % (
-                self.__dict__)
+                d)
             else:
                 return 'IFDEntry(tag=%(tag_name)s, value=%(value_str)r, count=%(count)s, offset=%(offset)s)' % (
-                self.__dict__)
+                d)
         else:
             return 'IFDEntry(tag=%(tag_name)s, type=%(type_name)s, count=%(count)s, offset=%(offset)s)' % (
-            self.__dict__)
+            self._get_str_dict())
 
     def __repr__(self):
         return '%s(%r, %r)' % (self.__class__.__name__, self.tiff, self.offset)
 
 
-def StripOffsets_hook(ifdentry):
-    if ifdentry.tag_name == 'StripOffsets':
-        ifd = ifdentry.ifd
-        counts = ifd.get('StripByteCounts')
-        if ifdentry.offset is not None:
-            for i, (count, offset) in enumerate(
-                    zip(counts.value, ifdentry.value)):
-                ifdentry.memory_usage.append(
-                    (offset, offset + count, 'strip %s' % (i)))
-        else:
-            offset = ifdentry.value
-            ifdentry.memory_usage.append(
-                (offset, offset + counts.value, 'strip'))
-
-
-# todo: TileOffsets_hook
-
-IFDEntry_finalize_hooks.append(StripOffsets_hook)
-
 # Register CZ LSM support:
 lsm.register(locals())
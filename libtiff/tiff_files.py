@@ -1,12 +1,12 @@
 
 __all__ = ['TiffFiles']
 
-import time
-
 from .tiff_file import TiffFile
 from .tiff_array import TiffArray
 from .tiff_sample_plane import TiffSamplePlane, TiffSamplePlaneLazy
 from .tiff_base import TiffBase
+from .local_cache import LocalCache
+from .progress import get_progress
 
 class TiffFiles(TiffBase):
     """Represent a collection of TIFF files as a single TIFF source object.
@@ -16,7 +16,8 @@ class TiffFiles(TiffBase):
     TiffFile, TiffChannelsAndFiles
     """
 
-    def __init__(self, files, time_map = {}, verbose = False, local_cache = None):
+    def __init__(self, files, time_map = {}, verbose = False, local_cache = None,
+                 prefetch = 0):
         """
         Parameters
         ----------
@@ -27,25 +28,37 @@ class TiffFiles(TiffBase):
           corresponding to image file directories (IFDs) in the
           corresponding TIFF files.
         verbose : bool
-        local_cache : {None, str}
+        local_cache : {None, str, LocalCache}
           Specify path to local cache. Local cache will be used to
           temporarily store files from external devises such as NFS.
+        prefetch : int
+          Specify the number of next files that are copied to local
+          cache in background when a file is opened.
         """
         self.verbose = verbose
         self.files = files
         self.tiff_files = {}
         self.time_map = time_map
+        self.own_local_cache = bool(prefetch) and isinstance(local_cache, str)
+        if self.own_local_cache:
+            local_cache = LocalCache(local_cache, verbose=verbose)
         self.local_cache = local_cache
+        self.prefetch = prefetch
+        self.file_index = dict((filename, index) for index, filename in enumerate(files))
 
     def get_tiff_file(self, filename, use_memmap=True):
         tiff = self.tiff_files.get(filename)
         if tiff is None:
+            if self.prefetch and isinstance(self.local_cache, LocalCache):
+                index = self.file_index[filename]
+                self.local_cache.prefetch(self.files[index+1:index+1+self.prefetch])
             tiff = TiffFile(filename, verbose=self.verbose, local_cache = self.local_cache, use_memmap=use_memmap)
             #tiff.set_time(self.time_map.get(filename))
             self.tiff_files[filename] = tiff
         return tiff
 
-    def get_tiff_array(self, sample_index = 0, subfile_type=0, assume_one_image_per_file=False, use_memmap=True):
+    def get_tiff_array(self, sample_index = 0, subfile_type=0, assume_one_image_per_file=False, use_memmap=True,
+                       progress=None):
         """ Return an array of images.
 
         Parameters
@@ -63,15 +76,20 @@ class TiffFiles(TiffBase):
           accessed.
         use_memap : bool
           When True then image data is read in using numpy.memmap.
+        progress : {None, callable}
+          Specify callback of opening files progress, see
+          libtiff.progress. When None and verbose is True, progress is
+          written to stdout.
 
         Returns
         -------
         tiff_array : TiffArray
           Array of sample images. The array has rank equal to 3.
         """
-        start = time.time ()
         planes = []
-        
+        progress = get_progress('%s.get_tiff_array' % (self.__class__.__name__),
+                                progress=progress, verbose=self.verbose, total=len(self.files))
+
         if assume_one_image_per_file:
             for index, filename in enumerate (self.files):
                 time_lst = self.time_map.get(filename)
@@ -92,7 +110,9 @@ class TiffFiles(TiffBase):
                 if time_lst is not None:
                     assert len (time_lst)==1,repr(len(time_lst))
                     plane.set_time(time_lst[0])
-                planes.append(plane)                    
+                planes.append(plane)
+                if progress is not None:
+                    progress.update()
         else:
             for filename in self.files:
                 tiff = self.get_tiff_file(filename, use_memmap=use_memmap)
@@ -106,16 +126,20 @@ class TiffFiles(TiffBase):
                         plane.set_time(time_lst[index])
                     planes.append(plane)
                     index += 1
+                if progress is not None:
+                    progress.update()
 
         tiff_array = TiffArray(planes)
-        if self.verbose:
-            print('%s.get_tiff_array: took %ss' % (self.__class__.__name__, time.time ()-start))
+        if progress is not None:
+            progress.finish()
         return tiff_array
 
     def close (self):
         for tiff in list(self.tiff_files.values()):
             tiff.close()
         self.tiff_files.clear()
+        if getattr(self, 'own_local_cache', False):
+            self.local_cache.close()
 
     __del__ = close
 
@@ -7,10 +7,11 @@ Provides TIFFimage class.
 
 import os
 import sys
-import time
 import numpy
 import tif_lzw
 
+from . import instrument
+from .progress import get_progress
 from .utils import bytes2str
 from .tiff_data import tag_name2value, tag_value2type, tag_value2name, \
     name2type, type2bytes, type2dtype
@@ -179,7 +180,7 @@ class TIFFimage:
     # noinspection PyProtectedMember
     def write_file(self, filename, compression='none',
                    strip_size=2 ** 13, planar_config=1,
-                   validate=False, verbose=None):
+                   validate=False, verbose=None, progress=None):
         """
         Write image data to TIFF file.
 
@@ -195,6 +196,10 @@ class TIFFimage:
         verbose : {bool, None}
           When True then write progress information to stdout. When None
           then verbose is assumed for data that has size over 1MB.
+        progress : {None, callable}
+          Specify callback of creating records and writing images
+          progress, see libtiff.progress. When None and verbose is
+          True, progress is written to stdout.
 
         Returns
         -------
@@ -230,11 +235,9 @@ class TIFFimage:
         total_size = 8
         data_size = 0
         image_data_size = 0
+        records_progress = get_progress('  creating records', progress=progress,
+                                        verbose=verbose, total=len(self.data))
         for i, image in enumerate(self.data):
-            if verbose:
-                sys.stdout.write('\r  creating records: %5s%% done  ' % (
-                    int(100.0 * i / len(self.data))))
-                sys.stdout.flush()
             if image.dtype.kind == 'V' and len(
                     image.dtype.names) == 3:  # RGB image
                 sample_format = dict(u=1, i=2, f=3, c=6).get(
@@ -317,6 +320,10 @@ class TIFFimage:
             strip_info = strip_offsets, strip_byte_counts, strips_per_image,\
                 rows_per_strip, bytes_per_row
             image_directories.append((entries, strip_info, image))
+            if records_progress is not None:
+                records_progress.update()
+        if records_progress is not None:
+            records_progress.finish()
 
         tif = numpy.memmap(filename, dtype=numpy.ubyte, mode='w+',
                            shape=(total_size,))
@@ -354,8 +361,9 @@ class TIFFimage:
         image_data_offset = total_size - image_data_size
         first_data_offset = data_offset
         first_image_data_offset = image_data_offset
-        start_time = time.time()
         compressed_data_size = 0
+        write_progress = get_progress('  filling records', progress=progress,
+                                      verbose=verbose, total=len(image_directories))
         for i, (entries, strip_info, image) in enumerate(image_directories):
             strip_offsets, strip_byte_counts, strips_per_image, rows_per_strip, bytes_per_row = strip_info
 
@@ -375,7 +383,8 @@ class TIFFimage:
                 assert c > 0, repr(c)
                 orig_strip = data[k:k + c]  # type: numpy.ndarray
 
-                strip = compress(orig_strip)
+                with instrument.timer('encode'):
+                    strip = compress(orig_strip)
                 if validate:
                     test_strip = decompress(strip, orig_strip.nbytes)
                     if (orig_strip != test_strip).any():
@@ -388,8 +397,13 @@ class TIFFimage:
                 strip_offsets.add_value(image_data_offset)
                 strip_byte_counts.add_value(strip.nbytes)
 
-                tif = tif_write(tif, image_data_offset, strip)
+                with instrument.timer('write'):
+                    tif = tif_write(tif, image_data_offset, strip)
                 image_data_offset += strip.nbytes
+                if instrument.enabled:
+                    instrument.count('strips_encoded')
+                    instrument.count('bytes_encoded', orig_strip.nbytes)
+                    instrument.count('bytes_written', strip.nbytes)
                 # if j == 0:
                 #     first = strip_offsets[0]
                 # last = strip_offsets[-1] + strip_byte_counts[-1]
@@ -417,16 +431,11 @@ class TIFFimage:
             assert offset <= first_data_offset, repr(
                 (offset, first_data_offset))
 
-            if verbose:
-                sys.stdout.write(
-                    '\r  filling records: %5s%% done (%s/s)%s' %
-                    (int(100.0 * (i + 1) / len(image_directories)),
-                     bytes2str(int((image_data_offset -
-                                    first_image_data_offset) /
-                                   (time.time() - start_time))), ' ' * 2))
-                if (i + 1) == len(image_directories):
-                    sys.stdout.write('\n')
-                sys.stdout.flush()
+            if write_progress is not None:
+                write_progress.update(nbytes=image.nbytes)
+
+        if write_progress is not None:
+            write_progress.finish()
 
         # last offset must be 0
         tif[offset - 4:offset].view(dtype=numpy.uint32)[0] = 0
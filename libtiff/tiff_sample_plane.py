@@ -7,6 +7,8 @@
 import numpy
 import tif_lzw
 
+from . import instrument
+
 __all__ = ['TiffSamplePlane']
 
 def set_array(output_array, input_array):
@@ -26,6 +28,10 @@ class TiffSamplePlane:
         sample_index : int
           Specify sample index. When None then interpret pixel as a sample.
         """
+        if ifd.get('TileOffsets') is not None:
+            raise NotImplementedError('tiled images are not supported, use libtiff.TIFF to read these')
+        if ifd.get('StripOffsets') is None:
+            raise ValueError('image file directory has no StripOffsets')
         self.ifd = ifd
         self.sample_index = sample_index
 
@@ -45,8 +51,14 @@ class TiffSamplePlane:
         rows_per_strip = min(rows_of_pixels, rows_per_strip)
         self.rows_per_strip = rows_per_strip
 
-        self.strip_offsets = strip_offsets = ifd.get_value('StripOffsets')
-        self.strip_nbytes = strip_nbytes = ifd.get_value('StripByteCounts')
+        if getattr(ifd, 'index', None) is not None:
+            # views to the strip table of the file
+            strip_offsets, strip_nbytes = ifd.tiff.get_strip_table().get_page(ifd.index)
+        else:
+            strip_offsets = ifd.get_value('StripOffsets')
+            strip_nbytes = ifd.get_value('StripByteCounts')
+        self.strip_offsets = strip_offsets
+        self.strip_nbytes = strip_nbytes
         self.sample_format = sample_format = ifd.get_value('SampleFormat')
         self.bits_per_sample = bits_per_sample = ifd.get_value('BitsPerSample')
 
@@ -131,6 +143,35 @@ strips_per_image=%(strips_per_image)s
 rows_per_strip=%(rows_per_strip)s
 ''' % (self.__dict__)
 
+    def get_strip(self, strip_index, data=None):
+        """ Return decoded strip as ubyte array.
+
+        data is an optional array-like holding the file data, by
+        default the data of the TIFF file.
+        """
+        start = self.strip_offsets[strip_index]
+        stop = start +  self.strip_nbytes[strip_index]
+        if data is None:
+            data = self.ifd.tiff.data
+        if self.compression==1:
+            strip = data[start:stop]
+            if instrument.enabled:
+                instrument.count('strips_read')
+                instrument.count('strip_bytes', strip.nbytes)
+            return strip
+        if self.compression!=5: # lzw
+            raise NotImplementedError (repr(self.compression))
+        if not instrument.enabled:
+            return tif_lzw.decode(data[start:stop], self.uncompressed_bytes_per_strip)
+        compressed_strip = data[start:stop]
+        with instrument.timer('decode'):
+            strip = tif_lzw.decode(compressed_strip, self.uncompressed_bytes_per_strip)
+        instrument.count('strips_read')
+        instrument.count('strips_decoded')
+        instrument.count('strip_bytes', compressed_strip.nbytes)
+        instrument.count('bytes_decoded', strip.nbytes)
+        return strip
+
     def get_row(self, index, subindex = None):
         if index < 0:
             index += self.shape[0]
@@ -143,16 +184,7 @@ rows_per_strip=%(rows_per_strip)s
             index2 = self.sample_index * self.shape[0] + index
             strip_index, row_index = divmod(index2, self.rows_per_strip)
 
-        start = self.strip_offsets[strip_index]
-        stop = start +  self.strip_nbytes[strip_index]
-        if self.compression==1:
-            strip = self.ifd.tiff.data[start:stop]
-        else:
-            compressed_strip = self.ifd.tiff.data[start:stop]
-            if self.compression==5: # lzw
-                strip = tif_lzw.decode(compressed_strip, self.uncompressed_bytes_per_strip)
-            else:
-                raise NotImplementedError (repr(self.compression))
+        strip = self.get_strip(strip_index)
 
         start = row_index * self.bytes_per_sample_row + self.sample_offset
         stop = start + self.bytes_per_sample_row + self.sample_offset
@@ -192,13 +224,57 @@ rows_per_strip=%(rows_per_strip)s
                 return self[index[0]]
         raise NotImplementedError (repr(index))
 
-    def get_image(self):
+    def get_strip_range(self, start, stop):
+        """ Return the range first:last of strips that contain image
+        rows start:stop.
+        """
+        return start // self.rows_per_strip, (stop - 1) // self.rows_per_strip + 1
+
+    def get_row_range(self, start, stop):
+        """ Return image rows start:stop as an array.
+
+        Only the strips that contain the rows are read and decoded.
+        Requires single sample images.
+        """
+        assert self.samples_per_pixel == 1, repr(self.samples_per_pixel)
+        if stop <= start:
+            return numpy.empty((0, self.shape[1]), dtype=self.dtype)
+        first, last = self.get_strip_range(start, stop)
+        row0 = first * self.rows_per_strip
+        nrows = min(last * self.rows_per_strip, self.shape[0]) - row0
+        rows = numpy.empty((nrows * self.bytes_per_sample_row,), dtype=numpy.uint8)
+        data = self.ifd.tiff.data
+        if hasattr(data, 'prefetch'):
+            data.prefetch(self.strip_offsets[first:last],
+                          self.strip_offsets[first:last] + self.strip_nbytes[first:last])
+        offset = 0
+        for strip_index in range(first, last):
+            strip = self.get_strip(strip_index)
+            n = min(strip.nbytes, rows.nbytes - offset)
+            rows[offset:offset + n] = strip[:n]
+            offset += n
+        if instrument.enabled:
+            instrument.count('bytes_copied', rows.nbytes)
+        rows = rows.view(dtype=self.dtype).reshape((nrows, self.shape[1]))
+        return rows[start - row0:stop - row0]
+
+    def get_image(self, data=None):
+        """ Return image as an array.
+
+        data is an optional array-like holding the file data, by
+        default the data of the TIFF file. Contiguous images are views
+        to data.
+        """
+        if data is None:
+            data = self.ifd.tiff.data
         if self.is_contiguous:
             if self.planar_config==1:
                 start = self.strip_offsets[0] + self.sample_offset
                 stop = self.strip_offsets[-1] + self.strip_nbytes[-1]
-                image =self.ifd.tiff.data[start:stop].view(dtype=self.pixel_dtype)
+                image = data[start:stop].view(dtype=self.pixel_dtype)
                 image = image[self.sample_name].reshape (self.shape)
+                if instrument.enabled:
+                    instrument.count('strip_bytes', stop - start)
                 return image
             else:
                 if self.sample_index is None:
@@ -206,28 +282,26 @@ rows_per_strip=%(rows_per_strip)s
                 else:
                     start = self.strip_offsets[0] + self.sample_index * self.bytes_per_sample_image
                 stop = start + self.bytes_per_sample_image
-                image = self.ifd.tiff.data[start:stop]
+                image = data[start:stop]
                 image = image.view(dtype=self.dtype).reshape(self.shape)
+                if instrument.enabled:
+                    instrument.count('strip_bytes', image.nbytes)
                 return image
         else:
             image = numpy.empty((self.bytes_per_sample_image,), dtype=numpy.uint8)
             offset = 0
+            if hasattr(data, 'prefetch'):
+                # let lazy byte sources read all strips in few requests
+                data.prefetch(self.strip_offsets, self.strip_offsets + self.strip_nbytes)
             for strip_index in range (len (self.strip_offsets)):
-                start = self.strip_offsets[strip_index]
-                stop = start +  self.strip_nbytes[strip_index]            
-                if self.compression==1:
-                    strip = self.ifd.tiff.data[start:stop]
-                else:
-                    compressed_strip = self.ifd.tiff.data[start:stop]
-                    if self.compression==5: # lzw
-                        strip = tif_lzw.decode(compressed_strip, self.uncompressed_bytes_per_strip)
-                    else:
-                        raise NotImplementedError (repr(self.compression))
+                strip = self.get_strip(strip_index, data)
                 target = image[offset:offset + strip.nbytes]
                 if target.nbytes < strip.nbytes:
                     print('%s.get_image warning: tiff data contains %s extra bytes (compression=%r) that are ignored' % (self.__class__.__name__, strip.nbytes-target.nbytes, self.compression))
                 image[offset:offset + strip.nbytes] = strip[:target.nbytes]
                 offset += strip.nbytes
+            if instrument.enabled:
+                instrument.count('bytes_copied', image.nbytes)
             image = image.view(dtype=self.dtype).reshape(self.shape)
             return image
 
@@ -238,7 +312,7 @@ rows_per_strip=%(rows_per_strip)s
         if isinstance (index, int):
             return self.get_row(index)
         elif isinstance(index, slice):
-            return self.get_image()[index]
+            return self._get_region(index, ())
         elif isinstance(index, tuple):
             if len(index)==0:
                 return self.get_image()
@@ -247,9 +321,22 @@ rows_per_strip=%(rows_per_strip)s
             index0 = index[0]
             if isinstance(index0, int):
                 return self.get_row(index0, index[1:])
+            if isinstance(index0, slice):
+                return self._get_region(index0, index[1:])
             return self.get_image()[index]
         raise NotImplementedError (repr(index))
 
+    def _get_region(self, index0, subindex):
+        # contiguous images of in-memory or memory mapped files are views
+        if self.samples_per_pixel != 1 or (self.is_contiguous and isinstance(
+                self.ifd.tiff.data, numpy.ndarray)):
+            return self.get_image()[(index0,) + subindex]
+        start, stop, step = index0.indices(self.shape[0])
+        if step < 0:
+            return self.get_image()[(index0,) + subindex]
+        rows = self.get_row_range(start, max(start, stop))
+        return rows[(slice(None, None, step),) + subindex]
+
 class TiffSamplePlaneLazy(TiffSamplePlane):
 
     def __init__ (self, tiff_file_getter):
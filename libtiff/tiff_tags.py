@@ -0,0 +1,412 @@
+"""
+Tag tables generated from tiff_data.tag_info.
+
+Do not edit, run ``python -m libtiff.tiff_data`` to regenerate.
+"""
+
+__all__ = ['tag_value2name', 'tag_name2value', 'tag_value2type']
+
+tag_value2name = {
+    254: 'NewSubfileType',
+    255: 'SubfileType',
+    256: 'ImageWidth',
+    257: 'ImageLength',
+    258: 'BitsPerSample',
+    259: 'Compression',
+    262: 'PhotometricInterpretation',
+    263: 'Threshholding',
+    264: 'CellWidth',
+    265: 'CellLength',
+    266: 'FillOrder',
+    269: 'DocumentName',
+    270: 'ImageDescription',
+    271: 'Make',
+    272: 'Model',
+    273: 'StripOffsets',
+    274: 'Orientation',
+    277: 'SamplesPerPixel',
+    278: 'RowsPerStrip',
+    279: 'StripByteCounts',
+    280: 'MinSampleValue',
+    281: 'MaxSampleValue',
+    282: 'XResolution',
+    283: 'YResolution',
+    284: 'PlanarConfiguration',
+    285: 'PageName',
+    286: 'XPosition',
+    287: 'YPosition',
+    288: 'FreeOffsets',
+    289: 'FreeByteCounts',
+    290: 'GrayResponseUnit',
+    291: 'GrayResponseCurve',
+    292: 'T4Options',
+    293: 'T6Options',
+    296: 'ResolutionUnit',
+    297: 'PageNumber',
+    301: 'TransferFunction',
+    305: 'Software',
+    306: 'DateTime',
+    315: 'Artist',
+    316: 'HostComputer',
+    317: 'Predictor',
+    318: 'WhitePoint',
+    319: 'PrimaryChromaticities',
+    320: 'ColorMap',
+    321: 'HalftoneHints',
+    322: 'TileWidth',
+    323: 'TileLength',
+    324: 'TileOffsets',
+    325: 'TileByteCounts',
+    332: 'InkSet',
+    333: 'InkNames',
+    334: 'NumberOfInks',
+    336: 'DotRange',
+    337: 'TargetPrinter',
+    338: 'ExtraSamples',
+    339: 'SampleFormat',
+    340: 'SMinSampleValue',
+    341: 'SMaxSampleValue',
+    342: 'TransferRange',
+    512: 'JPEGProc',
+    513: 'JPEGInterchangeFormat',
+    514: 'JPEGInterchangeFormatLength',
+    515: 'JPEGRestartInterval',
+    517: 'JPEGLosslessPredictos',
+    518: 'JPEGPointTransforms',
+    519: 'JPEGQTables',
+    520: 'JPEGDCTables',
+    521: 'JPEGACTables',
+    529: 'YCbCrCoefficients',
+    530: 'YCbCrSubSampling',
+    531: 'YCbCrPositioning',
+    532: 'ReferenceBlackWhite',
+    33432: 'Copyright',
+    33434: 'EXIF_ExposureTime',
+    33437: 'EXIF_FNumber',
+    34412: 'CZ_LSMInfo',
+    34665: 'EXIF_IFDOffset',
+    34850: 'EXIF_ExposureProgram',
+    34852: 'EXIF_SpectralSensitivity',
+    34855: 'EXIF_ISOSpeedRatings',
+    34856: 'EXIF_OECF',
+    36864: 'EXIF_ExifVersion',
+    36867: 'EXIF_DateTimeOriginal',
+    36868: 'EXIF_DateTimeDigitized',
+    37121: 'EXIF_ComponentsConfiguration',
+    37122: 'EXIF_CompressedBitsPerPixel',
+    37377: 'EXIF_ShutterSpeedValue',
+    37378: 'EXIF_ApertureValue',
+    37379: 'EXIF_BrightnessValue',
+    37380: 'EXIF_ExposureBiasValue',
+    37381: 'EXIF_MaxApertureValue',
+    37382: 'EXIF_SubjectDistance',
+    37383: 'EXIF_MeteringMode',
+    37384: 'EXIF_LightSource',
+    37385: 'EXIF_Flash',
+    37386: 'EXIF_FocalLength',
+    37396: 'EXIF_SubjectArea',
+    37500: 'EXIF_MakerNote',
+    37510: 'EXIF_UserComment',
+    37520: 'EXIF_SubsecTime',
+    37521: 'EXIF_SubsecTimeOriginal',
+    37522: 'EXIF_SubsecTimeDigitized',
+    40960: 'EXIF_FlashpixVersion',
+    40961: 'EXIF_ColorSpace',
+    40962: 'EXIF_PixelXDimension',
+    40963: 'EXIF_PixelYDimension',
+    40964: 'EXIF_RelatedSoundFile',
+    41483: 'EXIF_FlashEnergy',
+    41484: 'EXIF_SpatialFrequencyResponse',
+    41486: 'EXIF_FocalPlaneXResolution',
+    41487: 'EXIF_FocalPlaneYResolution',
+    41488: 'EXIF_FocalPlaneResolutionUnit',
+    41492: 'EXIF_SubjectLocation',
+    41493: 'EXIF_ExposureIndex',
+    41495: 'EXIF_SensingMethod',
+    41728: 'EXIF_FileSource',
+    41729: 'EXIF_SceneType',
+    41730: 'EXIF_CFAPattern',
+    41985: 'EXIF_CustomRendered',
+    41986: 'EXIF_ExposureMode',
+    41987: 'EXIF_WhiteBalance',
+    41988: 'EXIF_DigitalZoomRatio',
+    41989: 'EXIF_FocalLengthIn35mmFilm',
+    41990: 'EXIF_SceneCaptureType',
+    41991: 'EXIF_GainControl',
+    41992: 'EXIF_Contrast',
+    41993: 'EXIF_Saturation',
+    41994: 'EXIF_Sharpness',
+    41995: 'EXIF_DeviceSettingDescription',
+    41996: 'EXIF_SubjectDistanceRange',
+    42016: 'EXIF_ImageUniqueID',
+}
+
+tag_name2value = {
+    'NewSubfileType': 254,
+    'SubfileType': 255,
+    'ImageWidth': 256,
+    'ImageLength': 257,
+    'BitsPerSample': 258,
+    'Compression': 259,
+    'PhotometricInterpretation': 262,
+    'Threshholding': 263,
+    'CellWidth': 264,
+    'CellLength': 265,
+    'FillOrder': 266,
+    'DocumentName': 269,
+    'ImageDescription': 270,
+    'Make': 271,
+    'Model': 272,
+    'StripOffsets': 273,
+    'Orientation': 274,
+    'SamplesPerPixel': 277,
+    'RowsPerStrip': 278,
+    'StripByteCounts': 279,
+    'MinSampleValue': 280,
+    'MaxSampleValue': 281,
+    'XResolution': 282,
+    'YResolution': 283,
+    'PlanarConfiguration': 284,
+    'PageName': 285,
+    'XPosition': 286,
+    'YPosition': 287,
+    'FreeOffsets': 288,
+    'FreeByteCounts': 289,
+    'GrayResponseUnit': 290,
+    'GrayResponseCurve': 291,
+    'T4Options': 292,
+    'T6Options': 293,
+    'ResolutionUnit': 296,
+    'PageNumber': 297,
+    'TransferFunction': 301,
+    'Software': 305,
+    'DateTime': 306,
+    'Artist': 315,
+    'HostComputer': 316,
+    'Predictor': 317,
+    'WhitePoint': 318,
+    'PrimaryChromaticities': 319,
+    'ColorMap': 320,
+    'HalftoneHints': 321,
+    'TileWidth': 322,
+    'TileLength': 323,
+    'TileOffsets': 324,
+    'TileByteCounts': 325,
+    'InkSet': 332,
+    'InkNames': 333,
+    'NumberOfInks': 334,
+    'DotRange': 336,
+    'TargetPrinter': 337,
+    'ExtraSamples': 338,
+    'SampleFormat': 339,
+    'SMinSampleValue': 340,
+    'SMaxSampleValue': 341,
+    'TransferRange': 342,
+    'JPEGProc': 512,
+    'JPEGInterchangeFormat': 513,
+    'JPEGInterchangeFormatLength': 514,
+    'JPEGRestartInterval': 515,
+    'JPEGLosslessPredictos': 517,
+    'JPEGPointTransforms': 518,
+    'JPEGQTables': 519,
+    'JPEGDCTables': 520,
+    'JPEGACTables': 521,
+    'YCbCrCoefficients': 529,
+    'YCbCrSubSampling': 530,
+    'YCbCrPositioning': 531,
+    'ReferenceBlackWhite': 532,
+    'Copyright': 33432,
+    'EXIF_ExposureTime': 33434,
+    'EXIF_FNumber': 33437,
+    'CZ_LSMInfo': 34412,
+    'EXIF_IFDOffset': 34665,
+    'EXIF_ExposureProgram': 34850,
+    'EXIF_SpectralSensitivity': 34852,
+    'EXIF_ISOSpeedRatings': 34855,
+    'EXIF_OECF': 34856,
+    'EXIF_ExifVersion': 36864,
+    'EXIF_DateTimeOriginal': 36867,
+    'EXIF_DateTimeDigitized': 36868,
+    'EXIF_ComponentsConfiguration': 37121,
+    'EXIF_CompressedBitsPerPixel': 37122,
+    'EXIF_ShutterSpeedValue': 37377,
+    'EXIF_ApertureValue': 37378,
+    'EXIF_BrightnessValue': 37379,
+    'EXIF_ExposureBiasValue': 37380,
+    'EXIF_MaxApertureValue': 37381,
+    'EXIF_SubjectDistance': 37382,
+    'EXIF_MeteringMode': 37383,
+    'EXIF_LightSource': 37384,
+    'EXIF_Flash': 37385,
+    'EXIF_FocalLength': 37386,
+    'EXIF_SubjectArea': 37396,
+    'EXIF_MakerNote': 37500,
+    'EXIF_UserComment': 37510,
+    'EXIF_SubsecTime': 37520,
+    'EXIF_SubsecTimeOriginal': 37521,
+    'EXIF_SubsecTimeDigitized': 37522,
+    'EXIF_FlashpixVersion': 40960,
+    'EXIF_ColorSpace': 40961,
+    'EXIF_PixelXDimension': 40962,
+    'EXIF_PixelYDimension': 40963,
+    'EXIF_RelatedSoundFile': 40964,
+    'EXIF_FlashEnergy': 41483,
+    'EXIF_SpatialFrequencyResponse': 41484,
+    'EXIF_FocalPlaneXResolution': 41486,
+    'EXIF_FocalPlaneYResolution': 41487,
+    'EXIF_FocalPlaneResolutionUnit': 41488,
+    'EXIF_SubjectLocation': 41492,
+    'EXIF_ExposureIndex': 41493,
+    'EXIF_SensingMethod': 41495,
+    'EXIF_FileSource': 41728,
+    'EXIF_SceneType': 41729,
+    'EXIF_CFAPattern': 41730,
+    'EXIF_CustomRendered': 41985,
+    'EXIF_ExposureMode': 41986,
+    'EXIF_WhiteBalance': 41987,
+    'EXIF_DigitalZoomRatio': 41988,
+    'EXIF_FocalLengthIn35mmFilm': 41989,
+    'EXIF_SceneCaptureType': 41990,
+    'EXIF_GainControl': 41991,
+    'EXIF_Contrast': 41992,
+    'EXIF_Saturation': 41993,
+    'EXIF_Sharpness': 41994,
+    'EXIF_DeviceSettingDescription': 41995,
+    'EXIF_SubjectDistanceRange': 41996,
+    'EXIF_ImageUniqueID': 42016,
+}
+
+tag_value2type = {
+    254: 'LONG',
+    255: 'SHORT',
+    256: 'SHORT|LONG',
+    257: 'SHORT|LONG',
+    258: 'SHORT',
+    259: 'SHORT',
+    262: 'SHORT',
+    263: 'SHORT',
+    264: 'SHORT',
+    265: 'SHORT',
+    266: 'SHORT',
+    269: 'ASCII',
+    270: 'ASCII',
+    271: 'ASCII',
+    272: 'ASCII',
+    273: 'SHORT|LONG',
+    274: 'SHORT',
+    277: 'SHORT',
+    278: 'SHORT|LONG',
+    279: 'LONG|SHORT',
+    280: 'SHORT',
+    281: 'SHORT',
+    282: 'RATIONAL',
+    283: 'RATIONAL',
+    284: 'SHORT',
+    285: 'ASCII',
+    286: 'DOUBLE',
+    287: 'DOUBLE',
+    288: 'LONG',
+    289: 'LONG',
+    290: 'SHORT',
+    291: 'SHORT',
+    292: 'LONG',
+    293: 'LONG',
+    296: 'SHORT',
+    297: 'SHORT',
+    301: 'SHORT',
+    305: 'ASCII',
+    306: 'ASCII',
+    315: 'ASCII',
+    316: 'ASCII',
+    317: 'SHORT',
+    318: 'RATIONAL',
+    319: 'RATIONAL',
+    320: 'SHORT',
+    321: 'SHORT',
+    322: 'SHORT|LONG',
+    323: 'SHORT|LONG',
+    324: 'LONG',
+    325: 'SHORT|LONG',
+    332: 'SHORT',
+    333: 'ASCII',
+    334: 'SHORT',
+    336: 'BYTE|SHORT',
+    337: 'ASCII',
+    338: 'BYTE',
+    339: 'SHORT',
+    340: 'Any',
+    341: 'Any',
+    342: 'SHORT',
+    512: 'SHORT',
+    513: 'LONG',
+    514: 'LONG',
+    515: 'SHORT',
+    517: 'SHORT',
+    518: 'SHORT',
+    519: 'LONG',
+    520: 'LONG',
+    521: 'LONG',
+    529: 'RATIONAL',
+    530: 'SHORT',
+    531: 'SHORT',
+    532: 'LONG',
+    33432: 'ASCII',
+    33434: 'RATIONAL',
+    33437: 'RATIONAL',
+    34412: 'CZ_LSM',
+    34665: 'SHORT',
+    34850: 'SHORT',
+    34852: 'ASCII',
+    34855: 'SHORT',
+    34856: 'UNDEFINED',
+    36864: 'UNDEFINED',
+    36867: 'ASCII',
+    36868: 'ASCII',
+    37121: 'UNDEFINED',
+    37122: 'RATIONAL',
+    37377: 'SRATIONAL',
+    37378: 'RATIONAL',
+    37379: 'SRATIONAL',
+    37380: 'SRATIONAL',
+    37381: 'RATIONAL',
+    37382: 'RATIONAL',
+    37383: 'SHORT',
+    37384: 'SHORT',
+    37385: 'SHORT',
+    37386: 'RATIONAL',
+    37396: 'SHORT',
+    37500: 'UNDEFINED',
+    37510: 'UNDEFINED',
+    37520: 'ASCII',
+    37521: 'ASCII',
+    37522: 'ASCII',
+    40960: 'UNDEFINED',
+    40961: 'SHORT',
+    40962: 'SHORT!LONG',
+    40963: 'SHORT!LONG',
+    40964: 'ASCII',
+    41483: 'RATIONAL',
+    41484: 'UNDEFINED',
+    41486: 'RATIONAL',
+    41487: 'RATIONAL',
+    41488: 'SHORT',
+    41492: 'SHORT',
+    41493: 'RATIONAL',
+    41495: 'SHORT',
+    41728: 'UNDEFINED',
+    41729: 'UNDEFINED',
+    41730: 'UNDEFINED',
+    41985: 'SHORT',
+    41986: 'SHORT',
+    41987: 'SHORT',
+    41988: 'RATIONAL',
+    41989: 'SHORT',
+    41990: 'SHORT',
+    41991: 'SHORT',
+    41992: 'SHORT',
+    41993: 'SHORT',
+    41994: 'SHORT',
+    41995: 'UNDEFINED',
+    41996: 'SHORT',
+    42016: 'ASCII',
+}